@@ -19,16 +19,59 @@ del hard_dependencies, dependency, missing_dependencies
 from datetime import datetime
 
 # TODO: add import
+from wearableio.options import (get_option,
+                                set_option,
+                                reset_option,
+                                describe_option,
+                                option_context)
 from wearableio.utils import (join_integer_decimal, 
                               join_byteblocks, 
                               join_complementary_byteblocks)
+from wearableio.utils import join_date_blocks, join_date_blocks_array
+from wearableio.buffer import ColumnBuffer, RingBuffer
+from wearableio.hooks import register_hook, remove_hook, clear_hooks, FlameGraphHook
+from wearableio.feature import WindowFeatureExtractor, sliding_windows
+from wearableio.resample import StreamResampler
 from wearableio.field import BaseField
 from wearableio.frame import BaseFrame
+from wearableio.protocol import Protocol, register_protocol, get_protocol, list_protocols
 
 from wearableio.sensomics.io import (read_sens_line,
                                      read_sens_stream,
                                      read_sens_text,
                                      write_json)
+from wearableio.sensomics.io import (read_sens_columns,
+                                     read_sens_frames,
+                                     estimate_sens_text,
+                                     to_sens_columns,
+                                     decode_sens_array,
+                                     write_sens,
+                                     enable_sens_cache,
+                                     disable_sens_cache,
+                                     sens_cache_info)
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes
+from wearableio.sensomics.aggregate import SensSummary, summarize_sens_text
+from wearableio.sensomics.reassembly import SensReassembler, reassemble_sens_text
+from wearableio.sensomics.record import (SensRecord,
+                                         SensRecordView,
+                                         read_sens_records,
+                                         iter_sens_views)
+from wearableio.sensomics.feature import SensFeatureStream
+from wearableio.sensomics.resample import SensResampler, resample_sens, stream_samples
+from wearableio.sensomics.arrow import SensArrowWriter, columns_to_arrow, write_sens_arrow
+from wearableio.sensomics.calibration import SensCalibration, raw_counts
+from wearableio.sensomics.encoder import (encode_sens_array,
+                                          encode_sens_frame,
+                                          encode_sens_columns,
+                                          random_sens_data,
+                                          replay_sens)
+from wearableio.sensomics.gap import SensGapDetector, SensGapIndex, detect_sens_gaps
+from wearableio.sensomics.journal import SensJournal, ingest_sens
+from wearableio.sensomics.dedup import SensDeduplicator, dedup_sens
+from wearableio.sensomics.live import SensLiveBuffer, sens_ring_dtype
+from wearableio.shared import share_columns, SharedColumns, iter_sens_shared
+from wearableio.sensomics.server import (SensDecodeServer, decode_sens_batch,
+                                         decode_remote, load_test)
 
 #
 from ._version import get_versions
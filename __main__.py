@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from wearableio.cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
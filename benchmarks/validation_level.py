@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput of the validation levels, per engine
+
+    python -m wearableio.benchmarks.validation_level [capture.txt] [-n frames]
+
+Without a capture, random valid frames of every kind are generated. The
+decoded columns of each level are checked to be identical to strict.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from wearableio.options import option_context
+from wearableio.sensomics.encoder import (SENSOMICS_ENCODER, encode_sens_columns, format_sens_lines,
+                                          random_sens_data)
+from wearableio.sensomics.io import read_sens_columns
+
+LEVELS = ('strict', 'header', 'trusted')
+ENGINES = ('numpy', 'python')
+
+
+def write_random_capture(path, n_frames, seed=0):
+    ''' Capture of n_frames random valid frames, kinds drawn evenly '''
+    kinds = sorted(SENSOMICS_ENCODER)
+    columns = {}
+    for i, kind in enumerate(kinds):
+        n = n_frames // len(kinds) + (i < n_frames % len(kinds))
+        data, date = random_sens_data(kind, n, seed=seed + i)
+        columns[kind] = {'time': np.arange(i, n * len(kinds), len(kinds)), 'data': data}
+        if date is not None:
+            columns[kind]['date'] = date
+    time, frames = encode_sens_columns(columns)
+    with open(path, 'wb') as fodata:
+        fodata.write(format_sens_lines(time, frames))
+
+
+def _same_columns(columns, expected):
+    return columns.keys() == expected.keys() and all(
+        columns[kind].keys() == expected[kind].keys() and
+        all(np.array_equal(columns[kind][name], expected[kind][name]) for name in expected[kind])
+        for kind in expected)
+
+
+def bench_validation_level(path, repeat=3):
+    """
+    bench_validation_level used to time read_sens_columns at each level
+
+    Returns
+    -------
+    results : list of dict
+        {'engine', 'level', 'seconds': best of repeat, 'frames_per_second', 'identical'}
+    """
+    results = []
+    for engine in ENGINES:
+        expected = None
+        for level in LEVELS:
+            with option_context('validation.level', level):
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    columns = read_sens_columns(path, engine=engine)
+                    best = min(best, time.perf_counter() - start)
+            if expected is None:
+                expected = columns
+            n_frames = sum(len(kind_columns['time']) for kind_columns in columns.values())
+            results.append({'engine': engine, 'level': level, 'seconds': best,
+                            'frames_per_second': n_frames / best,
+                            'identical': _same_columns(columns, expected)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', nargs='?', help='capture file, default random frames')
+    parser.add_argument('-n', '--frames', type=int, default=200000, help='random frames generated')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='runs per level, best kept')
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.capture
+        if path is None:
+            path = os.path.join(tmp, 'capture.txt')
+            write_random_capture(path, args.frames)
+        print('{:<8} {:<8} {:>10} {:>14} {:>10}'.format('engine', 'level', 'seconds', 'frames/s', 'identical'))
+        for result in bench_validation_level(path, args.repeat):
+            print('{engine:<8} {level:<8} {seconds:>10.3f} {frames_per_second:>14,.0f} {identical!s:>10}'.format(
+                **result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from time import perf_counter
+import numpy as np
+
+
+class ColumnBuffer:
+    """ ColumnBuffer
+    Preallocated numpy column growing geometrically when it is full.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of rows allocated up front, recommend an estimate of the final size
+    shape : tuple
+        Shape of each row, () for a scalar column
+    dtype : str or numpy.dtype
+        Type of the column
+    growth : float
+        Capacity factor applied when the buffer is full, > 1
+
+    Notes
+    ----------
+    With a fair capacity estimate the column is allocated once and copied
+    once by trim(); every underestimate costs one more allocation.
+
+    Examples
+    ----------
+    >>> buffer = ColumnBuffer(capacity=2, shape=(2,), dtype='int64')
+    >>> buffer.extend([[1, 2], [3, 4], [5, 6]])
+    >>> buffer.trim()
+    array([[1, 2],
+           [3, 4],
+           [5, 6]])
+    """
+
+    def __init__(self, capacity=1024, shape=(), dtype='float64', growth=1.5):
+        if growth <= 1:
+            raise ValueError('growth of {} should be > 1: got {}'.format(
+                self.__class__.__name__, growth))
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.growth = growth
+        self.n_allocations = 0
+        self._size = 0
+        self._data = self._allocate(max(int(capacity), 1))
+
+    def _allocate(self, capacity):
+        self.n_allocations += 1
+        return np.zeros((capacity,) + self.shape, dtype=self.dtype)
+
+    def _reserve(self, size):
+        capacity = len(self._data)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity = int(capacity * self.growth) + 1
+        data = self._allocate(capacity)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def data(self):
+        ''' View of the filled rows '''
+        return self._data[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.dtype)
+        size = self._size + len(values)
+        self._reserve(size)
+        self._data[self._size:size] = values
+        self._size = size
+
+    def trim(self):
+        ''' Release unused capacity, return the filled rows '''
+        if self._size < len(self._data):
+            self._data = self._data[:self._size].copy()
+        return self._data
+
+
+RING_POLICIES = ('overwrite', 'block')
+
+
+class RingBuffer:
+    """ RingBuffer
+    Preallocated numpy ring of rows, written in batches by one producer
+    thread and read as zero-copy windows by one consumer thread.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of rows kept
+    shape : tuple
+        Shape of each row, () for a scalar column
+    dtype : str or numpy.dtype
+        Type of the rows, a structured dtype keeps several columns on one
+        ring, e.g. [('time', 'int64'), ('data', 'int64', (8,))]
+    policy : str
+        - overwrite: a write never waits, the oldest rows not read yet are
+          overwritten and counted in n_dropped
+        - block: a write waits until the consumer has freed enough rows
+
+    Notes
+    ----------
+    The rows are stored twice, the second copy shifted by capacity, so any
+    window of up to capacity rows is one contiguous view. The producer only
+    moves the write index and the consumer the read index, after the rows
+    are written or read, so no lock is taken to exchange rows; events only
+    wake a side waiting on the other. A window read stays valid until the
+    next read or release, with the overwrite policy only until the producer
+    writes capacity more rows.
+
+    Examples
+    ----------
+    >>> ring = RingBuffer(capacity=4096, shape=(8,), dtype='int64')
+    >>> ring.write(batch)  # producer thread
+    >>> window = ring.read(timeout=0.1)  # consumer thread
+    """
+
+    def __init__(self, capacity=1024, shape=(), dtype='float64', policy='overwrite'):
+        if policy not in RING_POLICIES:
+            raise ValueError('policy invalid: got {}, allow {}'.format(policy, RING_POLICIES))
+        if not capacity >= 1:
+            raise ValueError('capacity should be >= 1: got {}'.format(capacity))
+        self.capacity = int(capacity)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.policy = policy
+        self.n_dropped = 0
+        self._data = np.zeros((2 * self.capacity,) + self.shape, dtype=self.dtype)
+        self._head = 0  # rows written, moved by the producer only
+        self._reserved = 0  # rows being written, >= _head
+        self._tail = 0  # rows read, moved by the consumer only
+        self._window = 0  # rows of the last window read, freed by the next read
+        self._readable = threading.Event()
+        self._writable = threading.Event()
+
+    @property
+    def n_written(self):
+        return self._head
+
+    @property
+    def n_read(self):
+        return self._tail
+
+    def __len__(self):
+        ''' Number of rows written and not read '''
+        return min(self._head - self._tail, self.capacity)
+
+    def _store(self, position, values, start, stop):
+        ''' Rows start:stop of values at position and its copy '''
+        end = position + stop - start
+        if isinstance(values, dict):
+            for name, column in values.items():
+                self._store_column(self._data[name], position, end, column[start:stop])
+        else:
+            self._store_column(self._data, position, end, values[start:stop])
+
+    def _store_column(self, data, position, end, values):
+        capacity = self.capacity
+        data[position:end] = values
+        if end <= capacity:
+            data[position + capacity:end + capacity] = values
+        else:
+            split = capacity - position
+            data[position + capacity:] = values[:split]
+            data[:end - capacity] = values[split:]
+
+    def _wait_writable(self, n_rows, deadline):
+        while self.capacity - (self._head - self._tail) < n_rows:
+            self._writable.clear()
+            if self.capacity - (self._head - self._tail) >= n_rows:
+                break
+            timeout = None if deadline is None else deadline - perf_counter()
+            if timeout is not None and timeout <= 0:
+                return False
+            self._writable.wait(timeout)
+        return True
+
+    def write(self, values, timeout=None):
+        """
+        Parameters
+        ----------
+        values : array like or dict
+            rows, or {field: column} for a structured dtype
+        timeout : float, optional
+            seconds a blocking write waits for free rows, default forever
+
+        Returns
+        -------
+        n_rows : int
+            rows written, fewer than given when a blocking write timed out
+        """
+        if isinstance(values, dict):
+            n_rows = len(next(iter(values.values())))
+        else:
+            values = np.asarray(values, dtype=self.dtype)
+            n_rows = len(values)
+        deadline = None if timeout is None else perf_counter() + timeout
+        start = 0
+        if self.policy == 'overwrite' and n_rows > self.capacity:
+            start = n_rows - self.capacity  # only the last capacity rows are kept
+            self._reserved = self._head + n_rows
+            self._head += start
+        while start < n_rows:
+            stop = min(start + self.capacity, n_rows)
+            if self.policy == 'block' and not self._wait_writable(stop - start, deadline):
+                break
+            position = self._head % self.capacity
+            self._reserved = self._head + stop - start
+            self._store(position, values, start, stop)
+            self._head = self._reserved
+            self._readable.set()
+            start = stop
+        return start
+
+    def peek(self, max_rows=None):
+        ''' View of the oldest rows not read, without consuming them '''
+        head = self._head  # before _reserved, so the rows up to head stay readable
+        start = max(self._tail, self._reserved - self.capacity)
+        skipped = start - self._tail  # overwritten, or being overwritten
+        if skipped > 0:
+            self.n_dropped += max(skipped - self._window, 0)
+            self._window = max(self._window - skipped, 0)
+            self._tail = start
+        n_rows = max(head - start, 0)
+        if max_rows is not None:
+            n_rows = min(n_rows, max_rows)
+        position = start % self.capacity
+        return self._data[position:position + n_rows]
+
+    def consume(self, n_rows):
+        ''' Mark the n_rows oldest rows as read '''
+        self._tail = min(self._tail + n_rows, self._head)
+        self._writable.set()
+
+    def wait(self, min_rows=1, timeout=None):
+        ''' Wait until min_rows are readable, return False on timeout '''
+        deadline = None if timeout is None else perf_counter() + timeout
+        min_rows = min(min_rows, self.capacity)
+        while self._head - self._tail < min_rows:
+            self._readable.clear()
+            if self._head - self._tail >= min_rows:
+                break
+            remaining = None if deadline is None else deadline - perf_counter()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._readable.wait(remaining)
+        return True
+
+    def release(self):
+        ''' Free the rows of the last window read '''
+        if self._window:
+            self.consume(self._window)
+            self._window = 0
+
+    def read(self, max_rows=None, min_rows=1, timeout=0):
+        """
+        read used to take the oldest rows not read, as a zero-copy view,
+        the rows of the previous window are freed for the producer
+
+        Parameters
+        ----------
+        max_rows : int, optional
+            default all readable rows
+        min_rows : int
+            rows waited for
+        timeout : float, optional
+            seconds waited for min_rows, 0 for no wait, None forever
+
+        Returns
+        -------
+        window : numpy.ndarray
+            (M,) + shape rows, M may be below min_rows on timeout
+        """
+        self.release()
+        if timeout != 0:
+            self.wait(min_rows, timeout)
+        window = self.peek(max_rows)
+        self._window = len(window)
+        return window
+
+    def latest(self, n_rows):
+        ''' View of the n_rows last rows written, read or not, e.g. for a plot '''
+        head = self._head
+        n_rows = max(min(n_rows, head, self.capacity - (self._reserved - head)), 0)
+        position = (head - n_rows) % self.capacity
+        return self._data[position:position + n_rows]
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import fnmatch
+import glob
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from wearableio.sensomics.io import WRITE_FORMATS, write_sens
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_QUARANTINED = 3
+
+FORMAT_SUFFIX = {'jsonl': '.jsonl',
+                 'npz': '.npz',
+                 'csv': '.csv',  # directory of per kind tables
+                 'parquet': '.parquet',  # directory of per kind tables
+                 'feather': '.feather'}  # directory of per kind tables
+
+
+def find_inputs(inputs, pattern='*.txt'):
+    """
+    find_inputs used to expand directories and globs to capture files
+
+    Returns
+    -------
+    found : list of tuple
+        (input file, path relative to its input root), a file reached by
+        several inputs is listed once
+    """
+    found = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = []
+            for root, _, files in os.walk(item):
+                for name in sorted(fnmatch.filter(files, pattern)):
+                    path = os.path.join(root, name)
+                    paths.append((path, os.path.relpath(path, item)))
+        else:
+            paths = [(path, os.path.basename(path)) for path in sorted(glob.glob(item, recursive=True))
+                     if os.path.isfile(path)]
+        for path, relpath in paths:
+            if os.path.realpath(path) not in seen:
+                seen.add(os.path.realpath(path))
+                found.append((path, relpath))
+    return found
+
+
+def output_path(path, relpath, outdir, format_out):
+    stem = os.path.splitext(relpath if outdir else path)[0]
+    if outdir:
+        stem = os.path.join(outdir, stem)
+    return stem + FORMAT_SUFFIX[format_out]
+
+
+def find_collisions(tasks):
+    ''' (input, input, output) of the inputs converted to the same output path '''
+    outputs = {}
+    collisions = []
+    for path, path_out in tasks:
+        other = outputs.setdefault(os.path.normpath(path_out), path)
+        if other != path:
+            collisions.append((other, path, path_out))
+    return collisions
+
+
+def _count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def _remove(path):
+    ''' Remove file or directory path, if any '''
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def _replace(tmp_out, path_out):
+    ''' os.replace of a file or directory output, the previous output stays in place until then '''
+    if not os.path.isdir(path_out):
+        os.replace(tmp_out, path_out)
+        return
+    old_out = '{}.old-{}'.format(path_out, os.getpid())
+    os.replace(path_out, old_out)  # a directory can not be replaced while not empty
+    try:
+        os.replace(tmp_out, path_out)
+    except OSError:
+        os.replace(old_out, path_out)
+        raise
+    shutil.rmtree(old_out, ignore_errors=True)
+
+
+def convert_file(path, path_out, format_out='jsonl', force=False):
+    """
+    convert_file used to convert one capture file, written atomically
+
+    Returns
+    -------
+    result : dict
+        {'path': , 'skipped': , 'n_parsed': , 'n_quarantined': , 'n_bytes': , 'error': }
+    """
+    result = {'path': path, 'skipped': False, 'n_parsed': 0, 'n_quarantined': 0,
+              'n_bytes': 0, 'error': None}
+    quarantine_path = path_out + '.quarantine'
+    tmp_out = None
+    try:
+        result['n_bytes'] = os.path.getsize(path)
+        if (not force and os.path.exists(path_out)
+                and os.path.getmtime(path_out) >= os.path.getmtime(path)):
+            result['skipped'] = True
+            if os.path.exists(quarantine_path):
+                result['n_quarantined'] = _count_lines(quarantine_path)
+            return result
+        parent = os.path.dirname(path_out)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_out = '{}.tmp-{}'.format(path_out, os.getpid())
+        quarantine = []
+        result['n_parsed'] = write_sens(path, tmp_out, format_out, quarantine=quarantine)
+        _replace(tmp_out, path_out)
+        result['n_quarantined'] = len(quarantine)
+        if quarantine:
+            with open(quarantine_path, 'w', encoding='utf-8') as f:
+                for lineno, line, error in quarantine:
+                    f.write('{}\t{}\t{}\n'.format(lineno, error, line.rstrip('\n')))
+        elif os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+    except Exception as e:  # reported per file, the batch goes on
+        result['error'] = '{}: {}'.format(e.__class__.__name__, e)
+        if tmp_out is not None:
+            _remove(tmp_out)
+    return result
+
+
+def _convert_task(task):
+    return convert_file(*task)
+
+
+class Progress:
+    """ Progress and throughput report on stderr """
+
+    def __init__(self, total, stream=sys.stderr, interval=1.0, quiet=False):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.quiet = quiet
+        self.start = self.last = time.perf_counter()
+        self.done = self.skipped = self.failed = 0
+        self.n_parsed = self.n_quarantined = self.n_bytes = 0
+
+    def update(self, result):
+        self.done += 1
+        self.skipped += result['skipped']
+        self.failed += result['error'] is not None
+        self.n_parsed += result['n_parsed']
+        self.n_quarantined += result['n_quarantined']
+        if not result['skipped']:
+            self.n_bytes += result['n_bytes']
+        if result['error'] is not None and not self.quiet:
+            self.stream.write('\nfailed {}: {}\n'.format(result['path'], result['error']))
+        now = time.perf_counter()
+        if now - self.last >= self.interval or self.done == self.total:
+            self.last = now
+            self.report()
+
+    def report(self):
+        if self.quiet:
+            return
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        self.stream.write(
+            '\r[{}/{}] skipped {} failed {} quarantined {} | '
+            '{:.1f} files/s {:.2f} MB/s {:.0f} frames/s'.format(
+                self.done, self.total, self.skipped, self.failed, self.n_quarantined,
+                self.done / elapsed, self.n_bytes / elapsed / 1e6, self.n_parsed / elapsed))
+        if self.done == self.total:
+            self.stream.write('\n')
+        self.stream.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='wearableio',
+        description='Convert sensomics capture files in parallel.')
+    parser.add_argument('inputs', nargs='+',
+                        help='capture files, directories (searched recursively) or globs')
+    parser.add_argument('-f', '--format', dest='format_out', default='jsonl', choices=WRITE_FORMATS,
+                        help='output format (default: jsonl)')
+    parser.add_argument('-o', '--outdir', default=None,
+                        help='output directory mirroring the input tree (default: next to input)')
+    parser.add_argument('-p', '--pattern', default='*.txt',
+                        help='file pattern inside input directories (default: *.txt)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: cpu count)')
+    parser.add_argument('--force', action='store_true',
+                        help='convert even if the output is newer than the input')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not report progress')
+    return parser
+
+
+def main(argv=None):
+    """
+    Exit codes
+    ----------
+    0 : all files converted or up to date
+    1 : at least one file failed
+    2 : invalid arguments, or inputs converted to the same output
+    3 : no failure, but at least one frame was quarantined
+    """
+    args = build_parser().parse_args(argv)
+    if args.format_out in ('parquet', 'feather'):
+        try:
+            __import__('pyarrow')
+        except ImportError:
+            sys.stderr.write('pyarrow is not installed, writing npz instead of {}\n'.format(args.format_out))
+            args.format_out = 'npz'
+    found = find_inputs(args.inputs, args.pattern)
+    tasks = [(path, output_path(path, relpath, args.outdir, args.format_out),
+              args.format_out, args.force) for path, relpath in found]
+    collisions = find_collisions([task[:2] for task in tasks])
+    if collisions:
+        for path, other, path_out in collisions:
+            sys.stderr.write('{} and {} are both converted to {}\n'.format(path, other, path_out))
+        sys.stderr.write('pass their common parent directory, or convert them to separate outdirs\n')
+        return EXIT_USAGE
+    progress = Progress(len(tasks), quiet=args.quiet)
+    if args.jobs is not None and args.jobs <= 1:
+        results = map(_convert_task, tasks)
+        for result in results:
+            progress.update(result)
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            chunksize = max(1, min(64, len(tasks) // (4 * (args.jobs or 1)) or 1))
+            for result in executor.map(_convert_task, tasks, chunksize=chunksize):
+                progress.update(result)
+    if progress.failed:
+        return EXIT_FAILED
+    if progress.n_quarantined:
+        return EXIT_QUARANTINED
+    return EXIT_OK
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(samples, window, hop=None):
+    """
+    sliding_windows used to view (N, channels) samples as windows, no copy
+
+    Returns
+    -------
+    windows : numpy.ndarray, shape (n_windows, channels, window)
+        window i starts at sample i * hop
+    """
+    hop = window if hop is None else hop
+    samples = np.asarray(samples)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if len(samples) < window:
+        return np.zeros((0, samples.shape[1], window), dtype=samples.dtype)
+    return sliding_window_view(samples, window, axis=0)[::hop]
+
+
+def window_mean(windows, fs=None):
+    return windows.mean(axis=-1)
+
+
+def window_std(windows, fs=None):
+    return windows.std(axis=-1)
+
+
+def window_rms(windows, fs=None):
+    return np.sqrt(np.mean(np.square(windows), axis=-1))
+
+
+def window_magnitude(windows, fs=None):
+    ''' Mean euclidean norm across channels, e.g. of 3 axis acceleration '''
+    return np.sqrt(np.square(windows).sum(axis=1)).mean(axis=-1)
+
+
+def window_zero_crossings(windows, fs=None):
+    ''' Number of sign changes of the window minus its mean '''
+    centered = windows - windows.mean(axis=-1, keepdims=True)
+    sign = np.signbit(centered)
+    return (sign[..., 1:] != sign[..., :-1]).sum(axis=-1)
+
+
+def window_peak_rate(windows, fs=None, threshold=0.5):
+    """
+    window_peak_rate used to estimate a rate per minute from the peaks of
+    each window, e.g. heart rate from PPG
+
+    A peak starts where the window rises above mean + threshold * std of
+    the window, the rate is taken from the mean interval between the first
+    and the last peak. NaN where less than two peaks are found.
+    """
+    if fs is None:
+        raise ValueError('fs is required by peak_rate')
+    level = (windows.mean(axis=-1, keepdims=True)
+             + threshold * windows.std(axis=-1, keepdims=True))
+    above = windows > level
+    rising = above[..., 1:] & ~above[..., :-1]
+    n_peaks = rising.sum(axis=-1)
+    position = np.arange(1, windows.shape[-1])
+    first = np.where(rising, position, windows.shape[-1]).min(axis=-1)
+    last = np.where(rising, position, -1).max(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = 60.0 * fs * (n_peaks - 1) / (last - first)
+    return np.where(n_peaks >= 2, rate, np.nan)
+
+
+WINDOW_FEATURES = {
+    'mean': window_mean,
+    'std': window_std,
+    'rms': window_rms,
+    'magnitude': window_magnitude,
+    'zero_crossings': window_zero_crossings,
+    'peak_rate': window_peak_rate,
+}
+
+
+class WindowFeatureExtractor:
+    """ WindowFeatureExtractor
+    Streaming window features over (N, channels) samples pushed by chunks.
+
+    Parameters
+    ----------
+    window : int
+        number of samples per window
+    hop : int, optional
+        number of samples between window starts, default window
+    features : list of str
+        names in WINDOW_FEATURES
+    fs : float, optional
+        sampling rate in Hz, required by peak_rate
+    channels : int
+        number of channels of the samples
+
+    Notes
+    ----------
+    Samples not yet covered by a complete window are carried to the next
+    push, so features do not depend on how the samples are chunked.
+
+    Examples
+    ----------
+    >>> extractor = WindowFeatureExtractor(window=128, hop=32, features=['rms'])
+    >>> for chunk in chunks:
+    ...     features = extractor.push(chunk)
+    """
+
+    def __init__(self, window, hop=None, features=('rms',), fs=None, channels=1):
+        self.window = window
+        self.hop = window if hop is None else hop
+        if not 0 < self.hop:
+            raise ValueError('hop should be > 0: got {}'.format(self.hop))
+        for feature in features:
+            if feature not in WINDOW_FEATURES:
+                raise ValueError('feature invalid: got {}, allow {}'.format(
+                    feature, list(WINDOW_FEATURES)))
+        self.features = list(features)
+        self.fs = fs
+        self.channels = channels
+        self._buffer = np.zeros((0, channels))
+        self._start = 0  # sample index of _buffer[0]
+        self._skip = 0  # samples to skip when hop > window
+
+    def push(self, samples):
+        """
+        Returns
+        -------
+        features : dict
+            {'start': sample index of each window start, feature: values}
+            with one row per window completed by the samples
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if self._skip:
+            skipped = min(self._skip, len(samples))
+            samples = samples[skipped:]
+            self._skip -= skipped
+        buffer = np.concatenate([self._buffer, samples]) if len(self._buffer) else samples
+        windows = sliding_windows(buffer, self.window, self.hop)
+        n_windows = len(windows)
+        parsed = {'start': self._start + np.arange(n_windows) * self.hop}
+        for feature in self.features:
+            parsed[feature] = WINDOW_FEATURES[feature](windows, self.fs)
+        consumed = n_windows * self.hop
+        self._buffer = buffer[consumed:].copy()
+        self._skip = max(consumed - len(buffer), 0)
+        self._start += consumed
+        return parsed
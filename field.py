@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
 
+from itertools import islice
+import math
+import numpy as np
 from pandas import Interval
-from collections import Iterable
+from collections.abc import Iterable
+from wearableio import hooks
+from wearableio.options import get_option
 
 
 
@@ -25,11 +30,16 @@ class BaseField:
          'size': ,
          'validator': ,
          'offset': ,}
+    header: bool, class attribute
+        True for the fields a frame type is dispatched on, still validated
+        by option 'validation.level' header
 
     Notes
     ----------
     The following method should be overwrite if necessary.   
     parse_func(blocks) : set parse function, default return blocks itself
+    parse_array_func(blocks) : set vectorized parse function on an (N, size)
+        array of blocks, default return blocks itself
     clean(blocks) : default return function _clean(blocks) 
     
     Examples
@@ -38,6 +48,8 @@ class BaseField:
     
     """
 
+    header = False
+
     def __init__(self, name=None, size=None, validator=None, offset=None, settings=None):
         self.name = name
         self.size = size
@@ -58,6 +70,19 @@ class BaseField:
     def parse_func(self, parse_func):
         self._parse_func = parse_func
 
+    @classmethod
+    def _parse_array_func(cls, blocks):
+        return blocks
+
+    @property
+    def parse_array_func(self):
+        ''' Set vectorized parse function, default return blocks itself '''
+        return self._parse_array_func
+
+    @parse_array_func.setter
+    def parse_array_func(self, parse_array_func):
+        self._parse_array_func = parse_array_func
+
     @property
     def settings(self):
         settings = {}
@@ -73,6 +98,9 @@ class BaseField:
             setattr(self, setting, settings[setting])
 
     def clean(self, blocks):
+        level = get_option('validation.level')
+        if level == 'trusted':
+            return
         if not isinstance(blocks, list):
             blocks = [blocks]  # convert element of size 1 to list
         ''' Field size validation '''
@@ -101,6 +129,8 @@ class BaseField:
             raise ValueError('Size type of {} invalid: got {}, allow int, Interval or Iterable'.format(
                 self.__class__.__name__,
                 type(blocks)))
+        if level == 'header' and not self.header:
+            return
         ''' Field block validation '''
         if isinstance(self.validator, Iterable):
             if False in map(lambda val, validator:
@@ -115,14 +145,72 @@ class BaseField:
                 self.__class__.__name__))
 
     def parse(self, blocks):
+        if hooks.enabled and hooks.tracing():
+            return hooks.trace_field(self, blocks)
         self.clean(blocks)
         parsed = self.parse_func(blocks)
-        return parsed  
-        
-
-
-
-
-
+        return parsed
 
-         
\ No newline at end of file
+    def _validator_bounds(self, width):
+        ''' Closed integer bounds of the first width validators, as two arrays '''
+        if not isinstance(self.validator, Iterable):
+            raise ValueError('Validator of {} should be Iterable'.format(
+                self.__class__.__name__))
+        lower, upper = [], []
+        for validator in islice(self.validator, width):
+            if isinstance(validator, Interval):
+                lower.append(math.ceil(validator.left) if validator.closed_left
+                             else math.floor(validator.left) + 1)
+                upper.append(math.floor(validator.right) if validator.closed_right
+                             else math.ceil(validator.right) - 1)
+            else:
+                lower.append(validator)
+                upper.append(validator)
+        return np.array(lower, dtype=np.int64), np.array(upper, dtype=np.int64)
+
+    def clean_array(self, blocks, sizes):
+        """
+        clean_array is the vectorized clean
+
+        Parameters
+        ----------
+        blocks : numpy.ndarray, shape (N, width)
+            blocks of N fields, padded after sizes
+        sizes : numpy.ndarray, shape (N,)
+            number of blocks of each field
+
+        Returns
+        -------
+        valid : numpy.ndarray of bool, shape (N,)
+            True where clean(blocks) would pass
+        """
+        level = get_option('validation.level')
+        if level == 'trusted':
+            return np.ones(len(sizes), dtype=bool)
+        ''' Field size validation '''
+        if isinstance(self.size, Interval):
+            allowed = np.array([size in self.size for size in range(blocks.shape[1] + 1)])
+            valid = allowed[sizes]
+        elif isinstance(self.size, int):
+            valid = sizes == self.size
+        elif isinstance(self.size, Iterable):
+            valid = np.isin(sizes, list(self.size))
+        else:
+            raise ValueError('Size type of {} invalid: got {}, allow int, Interval or Iterable'.format(
+                self.__class__.__name__,
+                type(blocks)))
+        if level == 'header' and not self.header:
+            return valid
+        ''' Field block validation '''
+        lower, upper = self._validator_bounds(blocks.shape[1])
+        checked = blocks[:, :len(lower)]
+        in_bounds = (checked >= lower) & (checked <= upper)
+        in_bounds |= np.arange(len(lower)) >= sizes[:, None]  # padding is not validated
+        valid &= in_bounds.all(axis=1)
+        return valid
+
+    def parse_array(self, blocks, sizes):
+        ''' Vectorized parse, return (valid, parsed) '''
+        valid = self.clean_array(blocks, sizes)
+        parsed = self.parse_array_func(blocks)
+        return valid, parsed
@@ -1,5 +1,18 @@
 # -*- coding: utf-8 -*-
 
+from functools import lru_cache
+from types import MappingProxyType
+from time import perf_counter
+import numpy as np
+from wearableio import hooks
+from wearableio.options import get_option
+
+
+def _cache_options():
+    ''' Options the parsed output depends on, part of the cache key of _parse '''
+    return (get_option('validation.level'), get_option('date.format_out'),
+            get_option('date.strftime'))
+
 
 class BaseFrame(list):
     """ BaseFrame
@@ -18,12 +31,20 @@ class BaseFrame(list):
     ----------
     _parse: method
         frame: frame list
-        fields_out: select field to be parsed
+        fields_out: select field to be parsed, the other fields are
+            validated but not converted
         format_out: select output format
             - list: output as list
             - dict: output as dict
+    _parse_array: method
+        frames: (N, max_length) array of frames padded after sizes
+        sizes: number of blocks of each frame
+        fields_out: select field to be parsed
+    enable_cache: method
+        memoize _parse on the frame bytes, see cache_info
     """
     _kind = 'base'
+    _parse_cached = None
 
     def __init__(self):
         super(BaseFrame, self).__init__()
@@ -44,28 +65,151 @@ class BaseFrame(list):
     def _parse(self, frame,
                fields_out=None,
                format_out='dict'):
-        if not isinstance(frame, list):
-            frame = list(frame)
         if not isinstance(fields_out, list):
             fields_out = [fields_out]
+        if hooks.enabled and hooks.tracing():
+            return self._parse_traced(frame, fields_out, format_out)
+        if self._parse_cached is not None:
+            return self._parse_cached(tuple(frame), tuple(fields_out), format_out, _cache_options())
+        if not isinstance(frame, list):
+            frame = list(frame)
+        return self._parse_fields(frame, fields_out, format_out)
+
+    def _parse_traced(self, frame, fields_out, format_out):
+        ''' _parse of a frame sampled by hooks, emit parse '''
+        hook_time = hooks.hook_time()
+        start = perf_counter()
+        try:
+            if self._parse_cached is not None:
+                return self._parse_cached(tuple(frame), tuple(fields_out), format_out,
+                                          _cache_options())
+            return self._parse_fields(list(frame), fields_out, format_out)
+        finally:
+            elapsed = perf_counter() - start - (hooks.hook_time() - hook_time)
+            hooks.emit('parse', {'kind': self._kind, 'elapsed': elapsed})
+            hooks.end_frame()
+
+    def _parse_fields(self, frame, fields_out, format_out):
         fields_name_out = list(map(lambda field_out: field_out + ' field', fields_out))
+        traced = hooks.enabled and hooks.tracing()
         parsed = {'kind': self._kind}
         for field in self:
-            block = frame[field.offset]
-            field_parsed = field.parse(block)
-            if field.name in fields_name_out:
-                parsed[field.name[:-6]] = field_parsed
+            try:
+                block = frame[field.offset]
+                if field.name in fields_name_out:
+                    parsed[field.name[:-6]] = field.parse(block)
+                elif traced:
+                    hooks.trace_clean(field, block)
+                else:
+                    field.clean(block)  # projected out: validated, not converted
+            except IndexError:  # short frame, sizes not validated by level header or trusted
+                raise ValueError('Blocks of {} invalid: got {} blocks in frame {}'.format(
+                    field.name, len(frame), self._kind))
             # if format_out == 'dict':
             #     keys = ['kind'] + fields_out
             #     parsed = dict(zip(keys, parsed))
             if format_out == 'list':
                 parsed = list(parsed.value())
         return parsed
-    
-
-        
-        
-        
-        
-        
-        
\ No newline at end of file
+
+    def _parse_frozen(self, frame, fields_out, format_out, options):
+        ''' options key the cache only, see _cache_options '''
+        return _freeze(self._parse_fields(list(frame), list(fields_out), format_out))
+
+    def enable_cache(self, maxsize=1024):
+        """
+        enable_cache used to memoize _parse with a bounded LRU cache keyed on
+        the frame bytes, for kinds repeating identical frames
+
+        Identical frames return the same read only result: a mapping with
+        lists frozen to tuples. Invalid frames are not cached and raise again.
+        """
+        self._parse_cached = lru_cache(maxsize=maxsize)(self._parse_frozen)
+
+    def disable_cache(self):
+        self._parse_cached = None
+
+    def cache_info(self):
+        ''' functools CacheInfo(hits, misses, maxsize, currsize), None if disabled '''
+        if self._parse_cached is None:
+            return None
+        return self._parse_cached.cache_info()
+
+    @staticmethod
+    def _take_array(frames, sizes, offset):
+        ''' Blocks of a field in (N, max_length) frames, with the number of blocks available '''
+        if isinstance(offset, slice):
+            start, stop, step = offset.indices(frames.shape[1])
+            if step != 1:
+                raise ValueError('Offset step of field should be 1: got {}'.format(step))
+            blocks = frames[:, start:stop]
+            width = max(stop - start, 0)
+        else:
+            start = offset
+            blocks = frames[:, offset:offset + 1]
+            width = 1
+        n_blocks = np.clip(sizes - start, 0, width)
+        return blocks, n_blocks
+
+    def _parse_array(self, frames,
+                     sizes=None,
+                     fields_out=None):
+        """
+        _parse_array is the vectorized _parse of N frames of this kind
+
+        Returns
+        -------
+        valid : numpy.ndarray of bool, shape (N,)
+            True where _parse would pass, other rows of parsed are undefined
+        parsed : dict
+            {'kind': , field name: array of N parsed fields}
+        """
+        frames = np.asarray(frames)
+        if sizes is None:
+            sizes = np.full(len(frames), frames.shape[1])
+        if not isinstance(fields_out, list):
+            fields_out = [fields_out]
+        fields_name_out = list(map(lambda field_out: field_out + ' field', fields_out))
+        if hooks.enabled:
+            return self._parse_array_traced(frames, sizes, fields_name_out)
+        valid = np.ones(len(frames), dtype=bool)
+        parsed = {'kind': self._kind}
+        for field in self:
+            blocks, n_blocks = self._take_array(frames, sizes, field.offset)
+            if field.name in fields_name_out:
+                field_valid, parsed[field.name[:-6]] = field.parse_array(blocks, n_blocks)
+            else:
+                field_valid = field.clean_array(blocks, n_blocks)
+            valid &= field_valid
+        return valid, parsed
+
+    def _parse_array_traced(self, frames, sizes, fields_name_out):
+        ''' _parse_array emitting parse and field events with the number of rows '''
+        rows = len(frames)
+        hook_time = hooks.hook_time()
+        start = perf_counter()
+        valid = np.ones(rows, dtype=bool)
+        parsed = {'kind': self._kind}
+        for field in self:
+            field_start = perf_counter()
+            blocks, n_blocks = self._take_array(frames, sizes, field.offset)
+            valid &= field.clean_array(blocks, n_blocks)
+            validated = perf_counter()
+            if field.name in fields_name_out:
+                parsed[field.name[:-6]] = field.parse_array_func(blocks)
+            converted = perf_counter()
+            hooks.emit('field', {'kind': self._kind, 'field': field.name, 'rows': rows,
+                                 'validate': validated - field_start, 'convert': converted - validated,
+                                 'elapsed': converted - field_start}, sampled=False)
+        elapsed = perf_counter() - start - (hooks.hook_time() - hook_time)
+        hooks.emit('parse', {'kind': self._kind, 'rows': rows, 'elapsed': elapsed}, sampled=False)
+        return valid, parsed
+
+
+def _freeze(parsed):
+    ''' Read only copy of a parsed frame, lists to tuples and dict to mappingproxy '''
+    if isinstance(parsed, dict):
+        return MappingProxyType({key: _freeze(val) for key, val in parsed.items()})
+    if isinstance(parsed, (list, tuple)):
+        return tuple(_freeze(val) for val in parsed)
+    return parsed
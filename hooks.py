@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+import os
+from time import perf_counter
+
+HOOK_POINTS = ('dispatch', 'parse', 'field', 'io')
+
+# Read by the hot paths of the decoder, True while hooks are registered
+enabled = False
+
+_hooks = []
+_traced = []  # hooks tracing the frame being decoded
+_kind = None  # kind of the frame being decoded
+_n_frames = 0
+_hook_time = 0.0  # seconds spent in callbacks, excluded from the parse events
+
+
+class _Hook:
+    __slots__ = ('callback', 'points', 'sample')
+
+    def __init__(self, callback, points, sample):
+        self.callback = callback
+        self.points = points
+        self.sample = sample
+
+
+def register_hook(callback, points=HOOK_POINTS, sample=1):
+    """
+    register_hook used to call callback(event) at hook points of the decoder
+
+    Parameters
+    ----------
+    callback : callable
+        called with one event dict {'point', 'elapsed' in seconds, ...}
+    points : list of str
+        - dispatch: frame type lookup of a frame, {'kind'}
+        - parse: parse of a frame by its frame type, {'kind'}, with
+          'rows' for the vectorized parse of a batch of frames
+        - field: validation and conversion of a field, {'kind', 'field',
+          'validate', 'convert'} with elapsed their sum, and 'rows' in batches
+        - io: file read or write in sensomics.io, {'op', 'path', 'bytes'
+          or 'lines'}
+    sample : int
+        trace 1 frame in sample, from its dispatch to the end of its
+        parse, batches and io events are not sampled
+
+    Returns
+    -------
+    hook : handle for remove_hook
+    """
+    global enabled
+    for point in points:
+        if point not in HOOK_POINTS:
+            raise ValueError('hook point invalid: got {}, allow {}'.format(point, HOOK_POINTS))
+    if not sample >= 1:
+        raise ValueError('sample should be >= 1: got {}'.format(sample))
+    hook = _Hook(callback, tuple(points), int(sample))
+    _hooks.append(hook)
+    enabled = True
+    return hook
+
+
+def remove_hook(hook):
+    global enabled, _traced
+    _hooks.remove(hook)
+    _traced = [each for each in _traced if each is not hook]
+    enabled = bool(_hooks)
+
+
+def clear_hooks():
+    global enabled, _traced
+    del _hooks[:]
+    _traced = []
+    enabled = False
+
+
+def start_frame():
+    ''' Count a dispatched frame, return the hooks sampling it '''
+    global _n_frames, _traced
+    _n_frames += 1
+    _traced = [hook for hook in _hooks if _n_frames % hook.sample == 0]
+    return _traced
+
+
+def end_frame():
+    global _traced, _kind
+    _traced = []
+    _kind = None
+
+
+def tracing():
+    ''' True while the frame being decoded is sampled '''
+    return bool(_traced)
+
+
+def emit(point, event, sampled=True):
+    ''' Call the hooks of point with event, those sampling the frame if sampled '''
+    global _hook_time
+    start = perf_counter()
+    event['point'] = point
+    if sampled and 'kind' not in event:
+        event['kind'] = _kind
+    for hook in (_traced if sampled else _hooks):
+        if point in hook.points:
+            hook.callback(event)
+    _hook_time += perf_counter() - start
+
+
+def hook_time():
+    ''' Seconds spent in hook callbacks so far '''
+    return _hook_time
+
+
+def trace_dispatch(lookup, parts):
+    ''' lookup(parts) of a sampled frame, emit dispatch '''
+    global _kind
+    start = perf_counter()
+    frame_obj = lookup(parts)
+    _kind = frame_obj._kind
+    emit('dispatch', {'kind': _kind, 'elapsed': perf_counter() - start})
+    return frame_obj
+
+
+def trace_field(field, blocks):
+    ''' field.parse of a sampled frame, emit field '''
+    start = perf_counter()
+    field.clean(blocks)
+    validated = perf_counter()
+    parsed = field.parse_func(blocks)
+    converted = perf_counter()
+    emit('field', {'field': field.name, 'validate': validated - start,
+                   'convert': converted - validated, 'elapsed': converted - start})
+    return parsed
+
+
+def trace_clean(field, blocks):
+    ''' field.clean of a field projected out of a sampled frame, emit field '''
+    start = perf_counter()
+    field.clean(blocks)
+    elapsed = perf_counter() - start
+    emit('field', {'field': field.name, 'validate': elapsed, 'convert': 0.0, 'elapsed': elapsed})
+
+
+def trace_read(iterable, path, op='read'):
+    """
+    trace_read used to time the reads of a file iterator, one io event per
+    chunk of bytes, or one event at the end for lines of str
+    """
+    lines = 0
+    elapsed = 0.0
+    iterator = iter(iterable)
+    while True:
+        start = perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        spent = perf_counter() - start
+        chunk = item[0] if isinstance(item, tuple) else item
+        if isinstance(chunk, bytes):
+            emit('io', {'op': op, 'path': path, 'bytes': len(chunk), 'elapsed': spent}, sampled=False)
+        else:
+            lines += 1
+            elapsed += spent
+        yield item
+    if lines:
+        emit('io', {'op': op, 'path': path, 'lines': lines, 'elapsed': elapsed}, sampled=False)
+
+
+def trace_call(op, path, func, *args, **kwargs):
+    ''' func(*args, **kwargs) doing file I/O on path, emit io '''
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    emit('io', {'op': op, 'path': path, 'elapsed': perf_counter() - start}, sampled=False)
+    return result
+
+
+class FlameGraphHook:
+    """ FlameGraphHook
+    Built in hook aggregating where decode time goes per frame kind, as
+    folded stacks for flame graph tools (flamegraph.pl, speedscope, ...).
+
+    Stacks are 'decode;<kind>;dispatch', 'decode;<kind>;parse' (self time),
+    'decode;<kind>;parse;<field>;validate' and ';convert', under
+    'decode_array' for batches and 'io;<op>;<file name>' for file I/O.
+
+    Examples
+    ----------
+    >>> flame = FlameGraphHook()
+    >>> hook = register_hook(flame, sample=100)
+    >>> read_sens_columns(path, engine='python')
+    >>> remove_hook(hook)
+    >>> flame.save('decode.folded')
+    """
+
+    def __init__(self):
+        self.stacks = {}
+        self._children = 0.0  # field time of the frame being parsed
+
+    def _add(self, stack, elapsed):
+        stack = ';'.join(str(name).replace(' ', '_') for name in stack)
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed
+
+    def __call__(self, event):
+        point = event['point']
+        root = 'decode_array' if 'rows' in event else 'decode'
+        kind = event.get('kind')
+        if point == 'dispatch':
+            self._add((root, kind, 'dispatch'), event['elapsed'])
+        elif point == 'field':
+            self._add((root, kind, 'parse', event['field'], 'validate'), event['validate'])
+            self._add((root, kind, 'parse', event['field'], 'convert'), event['convert'])
+            self._children += event['elapsed']
+        elif point == 'parse':
+            self._add((root, kind, 'parse'), max(event['elapsed'] - self._children, 0.0))
+            self._children = 0.0
+        elif point == 'io':
+            self._add(('io', event['op'], os.path.basename(str(event['path']))), event['elapsed'])
+
+    def folded(self, unit=1e-6):
+        ''' Folded stacks 'a;b;c <count>', count in unit seconds, default microseconds '''
+        return '\n'.join('{} {}'.format(stack, int(round(elapsed / unit)))
+                         for stack, elapsed in sorted(self.stacks.items()))
+
+    def save(self, path, unit=1e-6):
+        with open(path, 'w', encoding='utf-8') as fodata:
+            fodata.write(self.folded(unit) + '\n')
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+
+_registered_options = {}
+_global_options = {}
+
+
+def register_option(key, default, validator=None, doc=''):
+    """
+    register_option used to declare a global option with its default value
+
+    Parameters
+    ----------
+    key : str
+        Option name, recommend 'section.name'
+    default : object
+        Default value of the option
+    validator : Iterable or callable, optional
+        Allowed values, or a function raising ValueError on invalid value
+    doc : str
+        Short description of the option
+    """
+    if key in _registered_options:
+        raise KeyError('Option {} already registered'.format(key))
+    _registered_options[key] = {'default': default,
+                                'validator': validator,
+                                'doc': doc}
+    _validate_option(key, default)
+    _global_options[key] = default
+
+
+def _validate_option(key, value):
+    try:
+        validator = _registered_options[key]['validator']
+    except KeyError:
+        raise KeyError('No such option: {}'.format(key))
+    if validator is None:
+        return
+    if callable(validator):
+        validator(value)
+    elif value not in validator:
+        raise ValueError('Option {} invalid: got {}, allow {}'.format(
+            key, value, list(validator)))
+
+
+def get_option(key):
+    try:
+        return _global_options[key]
+    except KeyError:
+        raise KeyError('No such option: {}'.format(key))
+
+
+def set_option(key, value):
+    _validate_option(key, value)
+    _global_options[key] = value
+
+
+def reset_option(key):
+    set_option(key, _registered_options[key]['default'])
+
+
+def describe_option(key=None):
+    keys = [key] if key is not None else sorted(_registered_options)
+    lines = []
+    for key in keys:
+        option = _registered_options[key]
+        lines.append('{}: {} [default: {}] [currently: {}]'.format(
+            key, option['doc'], option['default'], get_option(key)))
+    return '\n'.join(lines)
+
+
+@contextmanager
+def option_context(*args):
+    """
+    option_context used to set options temporarily in a with statement
+
+    Example:
+        with option_context('date.format_out', 'str'):
+            read_sens_text(path)
+    """
+    if len(args) % 2 != 0:
+        raise ValueError('option_context needs (key, value) pairs')
+    pairs = list(zip(args[::2], args[1::2]))
+    undo = [(key, get_option(key)) for key, _ in pairs]
+    try:
+        for key, value in pairs:
+            set_option(key, value)
+        yield
+    finally:
+        for key, value in undo:
+            set_option(key, value)
+
+
+### Registered options
+DATE_FORMAT_OUT = ('datetime64', 'epoch', 'str')
+
+register_option('date.format_out', 'datetime64', DATE_FORMAT_OUT,
+                doc='Output of date fields: datetime64[s], epoch seconds or str')
+register_option('date.strftime', '%Y-%m-%d-%H:%M:%S', None,
+                doc='Format of date fields when date.format_out is str')
+
+VALIDATION_LEVEL = ('strict', 'header', 'trusted')
+
+register_option('validation.level', 'strict', VALIDATION_LEVEL,
+                doc='Checks of BaseField.clean: all blocks and sizes (strict), '
+                    'sizes and blocks of header fields only (header) or none (trusted)')
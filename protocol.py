@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+import json
+import numpy as np
+from wearableio import hooks
+from wearableio.frame import BaseFrame
+from wearableio.utils import join_byteblocks
+
+
+class Protocol:
+    """ Protocol
+    Frame layout of a vendor: the key parts taken from each frame and the
+    frame kind selected by the keys. Every registered protocol decodes on
+    the same engine, frame by frame, in batches and as a stream.
+
+    Parameters
+    ----------
+    name : str
+        name of the protocol in the registry
+    parts : list of dict
+        key parts of a frame, in dispatch order
+        {'offset': int or slice of the blocks joined big endian,
+         'map': optional callable remapping the part, applied to int and
+                to int64 numpy.ndarray}
+    frame_type : dict
+        {part1: BaseFrame or {part2: BaseFrame or {...}}}, a frame is of the
+        first BaseFrame reached by its parts
+    unknown : BaseFrame
+        frame of the keys missing in frame_type
+    max_length : int
+        maximum number of blocks of a frame
+
+    Notes
+    ----------
+    frame_type is compiled to a flat table when the protocol is created,
+    call compile() after editing it.
+
+    Examples
+    ----------
+    >>> protocol = Protocol('toy', parts=[{'offset': 0}, {'offset': 1}],
+    ...                     frame_type={0x5a: {0x01: ToyTemperatureFrame()}},
+    ...                     unknown=ToyUnknownFrame(), max_length=4)
+    >>> register_protocol(protocol)
+    >>> get_protocol('toy').read_stream(0, [0x5a, 0x01, 0x01, 0x2c])
+    """
+
+    def __init__(self, name, parts, frame_type, unknown, max_length=20):
+        self.name = name
+        self.parts_settings = parts
+        self.frame_type = frame_type
+        self.unknown = unknown
+        self.max_length = max_length
+        self.compile()
+
+    def compile(self):
+        ''' Flatten frame_type to {depth: {key parts: BaseFrame}} '''
+        table = {}
+
+        def walk(frame_dict, prefix):
+            for key, frame_type in frame_dict.items():
+                if isinstance(frame_type, BaseFrame):  # is selected
+                    table.setdefault(len(prefix) + 1, {})[prefix + (key,)] = frame_type
+                elif isinstance(frame_type, dict) and len(prefix) + 1 < len(self.parts_settings):
+                    # Continue to search the next level
+                    walk(frame_type, prefix + (key,))
+
+        walk(self.frame_type, ())
+        self._table = table
+        # number of leading blocks holding the key parts
+        self.header_length = max(self._part_stop(level) for level in range(len(self.parts_settings)))
+        self._frame_objs = [self.unknown]
+        for depth_table in table.values():
+            for frame_obj in depth_table.values():
+                if all(frame_obj is not each for each in self._frame_objs):
+                    self._frame_objs.append(frame_obj)
+        # sorted combined keys per depth, for the vectorized dispatch
+        self._keys_array = {}
+        for depth, depth_table in table.items():
+            keys = np.array([self._combine(key, depth) for key in depth_table], dtype=np.int64)
+            objs = np.array([self._frame_objs.index(frame_obj) for frame_obj in depth_table.values()],
+                            dtype=np.int64)
+            order = np.argsort(keys)
+            self._keys_array[depth] = (keys[order], objs[order])
+
+    def _part_bits(self, level):
+        offset = self.parts_settings[level]['offset']
+        if isinstance(offset, slice):
+            start, stop, _ = offset.indices(self.max_length)
+            return 8 * (stop - start)
+        return 8
+
+    def _part_stop(self, level):
+        offset = self.parts_settings[level]['offset']
+        if isinstance(offset, slice):
+            return offset.indices(self.max_length)[1]
+        return offset + 1
+
+    def _combine(self, parts, depth):
+        ''' Key parts of depth levels as one int, for int or int64 arrays '''
+        combined = 0
+        for level in range(depth):
+            combined = (combined << self._part_bits(level)) | parts[level]
+        return combined
+
+    def parts(self, frame):
+        ''' Key parts of a frame, as list of int '''
+        parts = []
+        for part_settings in self.parts_settings:
+            offset = part_settings['offset']
+            block = frame[offset] if isinstance(offset, slice) else frame[offset:offset + 1]
+            part = join_byteblocks(block, reverse=True)
+            if 'map' in part_settings:
+                part = part_settings['map'](part)
+            parts.append(part)
+        return parts
+
+    def parts_array(self, frames):
+        ''' Vectorized parts of (N, max_length) frames, as int64 arrays '''
+        frames = np.asarray(frames).astype(np.int64)
+        parts = []
+        for part_settings in self.parts_settings:
+            offset = part_settings['offset']
+            blocks = frames[:, offset] if isinstance(offset, slice) else frames[:, offset:offset + 1]
+            part = np.zeros(len(frames), dtype=np.int64)
+            for column in range(blocks.shape[1]):
+                part = part << 8 | blocks[:, column]
+            if 'map' in part_settings:
+                part = np.asarray(part_settings['map'](part), dtype=np.int64)
+            parts.append(part)
+        return parts
+
+    def lookup(self, parts):
+        ''' Frame of key parts, unknown if not found '''
+        if hooks.enabled and hooks.start_frame():
+            return hooks.trace_dispatch(self._lookup, parts)
+        return self._lookup(parts)
+
+    def _lookup(self, parts):
+        for depth, depth_table in self._table.items():
+            frame_obj = depth_table.get(tuple(parts[:depth]))
+            if frame_obj is not None:
+                return frame_obj
+        return self.unknown
+
+    def parse_type(self, frame):
+        return self.lookup(self.parts(frame))
+
+    def header_kind(self, header):
+        ''' Kind of a frame from its first header_length blocks, without hooks '''
+        return self._lookup(self.parts(header))._kind
+
+    def parse_type_array(self, frames):
+        """
+        parse_type_array is the vectorized parse_type
+
+        Returns
+        -------
+        frame_objs : list of BaseFrame
+            the frame types of the protocol, unknown first
+        index : numpy.ndarray, shape (N,)
+            frame type of each frame, as index of frame_objs
+        """
+        parts = self.parts_array(frames)
+        index = np.zeros(len(frames), dtype=np.int64)
+        for depth, (keys, objs) in self._keys_array.items():
+            combined = self._combine(parts, depth)
+            position = np.clip(np.searchsorted(keys, combined), 0, len(keys) - 1)
+            matched = keys[position] == combined
+            index[matched] = objs[position[matched]]
+        return self._frame_objs, index
+
+    def parse_frame(self, frame, fields_out=['date', 'data']):
+        return self.parse_type(frame).parse(frame, fields_out=fields_out, format_out='dict')
+
+    def read_stream(self, time, frame):
+        ''' Parse one frame received at time '''
+        parsed = {'time': int(time)}
+        try:
+            parsed.update(self.parse_frame(frame))
+        except (TypeError, AttributeError) as e:  # e.g. float, null or nested blocks
+            raise ValueError('Frame invalid: got {}, allow list of int blocks'.format(frame)) from e
+        return parsed
+
+    def read_line(self, line):
+        ''' Parse one capture line 'time;[b0, b1, ...]' '''
+        time, frame = line.split(';')
+        return self.read_stream(time, json.loads(frame))
+
+    def iter_text(self, filepath_or_buffer, quarantine=None):
+        ''' Lazy parse of a capture file, see read_sens_text for quarantine '''
+        with open(file=filepath_or_buffer, mode='rt', encoding='utf-8') as fodata:
+            for lineno, line in enumerate(fodata):
+                if quarantine is None:
+                    yield self.read_line(line)
+                    continue
+                try:
+                    parsed_line = self.read_line(line)
+                except ValueError as e:
+                    quarantine.append((lineno, line, e))
+                    continue
+                yield parsed_line
+
+    def decode_array(self, time, frames, sizes=None, fields_out=['date', 'data'], kinds=None):
+        """
+        decode_array used to decode N frames at once, grouped by kind
+
+        Parameters
+        ----------
+        time : array like, shape (N,)
+        frames : numpy.ndarray, shape (N, max_length)
+            frames padded after sizes
+        sizes : numpy.ndarray, shape (N,), optional
+            number of blocks of each frame, default max_length
+        kinds : collection of str, optional
+            kinds decoded, frames of other kinds are neither decoded nor
+            validated, default all
+
+        Returns
+        -------
+        decoded : dict
+            {kind: {'row': rows of the frames, 'time': , field name: parsed array}}
+        rejected : numpy.ndarray
+            rows failing the vectorized validation, to be parsed one by one
+        """
+        time = np.asarray(time, dtype=np.int64)
+        frames = np.asarray(frames)
+        if sizes is None:
+            sizes = np.full(len(frames), frames.shape[1])
+        frame_objs, index = self.parse_type_array(frames)
+        decoded = {}
+        rejected = []
+        for i, frame_obj in enumerate(frame_objs):
+            if kinds is not None and frame_obj._kind not in kinds:
+                continue
+            rows = np.flatnonzero(index == i)
+            if len(rows) == 0:
+                continue
+            valid, parsed = frame_obj._parse_array(frames[rows], sizes[rows], fields_out=fields_out)
+            rejected.append(rows[~valid])
+            kind = parsed.pop('kind')
+            parsed = {name: field_parsed[valid] for name, field_parsed in parsed.items()}
+            decoded[kind] = dict(row=rows[valid], time=time[rows[valid]], **parsed)
+        rejected = np.sort(np.concatenate(rejected)) if rejected else np.zeros(0, dtype=np.int64)
+        return decoded, rejected
+
+    def frame_types(self):
+        ''' Frame objects of the protocol, unknown excluded '''
+        return self._frame_objs[1:]
+
+
+PROTOCOLS = {}
+
+
+def register_protocol(protocol, replace=False):
+    ''' Add protocol to the registry under protocol.name '''
+    if protocol.name in PROTOCOLS and not replace:
+        raise ValueError('protocol {} already registered, use replace=True'.format(protocol.name))
+    PROTOCOLS[protocol.name] = protocol
+    return protocol
+
+
+def get_protocol(name):
+    try:
+        return PROTOCOLS[name]
+    except KeyError:
+        raise ValueError('protocol invalid: got {}, allow {}'.format(name, list(PROTOCOLS)))
+
+
+def list_protocols():
+    return list(PROTOCOLS)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import math
+import numpy as np
+
+RESAMPLE_METHODS = ('nearest', 'linear', 'mean')
+
+
+def _resample_nearest(time, values, grid, max_gap):
+    right = np.searchsorted(time, grid, side='left')  # first sample >= grid point
+    left = np.maximum(right - 1, 0)
+    pick = np.where(grid - time[left] <= time[right] - grid, left, right)
+    return _mask_gaps(values[pick], time, left, right, grid, max_gap)
+
+
+def _resample_linear(time, values, grid, max_gap):
+    right = np.searchsorted(time, grid, side='left')
+    left = np.maximum(right - 1, 0)
+    span = time[right] - time[left]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(span > 0, (grid - time[left]) / span, 1.0)[:, None]
+    resampled = values[left] * (1 - weight) + values[right] * weight
+    return _mask_gaps(resampled, time, left, right, grid, max_gap)
+
+
+def _mask_gaps(resampled, time, left, right, grid, max_gap):
+    ''' NaN at grid points between 2 samples further apart than max_gap '''
+    if max_gap is None:
+        return resampled
+    gap = (time[right] - time[left] > max_gap) & (time[right] != grid)
+    resampled[gap] = np.nan
+    return resampled
+
+
+def _resample_mean(values, bins, k_first, n_bins):
+    ''' Mean of the samples of each bin k_first + i, NaN for empty bins '''
+    index = bins - k_first
+    keep = (index >= 0) & (index < n_bins)
+    index = index[keep]
+    counts = np.bincount(index, minlength=n_bins)
+    sums = np.stack([np.bincount(index, weights=channel, minlength=n_bins)
+                     for channel in values[keep].T], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts[:, None]
+
+
+class StreamResampler:
+    """ StreamResampler
+    Streaming resampling of timestamped (N, channels) samples pushed by
+    chunks to the grid k * period.
+
+    Parameters
+    ----------
+    period : int or float
+        grid step, in the unit of the sample times
+    method : str
+        - nearest: sample closest to each grid point, the earlier on ties
+        - linear: linear interpolation between the 2 samples around each
+          grid point
+        - mean: mean of the samples of each bin [k * period, (k + 1) * period),
+          labelled k * period, NaN for empty bins
+    max_gap : float, optional
+        nearest and linear give NaN at grid points between 2 samples further
+        apart than max_gap, default no limit
+    channels : int
+        number of channels of the samples
+
+    Notes
+    ----------
+    A grid point is emitted once the samples around it are known (its bin
+    is complete for mean), the samples still needed are carried to the
+    next push, so the output does not depend on how the samples are
+    chunked. Sample times are made non decreasing: a sample older than
+    one pushed before takes its time.
+
+    Examples
+    ----------
+    >>> resampler = StreamResampler(period=40, method='linear')
+    >>> for time, samples in chunks:
+    ...     resampled = resampler.push(time, samples)
+    >>> resampled = resampler.flush()
+    """
+
+    def __init__(self, period, method='linear', max_gap=None, channels=1):
+        if method not in RESAMPLE_METHODS:
+            raise ValueError('method invalid: got {}, allow {}'.format(method, RESAMPLE_METHODS))
+        if not period > 0:
+            raise ValueError('period should be > 0: got {}'.format(period))
+        self.period = period
+        self.method = method
+        self.max_gap = max_gap
+        self.channels = channels
+        self._time = np.zeros(0)
+        self._values = np.zeros((0, channels))
+        self._k = None  # grid index of the next point emitted
+
+    def _output(self, k_first, k_stop, values):
+        return {'k': np.arange(k_first, k_stop),
+                'time': np.arange(k_first, k_stop) * self.period,
+                'data': values}
+
+    def _empty(self):
+        return self._output(0, 0, np.zeros((0, self.channels)))
+
+    def push(self, time, samples):
+        """
+        Parameters
+        ----------
+        time : array like, shape (N,)
+            sample times
+        samples : array like, shape (N,) or (N, channels)
+
+        Returns
+        -------
+        resampled : dict
+            {'k': grid indices, 'time': grid times, 'data': (M, channels)}
+            of the grid points completed by the samples
+        """
+        time = np.asarray(time, dtype=np.float64)
+        samples = np.asarray(samples, dtype=np.float64).reshape(len(time), self.channels)
+        if len(self._time):
+            time = np.maximum(time, self._time[-1])
+            time = np.concatenate([self._time, np.maximum.accumulate(time)])
+            samples = np.concatenate([self._values, samples])
+        elif len(time):
+            time = np.maximum.accumulate(time)
+        if len(time) == 0:
+            return self._empty()
+        if self._k is None:
+            first = time[0] / self.period
+            self._k = math.floor(first) if self.method == 'mean' else math.ceil(first)
+        last = time[-1] / self.period
+        k_stop = math.floor(last) if self.method == 'mean' else math.floor(last) + 1
+        k_first = self._k
+        if k_stop <= k_first:
+            self._time, self._values = time, samples
+            return self._empty()
+        grid = np.arange(k_first, k_stop) * self.period
+        next_point = k_stop * self.period
+        if self.method == 'mean':
+            bins = np.floor(time / self.period).astype(np.int64)
+            resampled = _resample_mean(samples, bins, k_first, k_stop - k_first)
+            carried = np.searchsorted(time, next_point, side='left')
+        else:
+            method = _resample_nearest if self.method == 'nearest' else _resample_linear
+            resampled = method(time, samples, grid, self.max_gap)
+            carried = max(np.searchsorted(time, next_point, side='left') - 1, 0)
+        self._time, self._values = time[carried:], samples[carried:]
+        self._k = k_stop
+        return self._output(k_first, k_stop, resampled)
+
+    def flush(self):
+        ''' Emit the last, incomplete, bin of mean, nothing for nearest and linear '''
+        if self.method != 'mean' or len(self._time) == 0:
+            return self._empty()
+        k_first = self._k
+        k_stop = math.floor(self._time[-1] / self.period) + 1
+        bins = np.floor(self._time / self.period).astype(np.int64)
+        resampled = _resample_mean(self._values, bins, k_first, k_stop - k_first)
+        self._time, self._values = self._time[:0], self._values[:0]
+        self._k = k_stop
+        return self._output(k_first, k_stop, resampled)
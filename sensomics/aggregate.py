@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from wearableio.options import get_option
+from wearableio.sensomics.io import data_columns, decode_sens_tokens
+from wearableio.sensomics.settings import SENSOMICS_DATED_KINDS, SENSOMICS_SUMMARY_COLUMNS
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+
+FREQ_UNIT = {'D': 'datetime64[D]', 'h': 'datetime64[h]'}
+TIME_UNIT = {'s': 1, 'ms': 1000, 'us': 1000000}
+
+
+class SensSummary:
+    """ SensSummary
+    Streaming rollup of record and activity frames per day or per hour.
+
+    Each (bucket, kind, metric) keeps [count, sum, min, max] only, so the
+    memory does not depend on the number of frames summarized.
+
+    Parameters
+    ----------
+    freq : str
+        bucket size, 'D' for day or 'h' for hour
+    time_unit : str
+        unit of the 'time' of frames, used to bucket frames without date field
+    columns : dict
+        {kind: data columns summarized}, default SENSOMICS_SUMMARY_COLUMNS
+
+    Notes
+    ----------
+    Dated kinds are bucketed by their device date field, the other kinds
+    by their 'time'. recordSleep minutes are rolled up per sleep type as
+    metrics 'sleep_minute_<type>'.
+
+    Examples
+    ----------
+    >>> summary = SensSummary(freq='D')
+    >>> for record in iter_sens_text(path):
+    ...     summary.update(record)
+    >>> summary.result()
+    """
+
+    def __init__(self, freq='D', time_unit='ms', columns=None):
+        if freq not in FREQ_UNIT:
+            raise ValueError('freq invalid: got {}, allow {}'.format(freq, list(FREQ_UNIT)))
+        if time_unit not in TIME_UNIT:
+            raise ValueError('time_unit invalid: got {}, allow {}'.format(time_unit, list(TIME_UNIT)))
+        self.freq = freq
+        self.time_unit = time_unit
+        self.columns = SENSOMICS_SUMMARY_COLUMNS if columns is None else columns
+        self._index = {kind: [data_columns(kind).index(column) for column in kind_columns]
+                       for kind, kind_columns in self.columns.items()}
+        self._stats = {}
+
+    def _bucket_of_time(self, time):
+        seconds = np.asarray(time, dtype=np.int64) // TIME_UNIT[self.time_unit]
+        return seconds.astype('datetime64[s]').astype(FREQ_UNIT[self.freq])
+
+    def _bucket_of_date(self, date):
+        if isinstance(date, str):
+            date = datetime.strptime(date, get_option('date.strftime'))
+        elif isinstance(date, (int, np.integer)):
+            date = np.datetime64(int(date), 's')
+        return np.datetime64(date, 's').astype(FREQ_UNIT[self.freq])
+
+    def _merge(self, key, count, total, minimum, maximum):
+        try:
+            stats = self._stats[key]
+        except KeyError:
+            self._stats[key] = [count, total, minimum, maximum]
+            return
+        stats[0] += count
+        stats[1] += total
+        stats[2] = min(stats[2], minimum)
+        stats[3] = max(stats[3], maximum)
+
+    def _metrics(self, kind, values):
+        ''' (metric, value column, row mask) rolled up for kind '''
+        if kind == 'recordSleep':
+            sleep_type = values[:, 0]
+            for each_type in np.unique(sleep_type):
+                yield 'sleep_minute_{}'.format(int(each_type)), values[:, 1], sleep_type == each_type
+            return
+        for column, index in zip(self.columns[kind], self._index[kind]):
+            yield column, values[:, index], None
+
+    def update(self, record):
+        ''' Add one parsed frame, as read_sens_stream output '''
+        kind = record['kind']
+        if kind not in self.columns:
+            return
+        if kind in SENSOMICS_DATED_KINDS:
+            bucket = self._bucket_of_date(record['date'][0])
+        else:
+            bucket = self._bucket_of_time(record['time'])
+        values = np.array([record['data']], dtype=np.float64)
+        for metric, column, mask in self._metrics(kind, values):
+            if mask is not None and not mask[0]:
+                continue
+            value = column[0]
+            self._merge((bucket, kind, metric), 1, value, value, value)
+
+    def update_columns(self, columns):
+        ''' Add per kind columns, as read_sens_columns output, vectorized '''
+        for kind, kind_columns in columns.items():
+            if kind not in self.columns or len(kind_columns['time']) == 0:
+                continue
+            if kind in SENSOMICS_DATED_KINDS:
+                bucket = kind_columns['date'].astype(FREQ_UNIT[self.freq])
+            else:
+                bucket = self._bucket_of_time(kind_columns['time'])
+            values = kind_columns['data'].astype(np.float64)
+            for metric, column, mask in self._metrics(kind, values):
+                metric_bucket = bucket if mask is None else bucket[mask]
+                column = column if mask is None else column[mask]
+                buckets, inverse = np.unique(metric_bucket, return_inverse=True)
+                order = np.argsort(inverse, kind='stable')
+                starts = np.searchsorted(inverse[order], np.arange(len(buckets)))
+                count = np.bincount(inverse, minlength=len(buckets))
+                total = np.bincount(inverse, weights=column, minlength=len(buckets))
+                minimum = np.minimum.reduceat(column[order], starts)
+                maximum = np.maximum.reduceat(column[order], starts)
+                for i, each_bucket in enumerate(buckets):
+                    self._merge((each_bucket, kind, metric), int(count[i]), total[i],
+                                minimum[i], maximum[i])
+
+    def result(self):
+        """
+        Returns
+        -------
+        summary : pandas.DataFrame
+            index (bucket, kind, metric), columns count, sum, min, max, mean
+        """
+        index = pd.MultiIndex.from_tuples(sorted(self._stats), names=['bucket', 'kind', 'metric'])
+        stats = np.array([self._stats[key] for key in index], dtype=np.float64).reshape(-1, 4)
+        summary = pd.DataFrame(stats, index=index, columns=['count', 'sum', 'min', 'max'])
+        summary['count'] = summary['count'].astype(np.int64)
+        summary['mean'] = summary['sum'] / summary['count']
+        return summary
+
+
+def summarize_sens_text(filepath_or_buffer, freq='D', time_unit='ms', quarantine=None,
+                        chunk_size=1 << 24):
+    """
+    summarize_sens_text used to roll up a capture file while decoding it,
+    by chunks, without keeping the decoded frames
+
+    Returns
+    -------
+    summary : pandas.DataFrame
+        see SensSummary.result
+    """
+    summary = SensSummary(freq=freq, time_unit=time_unit)
+    for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size):
+        tokens = tokenize_sens_bytes(chunk)
+        summary.update_columns(decode_sens_tokens(tokens, chunk, first_line, quarantine))
+    return summary.result()
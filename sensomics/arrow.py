@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import warnings
+import numpy as np
+from wearableio.sensomics.io import data_columns, decode_sens_tokens, read_sens_columns, _write
+from wearableio.sensomics.settings import SENSOMICS_DATA_SCHEMA, SENSOMICS_DATED_KINDS
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+ARROW_FORMATS = ('parquet', 'feather')
+DATA_LAYOUTS = ('columns', 'list')
+
+
+def _field_metadata(unit):
+    return None if unit is None else {'unit': unit}
+
+
+def arrow_schema(kind, data_layout='columns', fields_out=['date', 'data']):
+    """
+    arrow_schema used to build the pyarrow schema of the columns of kind
+
+    Units of SENSOMICS_DATA_SCHEMA are kept as field metadata 'unit', the
+    frame kind and the data columns as schema metadata.
+
+    Parameters
+    ----------
+    data_layout : str
+        - columns: one field per data column, e.g. hr for recordHR
+        - list: one fixed size list field 'data'
+    fields_out : list
+        fields besides time, 'date' for dated kinds only, see read_sens_columns
+    """
+    if data_layout not in DATA_LAYOUTS:
+        raise ValueError('data_layout invalid: got {}, allow {}'.format(data_layout, DATA_LAYOUTS))
+    schema = SENSOMICS_DATA_SCHEMA[kind]
+    names = data_columns(kind)
+    units = schema['units'] or [None] * len(names)
+    dtype = pa.from_numpy_dtype(np.dtype(schema['dtype']))
+    fields = [pa.field('time', pa.int64(), nullable=False)]
+    if kind in SENSOMICS_DATED_KINDS and 'date' in fields_out:
+        fields.append(pa.field('date', pa.timestamp('s'), nullable=False))
+    if 'data' in fields_out and data_layout == 'columns':
+        fields.extend(pa.field(name, dtype, nullable=False, metadata=_field_metadata(unit))
+                      for name, unit in zip(names, units))
+    elif 'data' in fields_out:
+        fields.append(pa.field('data', pa.list_(dtype, len(names)), nullable=False))
+    metadata = {'kind': kind, 'protocol': 'sensomics',
+                'columns': json.dumps(names), 'units': json.dumps(units)}
+    return pa.schema(fields, metadata=metadata)
+
+
+def columns_to_arrow(kind, columns, data_layout='columns'):
+    """
+    columns_to_arrow used to hand per kind columns to a pyarrow.Table
+
+    time, date and the 'list' data layout wrap the numpy buffers without
+    copy. The 'columns' layout copies the row major (N, width) data once
+    to column major, each data column is then wrapped without copy.
+
+    The table has the fields of columns only, e.g. time and data for
+    read_sens_columns(path, fields_out=['data']).
+    """
+    schema = arrow_schema(kind, data_layout, fields_out=[name for name in ('date', 'data') if name in columns])
+    arrays = [pa.array(columns['time'], type=pa.int64())]
+    if 'date' in columns:
+        arrays.append(pa.array(columns['date'].astype('datetime64[s]', copy=False), type=pa.timestamp('s')))
+    if 'data' not in columns:
+        return pa.Table.from_arrays(arrays, schema=schema)
+    data = columns['data']
+    dtype = schema.field(len(arrays)).type
+    if data_layout == 'columns':
+        data = np.ascontiguousarray(data.T) if data.shape[1] > 1 else data.reshape(1, -1)
+        arrays.extend(pa.array(data_column, type=dtype) for data_column in data)
+    else:
+        values = pa.array(np.ascontiguousarray(data).ravel(), type=dtype.value_type)
+        arrays.append(pa.FixedSizeListArray.from_arrays(values, data.shape[1]))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class SensArrowWriter:
+    """ SensArrowWriter
+    Streaming writer of per kind columns to one '<kind>.<format_out>' file
+    per kind in directory path_out, each write_columns appends a parquet
+    row group or an arrow record batch per kind.
+
+    Parameters
+    ----------
+    path_out : str
+        output directory
+    format_out : str
+        parquet or feather (arrow IPC file)
+    data_layout : str
+        see arrow_schema
+
+    Examples
+    ----------
+    >>> with SensArrowWriter('out.parquet', 'parquet') as writer:
+    ...     for columns in chunks:
+    ...         writer.write_columns(columns)
+    """
+
+    def __init__(self, path_out, format_out='parquet', data_layout='columns', compression='snappy'):
+        if pa is None:
+            raise ImportError('SensArrowWriter requires pyarrow')
+        if format_out not in ARROW_FORMATS:
+            raise ValueError('format_out invalid: got {}, allow {}'.format(format_out, ARROW_FORMATS))
+        self.path_out = path_out
+        self.format_out = format_out
+        self.data_layout = data_layout
+        self.compression = compression
+        self.n_rows = 0
+        self._writers = {}
+        os.makedirs(path_out, exist_ok=True)
+
+    def _writer(self, kind, schema, file_name):
+        try:
+            return self._writers[kind]
+        except KeyError:
+            pass
+        if self.format_out == 'parquet':
+            writer = pa.parquet.ParquetWriter(file_name, schema, compression=self.compression)
+        else:
+            writer = pa.ipc.new_file(file_name, schema)
+        self._writers[kind] = writer
+        return writer
+
+    def _write_table(self, table, file_name, kind):
+        self._writer(kind, table.schema, file_name).write_table(table)
+
+    def write_columns(self, columns):
+        ''' Append per kind columns, as read_sens_columns output, each table written traced as io write '''
+        for kind, kind_columns in columns.items():
+            if len(kind_columns['time']) == 0:
+                continue
+            table = columns_to_arrow(kind, kind_columns, self.data_layout)
+            file_name = os.path.join(self.path_out, '{}.{}'.format(kind, self.format_out))
+            _write(self._write_table, table, file_name, kind)
+            self.n_rows += table.num_rows
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _write_npz_tables(columns, path_out):
+    ''' One '<kind>.npz' per kind in directory path_out, with columns and units '''
+    os.makedirs(path_out, exist_ok=True)
+    for kind, kind_columns in columns.items():
+        units = SENSOMICS_DATA_SCHEMA[kind]['units'] or [None] * len(data_columns(kind))
+        file_name = os.path.join(path_out, '{}.npz'.format(kind))
+        with open(file_name, 'wb') as f:
+            np.savez(f, kind=np.array(kind), columns=np.array(data_columns(kind)),
+                     units=np.array([str(unit) for unit in units]), **kind_columns)
+
+
+def write_sens_arrow(filepath_or_buffer, path_out, format_out='parquet', quarantine=None,
+                     data_layout='columns', chunk_size=1 << 24):
+    """
+    write_sens_arrow used to convert a capture file to per kind parquet or
+    arrow IPC (feather) files while decoding it by chunks, one row group
+    per chunk, see SensArrowWriter
+
+    Without pyarrow, the columns are written as per kind '<kind>.npz'
+    instead, with a warning.
+
+    Returns
+    -------
+    n_parsed : int
+        number of records written
+    """
+    if pa is None:
+        warnings.warn('pyarrow is not installed, writing {} as npz'.format(path_out))
+        columns = read_sens_columns(filepath_or_buffer, quarantine=quarantine, chunk_size=chunk_size)
+        _write(_write_npz_tables, columns, path_out)
+        return sum(len(kind_columns['time']) for kind_columns in columns.values())
+    with SensArrowWriter(path_out, format_out, data_layout=data_layout) as writer:
+        for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size):
+            tokens = tokenize_sens_bytes(chunk)
+            writer.write_columns(decode_sens_tokens(tokens, chunk, first_line, quarantine))
+    return writer.n_rows
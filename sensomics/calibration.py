@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import numpy as np
+from wearableio.sensomics.io import SENSOMICS_PROTOCOL
+from wearableio.sensomics.settings import SENSOMICS_CALIBRATION
+
+CALIBRATION_KEYS = ('gain', 'offset', 'sensitivity')
+
+
+def _decode_sensitivity(kind):
+    ''' Sensitivity the frames of kind are decoded with, in g per count '''
+    for frame_obj in SENSOMICS_PROTOCOL.frame_types():
+        if frame_obj._kind == kind:
+            return frame_obj.sensitivity
+    raise ValueError('kind invalid: got {}, allow {}'.format(kind, list(SENSOMICS_CALIBRATION)))
+
+
+def raw_counts(kind, data):
+    ''' Raw counts of decoded data of kind, exact as decoded = counts * sensitivity '''
+    return np.rint(np.asarray(data, dtype=np.float64) / _decode_sensitivity(kind)).astype(np.int64)
+
+
+class SensCalibration:
+    """ SensCalibration
+    Per device calibration tables of the acceleration streams, applied to
+    whole decoded columns in one vectorized step.
+
+    physical = (raw - offset) * sensitivity * gain, per data column, where
+    gain, offset and sensitivity are scalars or one value per column.
+
+    Parameters
+    ----------
+    tables : dict, optional
+        {device: {kind: {'gain', 'offset', 'sensitivity'}}}, kinds or keys
+        missing for a device fall back to SENSOMICS_CALIBRATION
+
+    Notes
+    ----------
+    apply keeps the raw counts as column 'raw' of the kinds calibrated, so
+    another calibration can be applied later without decoding again.
+
+    Examples
+    ----------
+    >>> calibration = SensCalibration()
+    >>> calibration.set('band-01', 'streamACX', offset=12, gain=1.02)
+    >>> columns = calibration.apply(read_sens_columns(path), device='band-01')
+    >>> columns = calibration.apply(columns, device='band-02')  # from 'raw'
+    """
+
+    def __init__(self, tables=None):
+        self.tables = {}
+        for device, kinds in (tables or {}).items():
+            for kind, table in kinds.items():
+                self.set(device, kind, **table)
+
+    def set(self, device, kind, **table):
+        if kind not in SENSOMICS_CALIBRATION:
+            raise ValueError('kind invalid: got {}, allow {}'.format(kind, list(SENSOMICS_CALIBRATION)))
+        for key in table:
+            if key not in CALIBRATION_KEYS:
+                raise ValueError('calibration key invalid: got {}, allow {}'.format(key, CALIBRATION_KEYS))
+        self.tables.setdefault(device, {}).setdefault(kind, {}).update(
+            {key: np.asarray(val, dtype=np.float64) for key, val in table.items()})
+
+    def table(self, device, kind):
+        ''' Calibration of kind for device, defaults filled in '''
+        table = dict(SENSOMICS_CALIBRATION[kind])
+        table.update(self.tables.get(device, {}).get(kind, {}))
+        return table
+
+    def to_physical(self, kind, raw, device=None):
+        ''' Physical values of (N, width) raw counts of kind '''
+        table = self.table(device, kind)
+        scale = np.asarray(table['sensitivity'], dtype=np.float64) * table['gain']
+        return (np.asarray(raw, dtype=np.float64) - table['offset']) * scale
+
+    def apply(self, columns, device=None):
+        """
+        Parameters
+        ----------
+        columns : dict
+            per kind columns, as read_sens_columns output
+        device : str, optional
+            device of the columns, None for the default calibration
+
+        Returns
+        -------
+        columns : dict
+            shallow copy of columns, data of the calibrated kinds replaced by
+            physical values and their counts kept as 'raw'
+        """
+        calibrated = {}
+        for kind, kind_columns in columns.items():
+            kind_columns = dict(kind_columns)
+            if kind in SENSOMICS_CALIBRATION:
+                if 'raw' not in kind_columns:
+                    kind_columns['raw'] = raw_counts(kind, kind_columns['data'])
+                kind_columns['data'] = self.to_physical(kind, kind_columns['raw'], device)
+            calibrated[kind] = kind_columns
+        return calibrated
+
+    def to_dict(self):
+        return {device: {kind: {key: val.tolist() for key, val in table.items()}
+                         for kind, table in kinds.items()}
+                for device, kinds in self.tables.items()}
+
+    @classmethod
+    def from_dict(cls, tables):
+        return cls(copy.deepcopy(tables))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+import numpy as np
+from wearableio.sensomics.io import (SensColumnBuilder, decode_sens_tokens,
+                                     estimate_sens_text, _flatten)
+from wearableio.sensomics.settings import SENSOMICS_DEDUP_KINDS
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+
+class SensDeduplicator:
+    """ SensDeduplicator
+    Streaming removal of the record frames retransmitted by the band,
+    keyed on frame kind, date field and data.
+
+    Keys are kept in a bounded LRU set per kind: a lookup is O(1) and memory
+    is bounded by capacity keys per kind. A retransmission is caught as long
+    as its key is among the capacity keys of its kind seen last.
+
+    Parameters
+    ----------
+    kinds : list of str, optional
+        kinds deduplicated, default SENSOMICS_DEDUP_KINDS, other kinds pass
+    capacity : int
+        number of keys kept per kind
+
+    Notes
+    ----------
+    Records (read_sens_text) and columns (read_sens_columns) are keyed
+    differently, use one deduplicator per layout.
+
+    Examples
+    ----------
+    >>> dedup = SensDeduplicator(capacity=1 << 16)
+    >>> records = list(dedup.filter(iter_sens_text(path)))
+    >>> columns = SensDeduplicator().filter_columns(read_sens_columns(path))
+    """
+
+    def __init__(self, kinds=None, capacity=1 << 16):
+        if not capacity > 0:
+            raise ValueError('capacity should be > 0: got {}'.format(capacity))
+        self.kinds = SENSOMICS_DEDUP_KINDS if kinds is None else tuple(kinds)
+        self.capacity = capacity
+        self.n_seen = 0
+        self.n_duplicates = 0
+        self._keys = OrderedDict()
+
+    def seen(self, kind, key):
+        ''' True if key of kind was seen, key is then the most recent one '''
+        keys = self._keys.get(kind)
+        if keys is None:
+            keys = self._keys[kind] = OrderedDict()
+        duplicate = key in keys
+        self.n_seen += 1
+        if duplicate:
+            keys.move_to_end(key)
+            self.n_duplicates += 1
+            return True
+        keys[key] = None
+        if len(keys) > self.capacity:
+            keys.popitem(last=False)
+        return False
+
+    def is_duplicate(self, parsed):
+        ''' True if the record, as read_sens_line output, is a retransmission '''
+        kind = parsed['kind']
+        if kind not in self.kinds:
+            return False
+        date = parsed.get('date')
+        date = tuple(date) if isinstance(date, list) else date
+        try:
+            return self.seen(kind, (date, tuple(parsed['data'])))
+        except TypeError:  # nested data
+            return self.seen(kind, (date, tuple(_flatten(parsed['data']))))
+
+    def filter(self, parsed):
+        ''' Records of parsed not retransmitted, lazily '''
+        for record in parsed:
+            if not self.is_duplicate(record):
+                yield record
+
+    def _row_keys(self, kind_columns):
+        ''' bytes of date and data of each row '''
+        n_rows = len(kind_columns['time'])
+        blocks = []
+        if 'date' in kind_columns:
+            date = np.asarray(kind_columns['date']).astype('datetime64[s]').view(np.int64)
+            blocks.append(np.ascontiguousarray(date).view(np.uint8).reshape(n_rows, -1))
+        if 'data' in kind_columns:
+            data = np.ascontiguousarray(kind_columns['data'])
+            blocks.append(data.view(np.uint8).reshape(n_rows, -1))
+        rows = np.ascontiguousarray(np.concatenate(blocks, axis=1))
+        return rows.view(np.dtype((np.void, rows.shape[1]))).ravel().tolist()
+
+    def filter_columns(self, columns):
+        """
+        Parameters
+        ----------
+        columns : dict
+            per kind columns, as read_sens_columns output
+
+        Returns
+        -------
+        columns : dict
+            columns without the rows retransmitted, kinds not deduplicated
+            passed as is
+        """
+        filtered = {}
+        for kind, kind_columns in columns.items():
+            if kind not in self.kinds or len(kind_columns['time']) == 0:
+                filtered[kind] = kind_columns
+                continue
+            keep = np.array([not self.seen(kind, key) for key in self._row_keys(kind_columns)],
+                            dtype=bool)
+            if keep.all():
+                filtered[kind] = kind_columns
+            else:
+                filtered[kind] = {name: column[keep] for name, column in kind_columns.items()}
+        return filtered
+
+
+def dedup_sens(filepath_or_buffer, quarantine=None, kinds=None, capacity=1 << 16,
+               chunk_size=1 << 24):
+    """
+    dedup_sens used to decode a capture file to per kind columns without
+    the record frames retransmitted, as read_sens_columns, chunk by chunk
+
+    Parameters
+    ----------
+    kinds, capacity : see SensDeduplicator
+
+    Returns
+    -------
+    columns : dict
+        see read_sens_columns, the first copy of each record kept
+    """
+    dedup = SensDeduplicator(kinds, capacity)
+    estimate = estimate_sens_text(filepath_or_buffer)
+    builder = SensColumnBuilder(estimate['kinds'])
+    for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size):
+        tokens = tokenize_sens_bytes(chunk)
+        builder.extend_columns(dedup.filter_columns(
+            decode_sens_tokens(tokens, chunk, first_line, quarantine)))
+    return builder.columns()
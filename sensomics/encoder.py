@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+from functools import partial
+import os
+import socket
+import time as _time
+import numpy as np
+from wearableio.sensomics.io import SENSOMICS_PROTOCOL
+from wearableio.sensomics.settings import SENSOMICS_DATA_SCHEMA, SENSOMICS_DATED_KINDS
+
+
+FRAME_LENGTH = 20
+# length field sent by the band for frames with kind and user fields
+DEFAULT_LENGTH_FIELD = 14
+HEADER_FIELDS = ('head field', 'length field', 'kind field', 'user field')
+
+
+def _frame_obj(kind):
+    for frame_obj in SENSOMICS_PROTOCOL.frame_types():
+        if frame_obj._kind == kind:
+            return frame_obj
+    raise ValueError('kind invalid: got {}, allow {}'.format(
+        kind, [frame_obj._kind for frame_obj in SENSOMICS_PROTOCOL.frame_types()]))
+
+
+def sens_frame_header(kind):
+    """
+    sens_frame_header used to get the constant blocks of a frame kind, taken
+    from the fixed validators of its head, length, kind and user fields
+
+    Returns
+    -------
+    header : dict
+        {offset: block}
+    """
+    header = {}
+    frame_obj = _frame_obj(kind)
+    for field in frame_obj:
+        if field.name not in HEADER_FIELDS:
+            continue
+        validator = field.validator
+        offset = field.offset
+        start = offset.start if isinstance(offset, slice) else offset
+        if isinstance(validator, list) and all(isinstance(val, int) for val in validator):
+            for i, val in enumerate(validator):
+                header[start + i] = val
+        elif field.name == 'length field':
+            header[start] = DEFAULT_LENGTH_FIELD >> 8
+            header[start + 1] = DEFAULT_LENGTH_FIELD & 0xff
+    return header
+
+
+def _put(frames, offset, values, name, low=0, high=0xff):
+    ''' Write values to the block offset of frames, after range validation '''
+    values = np.asarray(values)
+    if len(values) and (values.min() < low or values.max() > high):
+        bad = values[(values < low) | (values > high)][0]
+        raise ValueError('{} invalid: got {}, allow [{}, {}]'.format(name, bad, low, high))
+    frames[:, offset] = values
+
+
+def _put_int(frames, offsets, values, name, little=False):
+    ''' Write unsigned values on len(offsets) blocks, big endian by default '''
+    width = len(offsets)
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (values.min() < 0 or values.max() >= 1 << (8 * width)):
+        bad = values[(values < 0) | (values >= 1 << (8 * width))][0]
+        raise ValueError('{} invalid: got {}, allow [0, {}]'.format(name, bad, (1 << (8 * width)) - 1))
+    order = offsets[::-1] if little else offsets
+    for i, offset in enumerate(order):
+        frames[:, offset] = values >> (8 * (width - 1 - i)) & 0xff
+
+
+def _put_centi(frames, offset, values, name):
+    ''' integer + decimal / 100 on 2 blocks, see join_integer_decimal '''
+    centi = np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+    _put(frames, offset, centi // 100, name)
+    frames[:, offset + 1] = centi % 100
+
+
+def _put_date(frames, offset, date, seconds=False):
+    ''' Inverse of join_date_blocks_array, minute resolution unless seconds '''
+    date = np.asarray(date).astype('datetime64[s]')
+    year = date.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = date.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    day = (date.astype('datetime64[D]') - date.astype('datetime64[M]')).astype(np.int64) + 1
+    hour = (date.astype('datetime64[h]') - date.astype('datetime64[D]')).astype(np.int64)
+    minute = (date.astype('datetime64[m]') - date.astype('datetime64[h]')).astype(np.int64)
+    _put(frames, offset, year - 2000, 'year')
+    frames[:, offset + 1] = month
+    frames[:, offset + 2] = day
+    frames[:, offset + 3] = hour
+    frames[:, offset + 4] = minute
+    if seconds:
+        frames[:, offset + 5] = (date - date.astype('datetime64[m]')).astype(np.int64)
+
+
+def _encode_record_byte(frames, data):
+    _put(frames, 11, data[:, 0], 'data')
+
+
+def _encode_record_st(frames, data):
+    _put_centi(frames, 11, data[:, 0], 'st')
+
+
+def _encode_record_bp(frames, data):
+    _put(frames, 11, data[:, 0], 'bp_high')
+    _put(frames, 12, data[:, 1], 'bp_low')
+
+
+def _encode_record_sleep(frames, data):
+    _put(frames, 11, data[:, 0], 'sleep_type')
+    _put_int(frames, [12, 13], data[:, 1], 'sleep_minute')
+
+
+def _encode_state_tag(frames, data):
+    _put_date(frames, 6, data[:, 0], seconds=True)
+
+
+def _encode_state_multi_measure(frames, data):
+    _put(frames, 6, data[:, 0], 'hr')
+    _put(frames, 7, data[:, 1], 'spo2')
+    _put(frames, 8, data[:, 2], 'bp_high')
+    _put(frames, 9, data[:, 3], 'bp_low')
+    _put_centi(frames, 11, data[:, 4], 'st')
+
+
+def _encode_state_activity(frames, data):
+    _put_int(frames, [6, 7, 8], data[:, 0], 'step')
+    _put_int(frames, [9, 10, 11], data[:, 1], 'calorie')
+    for offset, column, name in [(12, 2, 'shallow_sleep_minute'), (14, 3, 'deep_sleep_minute')]:
+        # hours * 60 + minutes, minutes may exceed 59 past 255 hours
+        hours = np.clip(data[:, column] // 60, 0, 0xff)
+        frames[:, offset] = hours
+        _put(frames, offset + 1, data[:, column] - hours * 60, name)
+    _put(frames, 16, data[:, 4], 'wake_up_time')
+
+
+def _encode_stream_ppg(frames, data):
+    for i in range(8):
+        _put_int(frames, [4 + 2 * i, 5 + 2 * i], data[:, i], 'ppg', little=True)
+
+
+def _encode_stream_ac(frames, data, kind):
+    sensitivity = _frame_obj(kind).sensitivity
+    adc = np.rint(np.asarray(data, dtype=np.float64) / sensitivity).astype(np.int64)
+    if len(adc) and (adc.min() < -(1 << 15) or adc.max() >= 1 << 15):
+        raise ValueError('acceleration invalid: got {}, allow [{}, {}]'.format(
+            np.abs(data).max(), -(1 << 15) * sensitivity, ((1 << 15) - 1) * sensitivity))
+    adc &= 0xffff
+    for i in range(5):
+        frames[:, 3 + 2 * i] = adc[:, i] & 0xff
+        frames[:, 4 + 2 * i] = adc[:, i] >> 8
+
+
+def _encode_raw(frames, data):
+    for i in range(data.shape[1]):
+        _put(frames, 6 + i, data[:, i], 'data')
+
+
+SENSOMICS_ENCODER = {
+    'recordHR': _encode_record_byte,
+    'recordSPO2': _encode_record_byte,
+    'recordST': _encode_record_st,
+    'recordBP': _encode_record_bp,
+    'recordSleep': _encode_record_sleep,
+    'stateTag': _encode_state_tag,
+    'stateMultiMeasure': _encode_state_multi_measure,
+    'stateActivity': _encode_state_activity,
+    'stateHR': _encode_raw,
+    'statePower': _encode_raw,
+    'stateBandInfo': _encode_raw,
+    'stateActivation': _encode_raw,
+    'stateBandInfoExtend': _encode_raw,
+    'streamHR': _encode_raw,
+    'streamPPG': _encode_stream_ppg,
+    'streamACX': partial(_encode_stream_ac, kind='streamACX'),
+    'streamACY': partial(_encode_stream_ac, kind='streamACY'),
+    'streamACZ': partial(_encode_stream_ac, kind='streamACZ'),
+}
+
+
+def encode_sens_array(kind, data, date=None):
+    """
+    encode_sens_array used to build N frames of kind from decoded values,
+    the inverse of the parse of kind
+
+    Parameters
+    ----------
+    kind : str
+        frame kind, in SENSOMICS_ENCODER
+    data : array like, shape (N, width)
+        data columns of kind in the order of SENSOMICS_DATA_SCHEMA, as the
+        'data' of read_sens_columns
+    date : array like of datetime64, shape (N,)
+        date field of the dated kinds, at minute resolution
+
+    Returns
+    -------
+    frames : numpy.ndarray of uint8, shape (N, 20)
+    """
+    if kind not in SENSOMICS_ENCODER:
+        raise ValueError('kind invalid: got {}, allow {}'.format(kind, list(SENSOMICS_ENCODER)))
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    if SENSOMICS_DATA_SCHEMA[kind]['dtype'] != 'datetime64[s]':
+        data = data.astype(np.float64 if kind in ('recordST', 'stateMultiMeasure') or
+                           kind.startswith('streamAC') else np.int64)
+    frames = np.zeros((len(data), FRAME_LENGTH), dtype=np.int64)
+    for offset, block in sens_frame_header(kind).items():
+        frames[:, offset] = block
+    if kind in SENSOMICS_DATED_KINDS:
+        if date is None:
+            raise ValueError('date is required by {}'.format(kind))
+        _put_date(frames, 6, date)
+    SENSOMICS_ENCODER[kind](frames, data)
+    return frames.astype(np.uint8)
+
+
+def encode_sens_frame(kind, data, date=None):
+    ''' encode_sens_array of one frame, as list of int '''
+    return encode_sens_array(kind, [data], None if date is None else [date])[0].tolist()
+
+
+def encode_sens_columns(columns):
+    """
+    encode_sens_columns used to encode per kind columns back to frames
+
+    Returns
+    -------
+    time : numpy.ndarray of int64, shape (N,)
+    frames : numpy.ndarray of uint8, shape (N, 20)
+        frames of all kinds, sorted by time
+    """
+    time, frames = [], []
+    for kind, kind_columns in columns.items():
+        time.append(np.asarray(kind_columns['time'], dtype=np.int64))
+        frames.append(encode_sens_array(kind, kind_columns['data'], kind_columns.get('date')))
+    if not time:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, FRAME_LENGTH), dtype=np.uint8)
+    time = np.concatenate(time)
+    order = np.argsort(time, kind='stable')
+    return time[order], np.concatenate(frames)[order]
+
+
+def random_sens_data(kind, n, seed=None):
+    """
+    random_sens_data used to draw n valid values of kind, for load tests
+
+    Returns
+    -------
+    data : numpy.ndarray, shape (n, width)
+    date : numpy.ndarray of datetime64[s], shape (n,), None if kind has no date
+    """
+    rng = np.random.default_rng(seed)
+    width = len(SENSOMICS_DATA_SCHEMA[kind]['columns'] or range(SENSOMICS_DATA_SCHEMA[kind]['width']))
+    minutes = rng.integers(0, 255 * 365 * 24 * 60, n)
+    date_min = np.datetime64('2000-01-01T00:00', 's') + minutes.astype('timedelta64[m]')
+    date = date_min if kind in SENSOMICS_DATED_KINDS else None
+    if kind in ('recordST',):
+        data = rng.integers(0, 256, (n, 1)) + rng.integers(0, 100, (n, 1)) / 100
+    elif kind == 'stateMultiMeasure':
+        data = rng.integers(0, 256, (n, 5)).astype(np.float64)
+        data[:, 4] += rng.integers(0, 100, n) / 100
+    elif kind == 'stateTag':
+        data = (date_min + rng.integers(0, 60, n).astype('timedelta64[s]'))[:, None]
+    elif kind == 'recordSleep':
+        data = np.column_stack([rng.integers(0, 256, n), rng.integers(0, 1 << 16, n)])
+    elif kind == 'stateActivity':
+        data = np.column_stack([rng.integers(0, 1 << 24, n), rng.integers(0, 1 << 24, n),
+                                rng.integers(0, 255 * 61 + 1, n), rng.integers(0, 255 * 61 + 1, n),
+                                rng.integers(0, 256, n)])
+    elif kind == 'streamPPG':
+        data = rng.integers(0, 1 << 16, (n, 8))
+    elif kind.startswith('streamAC'):
+        data = rng.integers(-(1 << 15), 1 << 15, (n, 5)) * _frame_obj(kind).sensitivity
+    else:
+        data = rng.integers(0, 256, (n, width))
+    return data, date
+
+
+def format_sens_lines(time, frames):
+    ''' Capture lines 'time;[b0, b1, ..., b19]' of frames, as bytes '''
+    blocks = np.array(['{}'.format(i) for i in range(256)], dtype=object)[np.asarray(frames)]
+    lines = ['{};[{}]\n'.format(each_time, ', '.join(each_blocks))
+             for each_time, each_blocks in zip(np.asarray(time).tolist(), blocks.tolist())]
+    return ''.join(lines).encode('utf-8')
+
+
+def _open_sink(sink):
+    ''' (write function, close function) of a path, "host:port", socket or file like '''
+    if isinstance(sink, str):
+        host, sep, port = sink.rpartition(':')
+        if sep and port.isdigit() and not os.path.exists(sink):
+            conn = socket.create_connection((host, int(port)))
+            return conn.sendall, conn.close
+        fodata = open(sink, 'ab')
+        return fodata.write, fodata.close
+    if hasattr(sink, 'sendall'):
+        return sink.sendall, lambda: None
+    return sink.write, lambda: None
+
+
+def replay_sens(time, frames, sink, rate=None, batch_size=256, loop=1):
+    """
+    replay_sens used to send frames as capture lines to a file or a socket
+    at a controlled rate, e.g. to load test a gateway
+
+    Parameters
+    ----------
+    time : array like, shape (N,)
+    frames : numpy.ndarray, shape (N, 20)
+    sink : str, socket or file like
+        file path (appended), 'host:port' (TCP), socket or binary file object
+    rate : float, optional
+        frames per second, default as fast as possible
+    batch_size : int
+        frames sent per write, the rate is held between batches
+    loop : int
+        number of times the frames are sent
+
+    Returns
+    -------
+    stats : dict
+        {'n_frames', 'n_bytes', 'elapsed', 'rate'}
+    """
+    write, close = _open_sink(sink)
+    time = np.asarray(time)
+    n_frames = n_bytes = 0
+    start = _time.monotonic()
+    try:
+        for _ in range(loop):
+            for begin in range(0, len(frames), batch_size):
+                lines = format_sens_lines(time[begin:begin + batch_size], frames[begin:begin + batch_size])
+                if rate is not None:
+                    delay = start + n_frames / rate - _time.monotonic()
+                    if delay > 0:
+                        _time.sleep(delay)
+                write(lines)
+                n_frames += min(batch_size, len(frames) - begin)
+                n_bytes += len(lines)
+    finally:
+        close()
+    elapsed = _time.monotonic() - start
+    return {'n_frames': n_frames, 'n_bytes': n_bytes, 'elapsed': elapsed,
+            'rate': n_frames / elapsed if elapsed else float('inf')}
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from wearableio.feature import WindowFeatureExtractor
+
+
+ACCELERATION_KINDS = ('streamACX', 'streamACY', 'streamACZ')
+
+
+class SensFeatureStream:
+    """ SensFeatureStream
+    Window features of the PPG and 3 axis acceleration streams, computed as
+    the frames arrive from read_sens_stream.
+
+    Parameters
+    ----------
+    ppg : dict, optional
+        WindowFeatureExtractor arguments of streamPPG, e.g.
+        {'window': 200, 'hop': 50, 'features': ['peak_rate'], 'fs': 25}
+    acceleration : dict, optional
+        WindowFeatureExtractor arguments of the (x, y, z) acceleration,
+        e.g. {'window': 125, 'features': ['rms', 'magnitude', 'zero_crossings']}
+    max_pending : int
+        samples kept per axis waiting for the other axes, the oldest are
+        dropped past it and counted in n_dropped
+
+    Notes
+    ----------
+    The 3 axes come in separate frames, samples are aligned by their order
+    in each axis stream and windowed once the 3 axes have them. An axis
+    stalled for more than max_pending samples loses the alignment of the
+    samples dropped.
+
+    Examples
+    ----------
+    >>> stream = SensFeatureStream(ppg={'window': 200, 'features': ['peak_rate'], 'fs': 25})
+    >>> for time, frame in frames:
+    ...     for kind, features in stream.update(read_sens_stream(time, frame)):
+    ...         print(kind, features)
+    """
+
+    def __init__(self, ppg=None, acceleration=None, max_pending=1 << 12):
+        self.max_pending = max_pending
+        self.n_dropped = 0
+        self.extractors = {}
+        if ppg is not None:
+            self.extractors['streamPPG'] = WindowFeatureExtractor(channels=1, **ppg)
+        if acceleration is not None:
+            self.extractors['acceleration'] = WindowFeatureExtractor(channels=3, **acceleration)
+        self._axes = {kind: [] for kind in ACCELERATION_KINDS}
+
+    def _push(self, name, samples):
+        features = self.extractors[name].push(samples)
+        if len(features['start']) == 0:
+            return []
+        return [(name, features)]
+
+    def _push_acceleration(self):
+        n_samples = min(sum(len(samples) for samples in self._axes[kind])
+                        for kind in ACCELERATION_KINDS)
+        aligned = []
+        for kind in ACCELERATION_KINDS:
+            if not self._axes[kind]:
+                continue
+            samples = np.concatenate(self._axes[kind])
+            aligned.append(samples[:n_samples])
+            pending = samples[n_samples:]
+            if len(pending) > self.max_pending:  # the other axes stalled
+                self.n_dropped += len(pending) - self.max_pending
+                pending = pending[-self.max_pending:]
+            self._axes[kind] = [pending] if len(pending) else []
+        if n_samples == 0:
+            return []
+        return self._push('acceleration', np.column_stack(aligned))
+
+    def update(self, parsed):
+        """
+        Parameters
+        ----------
+        parsed : dict
+            one frame, as read_sens_stream output
+
+        Returns
+        -------
+        features : list of tuple
+            (stream name, WindowFeatureExtractor.push output) completed
+            by the frame, stream name is 'streamPPG' or 'acceleration'
+        """
+        return self.update_samples(parsed['kind'], parsed['data'])
+
+    def update_samples(self, kind, samples):
+        ''' Push the samples of kind, e.g. the raveled data column of read_sens_columns '''
+        if kind == 'streamPPG' and 'streamPPG' in self.extractors:
+            return self._push('streamPPG', np.asarray(samples, dtype=np.float64))
+        if kind in ACCELERATION_KINDS and 'acceleration' in self.extractors:
+            self._axes[kind].append(np.asarray(samples, dtype=np.float64).ravel())
+            return self._push_acceleration()
+        return []
+
+    def update_columns(self, columns):
+        ''' Push per kind columns, as read_sens_columns output '''
+        features = []
+        for kind, kind_columns in columns.items():
+            features.extend(self.update_samples(kind, kind_columns['data'].ravel()))
+        return features
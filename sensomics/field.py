@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
+import numpy as np
 from wearableio.field import BaseField
+from wearableio.options import get_option
+from wearableio.utils import (join_date_blocks, join_date_blocks_array, date_blocks_in_month,
+                              days_in_month)
 from wearableio.sensomics.settings import (
     SENSOMCIS_HEAD_FIELD_SETTINGS,
     SENSOMCIS_LENGTH_FIELD_SETTINGS,
@@ -13,6 +16,7 @@ from wearableio.sensomics.settings import (
 
 class HeadField(BaseField):
     """ HeadField """
+    header = True
 
     def __init__(self, **kwags):
         super(HeadField, self).__init__(**kwags)
@@ -43,6 +47,7 @@ class LengthField(BaseField):
 
 class KindField(BaseField):
     """ KindField """
+    header = True
 
     def __init__(self, **kwags):
         super(KindField, self).__init__(**kwags)
@@ -58,6 +63,7 @@ class KindField(BaseField):
 
 class UserField(BaseField):
     """ UserField """
+    header = True
 
     def __init__(self, **kwags):
         super(UserField, self).__init__(**kwags)
@@ -86,8 +92,37 @@ class DataField(BaseField):
     
     
 
+def join_date_blocks_rows(blocks):
+    """
+    join_date_blocks_rows is join_date_blocks_array of N rows, the rows not
+    in the month are masked instead of raising, see date_blocks_in_month
+
+    Returns
+    -------
+    parsed : numpy.ndarray, shape (N,)
+        NaT at the rows masked, its int64 value for format 'epoch' and None
+        for format 'str'
+    """
+    blocks = np.asarray(blocks, dtype=np.int64)
+    in_month = date_blocks_in_month(blocks)
+    if in_month.all():
+        return join_date_blocks_array(blocks)
+    format_out = get_option('date.format_out')
+    if format_out == 'str':
+        parsed = np.full(len(blocks), None, dtype=object)
+    else:
+        parsed = np.full(len(blocks), np.datetime64('NaT'), dtype='datetime64[s]')
+        if format_out == 'epoch':
+            parsed = parsed.view(np.int64)
+    parsed[in_month] = join_date_blocks_array(blocks[in_month], format_out)
+    return parsed
+
+
 class DateField(BaseField):
-    """ DateField """
+    """ DateField
+    Date blocks [year - 2000, month, day, hour, minute(, second)], a day past
+    the end of the month is invalid at any validation level
+    """
 
     def __init__(self, **kwags):
         super(DateField, self).__init__(**kwags)
@@ -101,11 +136,23 @@ class DateField(BaseField):
         day=block[2],
         hour=block[3],
         minute=block[4])
+        output follows option 'date.format_out', see join_date_blocks
         '''
-        blocks[0] = blocks[0] + 2000
-        parsed = datetime(*blocks)
-        parsed = parsed.strftime("%Y-%m-%d-%H:%M:%S")
-        return parsed
+        return join_date_blocks(blocks)
+
+    @classmethod
+    def _parse_array_func(cls, blocks):
+        return join_date_blocks_rows(blocks)
+
+    def clean(self, blocks):
+        super().clean(blocks)
+        year, month, day = blocks[:3]
+        if not (1 <= month <= 12 and 1 <= day <= days_in_month(year + 2000, month)):
+            raise ValueError('Date of {} invalid: got {}, allow a day of the month'.format(
+                self.__class__.__name__, blocks))
+
+    def clean_array(self, blocks, sizes):
+        return super().clean_array(blocks, sizes) & date_blocks_in_month(blocks)
 
     def parse(self, blocks):
         parsed = super().parse(blocks)
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 from wearableio.frame import BaseFrame
 from wearableio.sensomics.field import (HeadField, LengthField, KindField,
-                                        UserField, DateField, DataField)
-from wearableio.utils import (join_integer_decimal, join_byteblocks, join_complementary_byteblocks)
+                                        UserField, DateField, DataField, join_date_blocks_rows)
+from wearableio.utils import (join_integer_decimal, join_byteblocks, join_complementary_byteblocks,
+                              join_date_blocks)
+from wearableio.sensomics.settings import (SENSOMICS_MAX_PAYLOAD, SENSOMICS_CALIBRATION,
+                                           SENSOMICS_ADC_SETTINGS, SENSOMICS_FRAME_PAYLOAD)
 from pandas import Interval
 from itertools import cycle
-from datetime import datetime
+import numpy as np
 
 
 class GenericFrame(BaseFrame):
@@ -157,8 +160,11 @@ class RecordSTFrame(GenericFrame):
         self.kind_field.settings = {'validator': [int(0xff), int(0x51)]}  # 255, 81
         self.user_field.settings = {'validator': [int(0x13)]}  # 19
         self.data_field.settings = {'size': 2,
-                                    'offset': slice(11, 13)}
+                                    'offset': slice(11, 13),
+                                    'validator': [Interval(int(0x00), int(0xff), closed='both'),  # integer
+                                                  Interval(int(0x00), int(0x64), closed='both')]}  # decimal [0, 100]
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     # @Override
     def _construct_frame(self):
@@ -181,6 +187,11 @@ class RecordSTFrame(GenericFrame):
         parsed = integer + decimal
         return parsed
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        return (blocks[:, 0] + blocks[:, 1] / 100)[:, None]
+
     def parse(self, frame,
               fields_out=['date', 'data'],
               format_out='dict'):
@@ -257,6 +268,8 @@ class RecordSleepFrame(GenericFrame):
         self.user_field.settings = {'validator': [int(0x80)]}  # 128
         self.data_field.settings = {'size': 3,
                                     'offset': slice(11, 14)}
+        self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     # @Override
     def _construct_frame(self):
@@ -275,6 +288,11 @@ class RecordSleepFrame(GenericFrame):
         sleep_time = join_byteblocks(data1, reverse=True)
         return [sleep_type, sleep_time]
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        return np.column_stack([blocks[:, 0], blocks[:, 1] << 8 | blocks[:, 2]])
+
     def parse(self, frame,
               fields_out=['date', 'data'],
               format_out='dict'):
@@ -299,14 +317,15 @@ class StateTagFrame(GenericFrame):
         self.length_field = LengthField()
         self.kind_field = KindField()
         self.user_field = UserField()
-        self.data_field = DataField()
+        self.data_field = DateField()
 
     # @Override
     def _set_field(self):
         self.head_field.settings = {'validator': [int(0xab)]}  # 171
         self.kind_field.settings = {'validator': [int(0xff), int(0x51)]}  # 255, 81
         self.user_field.settings = {'validator': [int(0x18)]}  # 24
-        self.data_field.settings = {'size': 6,
+        self.data_field.settings = {'name': 'data field',
+                                    'size': 6,
                                     'offset': slice(6, 12),
                                     'validator': [Interval(int(0x00), int(0xff), closed='both'),  # year [0,255]]
                                                   Interval(int(0x01), int(0x0c), closed='both'),  # month [1, 12]
@@ -316,6 +335,7 @@ class StateTagFrame(GenericFrame):
                                                   Interval(int(0x00), int(0x3b), closed='both'), ],  # second [0, 59]]
                                     }
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     # @Override
     def _construct_frame(self):
@@ -328,14 +348,12 @@ class StateTagFrame(GenericFrame):
 
     @classmethod
     def parse_data_field_func(cls, blocks):
-        parsed = datetime(year=blocks[0] + 2000,
-                          month=blocks[1],
-                          day=blocks[2],
-                          hour=blocks[3],
-                          minute=blocks[4],
-                          second=blocks[5])
-        parsed = parsed.strftime("%Y-%m-%d-%H:%M:%S")
-        return parsed
+        ''' output follows option 'date.format_out', see join_date_blocks '''
+        return join_date_blocks(blocks)
+
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        return join_date_blocks_rows(blocks)[:, None]
 
     def parse(self, frame,
               fields_out=['data'],
@@ -371,6 +389,7 @@ class StateMultiMeasureFrame(GenericFrame):
         self.kind_field.settings = {'validator': [int(0xff), int(0x32)]}  # 255, 50
         self.user_field.settings = {'validator': [int(0x80)]}
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     # @Override
     def _construct_frame(self):
@@ -381,6 +400,13 @@ class StateMultiMeasureFrame(GenericFrame):
         self.append(self.user_field)
         self.append(self.data_field)
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        ''' flattened [heart rate, SpO2, High Blood Pressure, Low Blood Pressure, Skin Temperature] '''
+        blocks = blocks.astype(np.int64)
+        st = blocks[:, 5] + blocks[:, 6] / 100
+        return np.column_stack([blocks[:, 0], blocks[:, 1], blocks[:, 2], blocks[:, 3], st])
+
     @classmethod
     def parse_data_field_func(cls, blocks):
         data0 = blocks[0]
@@ -429,6 +455,7 @@ class StateActivityFrame(GenericFrame):
         self.kind_field.settings = {'validator': [int(0xff), int(0x51)]}
         self.user_field.settings = {'validator': [int(0x08)]}  # 24
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     # @Override
     def _construct_frame(self):
@@ -452,6 +479,16 @@ class StateActivityFrame(GenericFrame):
         wake_up_time = data4
         return [step, calorie, shallow_sleep_minute, deep_sleep_minute, wake_up_time]
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        step = blocks[:, 0] << 16 | blocks[:, 1] << 8 | blocks[:, 2]
+        calorie = blocks[:, 3] << 16 | blocks[:, 4] << 8 | blocks[:, 5]
+        shallow_sleep_minute = blocks[:, 6] * 60 + blocks[:, 7]
+        deep_sleep_minute = blocks[:, 8] * 60 + blocks[:, 9]
+        wake_up_time = blocks[:, 10]
+        return np.column_stack([step, calorie, shallow_sleep_minute, deep_sleep_minute, wake_up_time])
+
     def parse(self, frame,
               fields_out=['data'],
               format_out='dict'):
@@ -555,6 +592,10 @@ class StateActivationFrame(GenericFrame):
 
 
 class StateBandInfoExtendFrame(GenericFrame):
+    """ StateBandInfoExtendFrame
+    StateBandInfoExtendFrame start with [171 0 255 155 5], its data field
+    continues in the following ExtendFrame when length > 17
+    """
     _kind = 'stateBandInfoExtend'
 
     def _construct_field(self):
@@ -570,6 +611,10 @@ class StateBandInfoExtendFrame(GenericFrame):
         self.head_field.settings = {'validator': [int(0xab)]}  # 171
         self.kind_field.settings = {'validator': [int(0xff), int(0x9b)]}
         self.user_field.settings = {'validator': [int(0x5)]}
+        # payload longer than one frame is reassembled from ExtendFrame,
+        # see wearableio.sensomics.reassembly
+        self.data_field.settings = {'size': Interval(1, SENSOMICS_MAX_PAYLOAD - 3, closed='both'),
+                                    'offset': slice(6, None)}
 
     # @Override
     def _construct_frame(self):
@@ -620,9 +665,6 @@ class StateHRFrame(GenericFrame):
     
     
 ### Stream Frame
-Quantitativelevel = 12
-So = 1/256
-
 class StreamPPGFrame(BaseFrame):
     """ StreamPPGFrame
     StreamPPGFrame start with [171 0 17 29]
@@ -654,6 +696,7 @@ class StreamPPGFrame(BaseFrame):
                                     'offset': slice(4, 20)}
 
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     def _construct_frame(self):
         # super(StreamPPGFrame, self)._construct_frame()
@@ -677,6 +720,11 @@ class StreamPPGFrame(BaseFrame):
                           [data0, data1, data2, data3, data4, data5, data6, data7]))
         return parsed
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        return blocks[:, 0::2] | blocks[:, 1::2] << 8
+
     def parse(self, frame,
               fields_out=['data'],
               format_out='dict'):
@@ -695,6 +743,7 @@ class StreamACXFrame(BaseFrame):
     """
 
     _kind = 'streamACX'
+    sensitivity = SENSOMICS_CALIBRATION['streamACX']['sensitivity']  # g per count
 
     def _construct_field(self):
         ''' Generic frame including 5 kind of fields '''
@@ -709,6 +758,7 @@ class StreamACXFrame(BaseFrame):
                                     'offset': slice(3, 13)}
 
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     def _construct_frame(self):
         ''' The order of the fields '''
@@ -717,16 +767,15 @@ class StreamACXFrame(BaseFrame):
         self.append(self.data_field)
 
     @classmethod
-    def adc_to_physical(cls, value):
-        # TODO: add notations:
+    def adc_to_physical(cls, value, settings=SENSOMICS_ADC_SETTINGS):
         # https://www.geek-workshop.com/forum.php?mod=viewthread&tid=1695&reltid=676&pre_thread_id=0&pre_pos=1&ext=
         # https://blog.csdn.net/lovewubo/article/details/9084291
         # https://www.cnblogs.com/uestcman/p/9433871.html
         # low, high = value
         # adc = high << 8 | low
         adc = join_byteblocks(value)
-        delta_voltage = adc / (2 ** Quantitativelevel - 1) * Vdd - Voff
-        physical = delta_voltage / So  # unit g
+        voltage = adc / (2 ** settings['level'] - 1) * settings['vdd']
+        physical = (voltage - settings['voff']) / settings['volt_per_g']  # unit g
         return physical
 
     @classmethod
@@ -734,7 +783,7 @@ class StreamACXFrame(BaseFrame):
         adc = join_complementary_byteblocks(value)
         # digit = adc >> 6
         digit = adc
-        physical = digit * So
+        physical = digit * cls.sensitivity
         return physical
 
     @classmethod
@@ -748,6 +797,13 @@ class StreamACXFrame(BaseFrame):
                           [data0, data1, data2, data3, data4]))
         return parsed
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        adc = blocks[:, 0::2] | blocks[:, 1::2] << 8
+        adc = np.where(adc < 2 ** 15, adc, adc - 2 ** 16)
+        return adc * cls.sensitivity
+
     def parse(self, frame,
               fields_out=['data'],
               format_out='dict'):
@@ -765,6 +821,7 @@ class StreamACYFrame(BaseFrame):
     """
 
     _kind = 'streamACY'
+    sensitivity = SENSOMICS_CALIBRATION['streamACY']['sensitivity']  # g per count
 
     def _construct_field(self):
         ''' Generic frame including 5 kind of fields '''
@@ -779,6 +836,7 @@ class StreamACYFrame(BaseFrame):
                                     'offset': slice(3, 13)}
 
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     def _construct_frame(self):
         ''' The order of the fields '''
@@ -787,16 +845,15 @@ class StreamACYFrame(BaseFrame):
         self.append(self.data_field)
 
     @classmethod
-    def adc_to_physical(cls, value):
-        # TODO: add notations:
+    def adc_to_physical(cls, value, settings=SENSOMICS_ADC_SETTINGS):
         # https://www.geek-workshop.com/forum.php?mod=viewthread&tid=1695&reltid=676&pre_thread_id=0&pre_pos=1&ext=
         # https://blog.csdn.net/lovewubo/article/details/9084291
         # https://www.cnblogs.com/uestcman/p/9433871.html
         # low, high = value
         # adc = high << 8 | low
         adc = join_byteblocks(value)
-        delta_voltage = adc / (2 ** Quantitativelevel - 1) * Vdd - Voff
-        physical = delta_voltage / So  # unit g
+        voltage = adc / (2 ** settings['level'] - 1) * settings['vdd']
+        physical = (voltage - settings['voff']) / settings['volt_per_g']  # unit g
         return physical
 
     @classmethod
@@ -804,7 +861,7 @@ class StreamACYFrame(BaseFrame):
         adc = join_complementary_byteblocks(value)
         # digit = adc >> 6
         digit = adc
-        physical = digit * So
+        physical = digit * cls.sensitivity
         return physical
 
     @classmethod
@@ -818,6 +875,13 @@ class StreamACYFrame(BaseFrame):
                           [data0, data1, data2, data3, data4]))
         return parsed
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        adc = blocks[:, 0::2] | blocks[:, 1::2] << 8
+        adc = np.where(adc < 2 ** 15, adc, adc - 2 ** 16)
+        return adc * cls.sensitivity
+
     def parse(self, frame,
               fields_out=['data'],
               format_out='dict'):
@@ -835,6 +899,7 @@ class StreamACZFrame(BaseFrame):
     """
 
     _kind = 'streamACZ'
+    sensitivity = SENSOMICS_CALIBRATION['streamACZ']['sensitivity']  # g per count
 
     def _construct_field(self):
         ''' Generic frame including 5 kind of fields '''
@@ -848,6 +913,7 @@ class StreamACZFrame(BaseFrame):
         self.data_field.settings = {'size': 10,
                                     'offset': slice(3, 13)}
         self.data_field.parse_func = self.parse_data_field_func
+        self.data_field.parse_array_func = self.parse_data_field_array
 
     def _construct_frame(self):
         ''' The order of the fields '''
@@ -856,16 +922,15 @@ class StreamACZFrame(BaseFrame):
         self.append(self.data_field)
 
     @classmethod
-    def adc_to_physical(cls, value):
-        # TODO: add notations:
+    def adc_to_physical(cls, value, settings=SENSOMICS_ADC_SETTINGS):
         # https://www.geek-workshop.com/forum.php?mod=viewthread&tid=1695&reltid=676&pre_thread_id=0&pre_pos=1&ext=
         # https://blog.csdn.net/lovewubo/article/details/9084291
         # https://www.cnblogs.com/uestcman/p/9433871.html
         # low, high = value
         # adc = high << 8 | low
         adc = join_byteblocks(value)
-        delta_voltage = adc / (2 ** Quantitativelevel - 1) * Vdd - Voff
-        physical = delta_voltage / So  # unit g
+        voltage = adc / (2 ** settings['level'] - 1) * settings['vdd']
+        physical = (voltage - settings['voff']) / settings['volt_per_g']  # unit g
         return physical
 
     @classmethod
@@ -873,7 +938,7 @@ class StreamACZFrame(BaseFrame):
         adc = join_complementary_byteblocks(value)
         # digit = adc >> 6
         digit = adc
-        physical = digit * So
+        physical = digit * cls.sensitivity
         return physical
 
     @classmethod
@@ -887,6 +952,13 @@ class StreamACZFrame(BaseFrame):
                           [data0, data1, data2, data3, data4]))
         return parsed
 
+    @classmethod
+    def parse_data_field_array(cls, blocks):
+        blocks = blocks.astype(np.int64)
+        adc = blocks[:, 0::2] | blocks[:, 1::2] << 8
+        adc = np.where(adc < 2 ** 15, adc, adc - 2 ** 16)
+        return adc * cls.sensitivity
+
     def parse(self, frame,
               fields_out=['data'],
               format_out='dict'):
@@ -933,6 +1005,62 @@ class StreamHRFrame(GenericFrame):
 
     
 
+### Extend Frame
+class ExtendFrame(BaseFrame):
+    """ ExtendFrame
+    ExtendFrame (continuation frame) start with [0], carrying the next
+    bytes of the payload of the previous frame, see SENSOMICS_FRAME_EXTEND_STRUCTURE
+
+    Methods
+    ----------
+    parse: return the extend bytes, the first length field blocks after
+        the header, the padding of the frame is not part of the data
+    """
+
+    _kind = 'extend'
+
+    def _construct_field(self):
+        self.head_field = HeadField()
+        self.length_field = LengthField()
+        self.data_field = DataField()
+
+    def _set_field(self):
+        self.head_field.settings = {'validator': [int(0x00)]}  # 0
+        self.length_field.settings = {'validator': [int(0x00),
+                                                    Interval(1, SENSOMICS_FRAME_PAYLOAD, closed='both')]}
+        self.data_field.settings = {'size': Interval(1, 17, closed='both'),
+                                    'offset': slice(3, 20)}
+
+    def _construct_frame(self):
+        ''' The order of the fields '''
+        self.append(self.head_field)
+        self.append(self.length_field)
+        self.append(self.data_field)
+
+    def _parse_array(self, frames,
+                     sizes=None,
+                     fields_out=None):
+        ''' Frames cut after length field blocks of data, the data blocks past it are 0 '''
+        frames = np.asarray(frames)
+        if sizes is None:
+            sizes = np.full(len(frames), frames.shape[1])
+        length = frames[:, 1].astype(np.int64) << 8 | frames[:, 2]
+        sizes = np.minimum(sizes, 3 + length)
+        valid, parsed = super()._parse_array(frames, sizes, fields_out)
+        if 'data' in parsed:
+            parsed['data'] = np.where(np.arange(parsed['data'].shape[1]) < (sizes - 3)[:, None],
+                                      parsed['data'], 0)
+        return valid, parsed
+
+    def parse(self, frame,
+              fields_out=['data'],
+              format_out='dict'):
+        if len(frame) >= 3:
+            frame = frame[:3 + (frame[1] << 8 | frame[2])]
+        return self._parse(frame, fields_out, format_out)
+
+
+
 ### Unknown Frame
 class UnknownFrame(BaseFrame):
     _kind = 'unknown'
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+from wearableio.sensomics.io import decode_sens_tokens
+from wearableio.sensomics.settings import SENSOMICS_STREAM_PERIOD
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+
+class SensGapIndex:
+    """ SensGapIndex
+    Compact interval index of the gaps of each stream kind.
+
+    Per kind, the gaps are kept as sorted int64 arrays of start and end
+    'time' (the frames before and after the gap), so lookups by time are
+    binary searches and the index saves to a small npz.
+
+    Attributes
+    ----------
+    kinds : dict
+        {kind: {'start', 'end', 'missing', 'first', 'last', 'n_frames', 'period'}}
+    quarantine : list
+        lines quarantined while indexing, as (line number, line, error str)
+    """
+
+    def __init__(self, kinds=None, meta=None, quarantine=None):
+        self.kinds = {} if kinds is None else kinds
+        self.meta = {} if meta is None else meta
+        self.quarantine = [] if quarantine is None else quarantine
+
+    def gaps(self, kind, start=None, end=None):
+        """
+        Returns
+        -------
+        gaps : tuple of numpy.ndarray
+            (start, end, missing) of the gaps of kind overlapping [start, end]
+        """
+        index = self.kinds[kind]
+        lo = 0 if start is None else np.searchsorted(index['end'], start, side='right')
+        hi = len(index['start']) if end is None else np.searchsorted(index['start'], end, side='left')
+        return index['start'][lo:hi], index['end'][lo:hi], index['missing'][lo:hi]
+
+    def coverage(self, kind):
+        ''' Received frames / expected frames of kind between its first and last frame '''
+        index = self.kinds[kind]
+        if index['n_frames'] == 0:
+            return float('nan')
+        expected = index['n_frames'] + int(index['missing'].sum())
+        return index['n_frames'] / expected
+
+    def report(self):
+        """
+        Returns
+        -------
+        report : pandas.DataFrame
+            per kind n_frames, n_gaps, missing, lost (time) and coverage
+        """
+        rows = []
+        for kind, index in self.kinds.items():
+            lost = int((index['end'] - index['start'] - index['period']).sum())
+            rows.append([kind, index['n_frames'], len(index['start']),
+                         int(index['missing'].sum()), lost, self.coverage(kind)])
+        return pd.DataFrame(rows, columns=['kind', 'n_frames', 'n_gaps', 'missing', 'lost',
+                                           'coverage']).set_index('kind')
+
+    def to_frame(self):
+        ''' Gaps of all kinds as pandas.DataFrame indexed by pandas.IntervalIndex '''
+        frames = []
+        for kind, index in self.kinds.items():
+            interval = pd.IntervalIndex.from_arrays(index['start'], index['end'], closed='neither')
+            frames.append(pd.DataFrame({'kind': kind, 'missing': index['missing']}, index=interval))
+        if not frames:
+            return pd.DataFrame(columns=['kind', 'missing'])
+        return pd.concat(frames)
+
+    def save(self, path):
+        ''' Write to a temporary file renamed to path, readers never see a partial index '''
+        arrays = {'meta/{}'.format(key): np.asarray(val) for key, val in self.meta.items()}
+        arrays['quarantine/lines'] = np.array(json.dumps(self.quarantine))
+        for kind, index in self.kinds.items():
+            for key, val in index.items():
+                arrays['{}/{}'.format(kind, key)] = np.asarray(val)
+        path_tmp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(path_tmp, 'wb') as fodata:
+                np.savez(fodata, **arrays)
+            os.replace(path_tmp, path)
+        except BaseException:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        kinds, meta, quarantine = {}, {}, []
+        with np.load(path) as arrays:
+            for name in arrays.files:
+                kind, key = name.split('/')
+                val = arrays[name]
+                val = val if val.ndim else val.item()
+                if kind == 'meta':
+                    meta[key] = val
+                elif kind == 'quarantine':
+                    quarantine = [tuple(each) for each in json.loads(val)]
+                else:
+                    kinds.setdefault(kind, {})[key] = val
+        return cls(kinds, meta, quarantine)
+
+
+class SensGapDetector:
+    """ SensGapDetector
+    Streaming detection of lost frames of the stream kinds, fed while decoding.
+
+    A gap is a 'time' delta between 2 consecutive frames of a kind larger
+    than tolerance * period, it is counted as round(delta / period) - 1
+    missing frames.
+
+    Parameters
+    ----------
+    periods : dict, optional
+        {kind: nominal period between frames}, default SENSOMICS_STREAM_PERIOD
+    tolerance : float
+        delta / period above which a gap is reported
+
+    Examples
+    ----------
+    >>> detector = SensGapDetector()
+    >>> for time, frame in frames:
+    ...     detector.update(read_sens_stream(time, frame))
+    >>> detector.result().report()
+    """
+
+    def __init__(self, periods=None, tolerance=1.5):
+        if not tolerance > 1:
+            raise ValueError('tolerance should be > 1: got {}'.format(tolerance))
+        self.periods = SENSOMICS_STREAM_PERIOD if periods is None else periods
+        self.tolerance = tolerance
+        self._state = {kind: {'start': [], 'end': [], 'missing': [], 'first': None,
+                              'last': None, 'n_frames': 0}
+                       for kind in self.periods}
+
+    def _update_time(self, kind, time):
+        state = self._state[kind]
+        if state['last'] is not None:
+            time = np.concatenate([[state['last']], time])
+        else:
+            state['first'] = int(time[0])
+        delta = np.diff(time)
+        period = self.periods[kind]
+        gap = np.flatnonzero(delta > self.tolerance * period)
+        if len(gap):
+            state['start'].append(time[gap])
+            state['end'].append(time[gap + 1])
+            state['missing'].append(np.rint(delta[gap] / period).astype(np.int64) - 1)
+        state['last'] = int(time[-1])
+
+    def update(self, parsed):
+        ''' Add one parsed frame, as read_sens_stream output '''
+        kind = parsed['kind']
+        if kind in self._state:
+            self._update_time(kind, np.array([parsed['time']], dtype=np.int64))
+            self._state[kind]['n_frames'] += 1
+
+    def update_columns(self, columns):
+        ''' Add per kind columns, as read_sens_columns output, vectorized '''
+        for kind, kind_columns in columns.items():
+            time = kind_columns['time']
+            if kind in self._state and len(time):
+                self._update_time(kind, np.asarray(time, dtype=np.int64))
+                self._state[kind]['n_frames'] += len(time)
+
+    def result(self, meta=None, quarantine=None):
+        kinds = {}
+        for kind, state in self._state.items():
+            kinds[kind] = {
+                'start': np.concatenate(state['start'] or [np.zeros(0, np.int64)]),
+                'end': np.concatenate(state['end'] or [np.zeros(0, np.int64)]),
+                'missing': np.concatenate(state['missing'] or [np.zeros(0, np.int64)]),
+                'first': -1 if state['first'] is None else state['first'],
+                'last': -1 if state['last'] is None else state['last'],
+                'n_frames': state['n_frames'],
+                'period': self.periods[kind],
+            }
+        return SensGapIndex(kinds, meta, quarantine)
+
+
+def _load_cached(path_index, meta):
+    ''' Index cached at path_index if built with meta, None if missing, stale or unreadable '''
+    try:
+        index = SensGapIndex.load(path_index)
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+    return index if index.meta == meta else None
+
+
+def _gap_index_meta(filepath_or_buffer, periods, tolerance):
+    stat = os.stat(filepath_or_buffer)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'tolerance': tolerance,
+            'periods': repr(sorted(periods.items()))}
+
+
+def detect_sens_gaps(filepath_or_buffer, periods=None, tolerance=1.5, quarantine=None,
+                     cache=True, chunk_size=1 << 24):
+    """
+    detect_sens_gaps used to index the gaps of the stream kinds of a
+    capture file, decoding it by chunks
+
+    Parameters
+    ----------
+    quarantine : list, optional
+        see read_sens_text, the lines quarantined are cached with the index
+        and appended again when it is reused
+    cache : bool
+        reuse and write the index '<filepath>.gaps.npz', the index is
+        rebuilt when the file, periods or tolerance changed or the cache
+        can not be read
+
+    Returns
+    -------
+    index : SensGapIndex
+    """
+    periods = SENSOMICS_STREAM_PERIOD if periods is None else periods
+    meta = _gap_index_meta(filepath_or_buffer, periods, tolerance)
+    path_index = filepath_or_buffer + '.gaps.npz'
+    index = _load_cached(path_index, meta) if cache and os.path.exists(path_index) else None
+    if index is not None:
+        if index.quarantine and quarantine is None:
+            raise ValueError(index.quarantine[0][2])  # as the decode of the first invalid line
+        if quarantine is not None:
+            quarantine.extend((lineno, line, ValueError(e)) for lineno, line, e in index.quarantine)
+        return index
+    indexed = []
+    detector = SensGapDetector(periods=periods, tolerance=tolerance)
+    for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size):
+        tokens = tokenize_sens_bytes(chunk)
+        detector.update_columns(decode_sens_tokens(tokens, chunk, first_line,
+                                                   None if quarantine is None else indexed))
+    if quarantine is not None:
+        quarantine.extend(indexed)
+    index = detector.result(meta, [(lineno, line, str(e)) for lineno, line, e in indexed])
+    if cache:
+        try:
+            index.save(path_index)
+        except OSError:
+            pass
+    return index
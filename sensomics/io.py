@@ -4,21 +4,32 @@
 
 from collections import namedtuple
 import json
+import os
+import numpy as np
 import pandas as pd
+from wearableio import hooks
+from wearableio.buffer import ColumnBuffer
 from wearableio.frame import BaseFrame
+from wearableio.options import option_context
+from wearableio.protocol import Protocol, register_protocol
 from wearableio.utils import (join_integer_decimal, join_byteblocks, join_complementary_byteblocks)
 # from wearableio.sensomics.settings import SENSOMICS_FRAME_TYPE
+from wearableio.sensomics.settings import (SENSOMICS_DATA_SCHEMA, SENSOMICS_DATED_KINDS,
+                                           SENSOMICS_CACHED_KINDS, SENSOMICS_CATEGORY_COLUMNS)
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
 from wearableio.sensomics.frame import UnknownFrame
 from wearableio.sensomics.frame import (
     StreamHRFrame, StreamPPGFrame, StreamACXFrame, StreamACYFrame, StreamACZFrame,
     RecordHRFrame, RecordSPO2Frame, RecordBPFrame, RecordSTFrame, RecordSleepFrame,
     StateTagFrame, StateHRFrame, StateActivityFrame, StateMultiMeasureFrame,
-    StateActivationFrame, StatePowerFrame, StateBandInfoFrame, StateBandInfoExtendFrame)
+    StateActivationFrame, StatePowerFrame, StateBandInfoFrame, StateBandInfoExtendFrame,
+    ExtendFrame)
 
 
 
 ### SENSOMICS_FRAME_TYPE
 SENSOMICS_FRAME_TYPE = {
+    0x00: ExtendFrame(),  # 'extend'
     0xa1: StreamACXFrame(),  # 'streamACX'
     0xa2: StreamACYFrame(),  # 'streamACY'
     0xa3: StreamACZFrame(),  # 'streamACZ'
@@ -43,78 +54,676 @@ SENSOMICS_FRAME_TYPE = {
            }
 }
 
+def _map_kind_part(part):
+    ''' streamPPG frames only carry 0x29 as first kind byte '''
+    if isinstance(part, np.ndarray):
+        return np.where(part >> 8 == 0x29, 0x2900, part)
+    return 0x2900 if part >> 8 == 0x29 else part
+
+
+SENSOMICS_PROTOCOL = register_protocol(Protocol(
+    'sensomics',
+    parts=[{'offset': slice(0, 1)},  # head
+           {'offset': slice(3, 5), 'map': _map_kind_part},  # kind
+           {'offset': slice(5, 6)}],  # user
+    frame_type=SENSOMICS_FRAME_TYPE,
+    unknown=UnknownFrame(),
+    max_length=20))
+
+
 class SensFrameParser(namedtuple('FrameParser', (('part1', 'part2', 'part3')))):
 
     def __new__(cls, frame, **kwags):
         # pre proces to parts
-        part_slice = [slice(0, 1), slice(3, 5), slice(5, 6)]
-        parts = []
-        for pslice in part_slice:
-            parts.append(frame[pslice])
-        parts[1] = parts[1] if parts[1][0] != 0x29 else [0x29, 0x00]
-        parts = list(map(lambda part: join_byteblocks(part, reverse=True), parts))
+        parts = SENSOMICS_PROTOCOL.parts(frame)
         self = super(SensFrameParser, cls).__new__(cls, *parts, **kwags)
         self.frame = frame
         return self
 
     def parse_type(self):
-        frame_dict = SENSOMICS_FRAME_TYPE.copy()
-        for key in self:
-            try:
-                frame_type = frame_dict[key]  # is in allowed type
-            except:
-                frame_obj = UnknownFrame()
-                break
-            if isinstance(frame_type, BaseFrame):  # is selected
-                frame_obj = frame_type
-                break
-            elif isinstance(frame_type, dict):
-                # Continue to search the next level
-                frame_dict = frame_type
-            else:
-                frame_obj = UnknownFrame()
-                break
-        return frame_obj
+        return SENSOMICS_PROTOCOL.lookup(self)
 
-    def parse_frame(self):
+    def parse_frame(self, fields_out=['date', 'data']):
         frame = self.frame
         frame_obj = self.parse_type()
-        frame_parsed = frame_obj.parse(frame, fields_out=['date', 'data'], format_out='dict')
+        frame_parsed = frame_obj.parse(frame, fields_out=fields_out, format_out='dict')
         return frame_parsed
 
+    @classmethod
+    def parts_array(cls, frames):
+        ''' Vectorized parts of (N, max_length) frames, as three int64 arrays '''
+        return SENSOMICS_PROTOCOL.parts_array(frames)
+
+    @classmethod
+    def parse_type_array(cls, frames):
+        ''' Vectorized parse_type, see Protocol.parse_type_array '''
+        return SENSOMICS_PROTOCOL.parse_type_array(frames)
+
+
+def enable_sens_cache(kinds=None, maxsize=1024):
+    """
+    enable_sens_cache used to memoize the decoding of frames of kinds, see
+    BaseFrame.enable_cache
+
+    Parameters
+    ----------
+    kinds : list of str, optional
+        default SENSOMICS_CACHED_KINDS, the state kinds repeating identical frames
+    maxsize : int
+        number of distinct frames kept per kind
+    """
+    kinds = SENSOMICS_CACHED_KINDS if kinds is None else kinds
+    for frame_obj in SENSOMICS_PROTOCOL.frame_types():
+        if frame_obj._kind in kinds:
+            frame_obj.enable_cache(maxsize)
+
+
+def disable_sens_cache(kinds=None):
+    ''' Disable the cache of kinds, default all '''
+    for frame_obj in SENSOMICS_PROTOCOL.frame_types():
+        if kinds is None or frame_obj._kind in kinds:
+            frame_obj.disable_cache()
 
 
-def read_sens_line(line):
+def sens_cache_info():
+    """
+    Returns
+    -------
+    info : dict
+        {kind: {'hits', 'misses', 'maxsize', 'currsize', 'hit_rate'}} of
+        the kinds cached
+    """
+    info = {}
+    for frame_obj in SENSOMICS_PROTOCOL.frame_types():
+        cache_info = frame_obj.cache_info()
+        if cache_info is None:
+            continue
+        calls = cache_info.hits + cache_info.misses
+        info[frame_obj._kind] = dict(cache_info._asdict(),
+                                     hit_rate=cache_info.hits / calls if calls else float('nan'))
+    return info
+
+
+def _parse_sens_frame(frame, fields_out=['date', 'data']):
+    ''' SensFrameParser(frame).parse_frame, a frame that is not a list of int raises ValueError '''
+    try:
+        return SensFrameParser(frame).parse_frame(fields_out)
+    except (TypeError, AttributeError) as e:  # e.g. float, null or nested blocks
+        raise ValueError('Frame invalid: got {}, allow list of int blocks'.format(frame)) from e
+
+
+def read_sens_line(line, fields_out=['date', 'data']):
     time, frame = line.split(';')
     # time, frame = line
     frame = json.loads(frame)  # to json list
     # parse frame and time
-    frame_parsed = SensFrameParser(frame).parse_frame()
+    frame_parsed = _parse_sens_frame(frame, fields_out)
     time_parsed = {'time': int(time)}
     parsed = dict(**time_parsed, **frame_parsed)
     return parsed
 
 
+def _check_kinds(kinds):
+    ''' kinds as frozenset, None for all '''
+    if kinds is None:
+        return None
+    allowed = [SENSOMICS_PROTOCOL.unknown._kind] + [frame_obj._kind for frame_obj
+                                                     in SENSOMICS_PROTOCOL.frame_types()]
+    for kind in kinds:
+        if kind not in allowed:
+            raise ValueError('kind invalid: got {}, allow {}'.format(kind, allowed))
+    return frozenset(kinds)
+
+
+_LINE_KINDS = {}  # text of the header blocks of a line: kind
+
+
+def _sens_line_kind(line):
+    """
+    _sens_line_kind used to get the kind of a capture line from the text of
+    its header blocks only, without parsing the frame
+
+    Returns
+    -------
+    kind : str
+        None if the header can not be read, the line is then parsed to
+        know its kind
+    """
+    n_header = SENSOMICS_PROTOCOL.header_length
+    start = line.find('[')
+    header = line[start + 1:].split(',', n_header)
+    if start < 0 or len(header) <= n_header:
+        return None
+    key = tuple(header[:n_header])
+    kind = _LINE_KINDS.get(key)
+    if kind is None:
+        try:
+            blocks = [int(block) for block in key]
+        except ValueError:
+            return None
+        if min(blocks) < 0 or max(blocks) > 0xff:
+            return None
+        if len(_LINE_KINDS) >= 1 << 16:
+            _LINE_KINDS.clear()
+        kind = _LINE_KINDS[key] = SENSOMICS_PROTOCOL.header_kind(blocks)
+    return kind
+
+
 def read_sens_stream(time, frame):
     # frame = json.loads(frame)  # to json list
     # parse frame and time
-    frame_parsed = SensFrameParser(frame).parse_frame()
+    frame_parsed = _parse_sens_frame(frame)
     time_parsed = {'time': int(time)}
     parsed = dict(**time_parsed, **frame_parsed)
     return parsed
 
 
-def read_sens_text(filepath_or_buffer):
+def decode_sens_array(time, frames, sizes=None, fields_out=['date', 'data'], kinds=None):
+    """
+    decode_sens_array used to decode N frames at once, grouped by kind
+
+    Parameters
+    ----------
+    time : array like, shape (N,)
+    frames : numpy.ndarray, shape (N, max_length)
+        frames padded after sizes
+    sizes : numpy.ndarray, shape (N,), optional
+        number of blocks of each frame, default max_length
+    kinds : collection of str, optional
+        kinds decoded, default all
+
+    Returns
+    -------
+    decoded : dict
+        {kind: {'row': rows of the frames, 'time': , field name: parsed array}}
+    rejected : numpy.ndarray
+        rows failing the vectorized validation, to be parsed one by one
+    """
+    return SENSOMICS_PROTOCOL.decode_array(time, frames, sizes, fields_out=fields_out, kinds=kinds)
+
+
+def _data_array(kind, data):
+    ''' Parsed data array of kind to the (N, width) data column '''
+    width = len(data_columns(kind))
+    if data.ndim == 1:
+        data = data[:, None]
+    if data.shape[1] != width:
+        padded = np.zeros((len(data), width), dtype=data.dtype)
+        padded[:, :min(width, data.shape[1])] = data[:, :width]
+        data = padded
+    return data.astype(SENSOMICS_DATA_SCHEMA[kind]['dtype'], copy=False)
+
+
+def _decoded_to_columns(kind, decoded):
+    ''' decode_sens_array output of kind to to_sens_columns layout '''
+    columns = {'time': decoded['time']}
+    if kind in SENSOMICS_DATED_KINDS and 'date' in decoded:
+        columns['date'] = decoded['date'][:, 0] if decoded['date'].ndim == 2 else decoded['date']
+    if 'data' in decoded:
+        columns['data'] = _data_array(kind, decoded['data'])
+    return columns
+
+
+def decode_sens_tokens(tokens, buffer, first_line=0, quarantine=None, fields_out=['date', 'data'],
+                       kinds=None):
+    """
+    decode_sens_tokens used to decode tokenized lines to per kind columns
+
+    Lines rejected by the tokenizer or by the vectorized validation are
+    parsed again by read_sens_line, so that the output and the errors are
+    those of read_sens_text.
+
+    Parameters
+    ----------
+    tokens : SensTokens
+        output of tokenize_sens_bytes(buffer)
+    buffer : bytes
+        the tokenized lines
+    first_line : int
+        line number of the first line of buffer, for quarantine
+    quarantine : list, optional
+        see read_sens_text
+    fields_out : list
+        fields decoded to columns, see read_sens_columns
+    kinds : list of str, optional
+        kinds decoded, see read_sens_text
+
+    Returns
+    -------
+    columns : dict
+        see to_sens_columns, rows in line order
+    """
+    kinds = _check_kinds(kinds)
+    selected = np.flatnonzero(tokens.valid)
+    with option_context('date.format_out', 'datetime64'):
+        decoded, rejected = decode_sens_array(tokens.time[selected], tokens.frame[selected],
+                                              tokens.size[selected], fields_out=fields_out,
+                                              kinds=kinds)
+    rows = {}
+    columns = {}
+    for kind, kind_decoded in decoded.items():
+        rows[kind] = selected[kind_decoded['row']]
+        columns[kind] = _decoded_to_columns(kind, kind_decoded)
+    fallback = np.sort(np.concatenate([np.flatnonzero(~tokens.valid), selected[rejected]]))
+    if len(fallback) == 0:
+        return columns
+    builder = SensColumnBuilder(default_capacity=len(fallback), margin=1, fields_out=fields_out)
+    fallback_rows = {}
+    with option_context('date.format_out', 'datetime64'):
+        for row in fallback:
+            line = bytes(buffer[tokens.line_start[row]:tokens.line_end[row] + 1]).decode('utf-8')
+            try:
+                parsed_line = read_sens_line(line, fields_out)
+            except ValueError as e:
+                if quarantine is None:
+                    raise
+                quarantine.append((first_line + int(tokens.line[row]), line, e))
+                continue
+            if kinds is not None and parsed_line['kind'] not in kinds:
+                continue
+            builder.append(parsed_line)
+            fallback_rows.setdefault(parsed_line['kind'], []).append(row)
+    for kind, kind_columns in builder.columns().items():
+        if kind not in columns:
+            columns[kind] = kind_columns
+            continue
+        order = np.argsort(np.concatenate([rows[kind], fallback_rows[kind]]), kind='stable')
+        columns[kind] = {name: np.concatenate([columns[kind][name], kind_columns[name]])[order]
+                         for name in columns[kind]}
+    return columns
+
+
+def iter_sens_text(filepath_or_buffer, quarantine=None, fields_out=['date', 'data'], kinds=None):
+    ''' Lazy read_sens_text, yield parsed lines one by one '''
+    kinds = _check_kinds(kinds)
+    peeked = None if kinds is None else kinds | {None}  # None: header not read, parse the line
     fodata = open(file=filepath_or_buffer, mode='rt', encoding='utf-8')
-    parsed = []
-    for line in fodata:
-        parsed_line = read_sens_line(line)
-        parsed.append(parsed_line)
-    return parsed
+    with fodata:
+        lines = hooks.trace_read(fodata, filepath_or_buffer) if hooks.enabled else fodata
+        for lineno, line in enumerate(lines):
+            if peeked is not None and _sens_line_kind(line) not in peeked:
+                continue
+            if quarantine is None:
+                parsed_line = read_sens_line(line, fields_out)
+            else:
+                try:
+                    parsed_line = read_sens_line(line, fields_out)
+                except ValueError as e:
+                    quarantine.append((lineno, line, e))
+                    continue
+            if kinds is None or parsed_line['kind'] in kinds:
+                yield parsed_line
+
+
+def read_sens_text(filepath_or_buffer, quarantine=None, kinds=None):
+    """
+    read_sens_text used to parse a capture file line by line
+
+    Parameters
+    ----------
+    filepath_or_buffer : str
+        capture file of lines 'time;[b0, b1, ..., b19]'
+    quarantine : list, optional
+        if given, invalid lines are appended as (line number, line, error)
+        instead of raising ValueError
+    kinds : list of str, optional
+        kinds parsed, e.g. ['recordHR'], default all. Lines of other kinds
+        are skipped from the text of their header blocks, without being
+        parsed nor validated
+
+    Returns
+    -------
+    parsed : list of dict
+        {'time': , 'kind': , ('date': ,) 'data': }
+    """
+    return list(iter_sens_text(filepath_or_buffer, quarantine=quarantine, kinds=kinds))
+
+
+def estimate_sens_text(filepath_or_buffer, sample_size=1 << 16):
+    """
+    estimate_sens_text used to estimate the number of frames per kind of a
+    capture file from a sample of its head
+
+    Parameters
+    ----------
+    filepath_or_buffer : str
+        capture file
+    sample_size : int
+        number of bytes sampled from the head of the file
+
+    Returns
+    -------
+    estimate : dict
+        {'n_lines': , 'kinds': {kind: n_lines}}
+    """
+    file_size = os.path.getsize(filepath_or_buffer)
+    with open(filepath_or_buffer, 'rb') as f:
+        sample = f.read(sample_size)
+    lines = sample.splitlines()
+    if len(sample) < file_size and lines:
+        lines = lines[:-1]  # the last line may be cut
+    if not lines:
+        return {'n_lines': 0, 'kinds': {}}
+    n_sampled = sum(len(line) + 1 for line in lines)
+    scale = file_size / n_sampled
+    kinds = {}
+    for line in lines:
+        kind = _sens_line_kind(line.decode('utf-8', 'replace'))  # not traced by hooks
+        if kind is None:
+            continue
+        kinds[kind] = kinds.get(kind, 0) + 1
+    return {'n_lines': int(len(lines) * scale),
+            'kinds': {kind: int(count * scale) for kind, count in kinds.items()}}
+
+
+def _flatten(data):
+    flattened = []
+    for val in data:
+        if isinstance(val, (list, tuple)):
+            flattened.extend(_flatten(val))
+        else:
+            flattened.append(val)
+    return flattened
+
+
+def data_columns(kind):
+    ''' Column names of the flattened data field of kind '''
+    schema = SENSOMICS_DATA_SCHEMA[kind]
+    if schema['columns'] is not None:
+        return list(schema['columns'])
+    return ['data_{}'.format(i) for i in range(schema['width'])]
+
+
+class SensColumnBuilder:
+    """ SensColumnBuilder
+    Collect parsed records to per kind ColumnBuffer, see to_sens_columns.
+
+    Parameters
+    ----------
+    capacity : dict, optional
+        {kind: number of rows} allocated up front, e.g. from estimate_sens_text
+    margin : float
+        factor applied to capacity against underestimate
+    fields_out : list
+        fields collected besides time, default ['date', 'data']
+    """
+
+    def __init__(self, capacity=None, margin=1.1, default_capacity=1024, fields_out=['date', 'data']):
+        self.capacity = capacity or {}
+        self.margin = margin
+        self.default_capacity = default_capacity
+        self.fields_out = fields_out
+        self.buffers = {}
+
+    def _create(self, kind):
+        schema = SENSOMICS_DATA_SCHEMA[kind]
+        width = len(data_columns(kind))
+        capacity = int(self.capacity.get(kind, self.default_capacity) * self.margin)
+        buffers = {'time': ColumnBuffer(capacity, dtype='int64')}
+        if kind in SENSOMICS_DATED_KINDS and 'date' in self.fields_out:
+            buffers['date'] = ColumnBuffer(capacity, dtype='datetime64[s]')
+        if 'data' in self.fields_out:
+            buffers['data'] = ColumnBuffer(capacity, shape=(width,), dtype=schema['dtype'])
+        self.buffers[kind] = buffers
+        return buffers
+
+    def append(self, record):
+        kind = record['kind']
+        try:
+            buffers = self.buffers[kind]
+        except KeyError:
+            buffers = self._create(kind)
+        buffers['time'].append(record['time'])
+        if 'date' in buffers:
+            buffers['date'].append(record['date'][0])
+        if 'data' not in buffers:
+            return
+        data = buffers['data']
+        values = _flatten(record['data'])[:data.shape[0]]
+        if len(values) < data.shape[0]:
+            values = values + [0] * (data.shape[0] - len(values))
+        data.append(values)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def extend_columns(self, columns):
+        ''' Append per kind columns, see to_sens_columns '''
+        for kind, kind_columns in columns.items():
+            try:
+                buffers = self.buffers[kind]
+            except KeyError:
+                buffers = self._create(kind)
+            for name, buffer in buffers.items():
+                buffer.extend(kind_columns[name])
+
+    @property
+    def n_allocations(self):
+        return sum(buffer.n_allocations for buffers in self.buffers.values()
+                   for buffer in buffers.values())
+
+    def columns(self):
+        return {kind: {name: buffer.trim() for name, buffer in buffers.items()}
+                for kind, buffers in self.buffers.items()}
+
+
+def to_sens_columns(parsed):
+    """
+    to_sens_columns used to convert parsed records to per kind columns
+
+    Parameters
+    ----------
+    parsed : list of dict
+        output of read_sens_text, dates as datetime64 or epoch
+
+    Returns
+    -------
+    columns : dict
+        {kind: {'time': int64 (N,),
+                'date': datetime64[s] (N,), only for dated kinds
+                'data': (N, width) array typed by SENSOMICS_DATA_SCHEMA}}
+    """
+    capacity = {}
+    for record in parsed:
+        capacity[record['kind']] = capacity.get(record['kind'], 0) + 1
+    builder = SensColumnBuilder(capacity, margin=1)
+    builder.extend(parsed)
+    return builder.columns()
+
+
+def read_sens_columns(filepath_or_buffer, quarantine=None, engine='numpy', chunk_size=1 << 24,
+                      fields_out=['date', 'data'], kinds=None):
+    """
+    read_sens_columns used to parse a capture file to per kind columns,
+    output as to_sens_columns
+
+    Parameters
+    ----------
+    filepath_or_buffer : str
+        capture file
+    quarantine : list, optional
+        see read_sens_text
+    engine : str
+        - numpy: tokenize and decode chunks of lines with vectorized
+          functions, see tokenize_sens_bytes and decode_sens_array
+        - python: parse line by line with read_sens_line
+    chunk_size : int
+        number of bytes decoded at once by the numpy engine
+    fields_out : list
+        fields decoded besides time, e.g. ['data'] skips the conversion of
+        dates, the fields left out are still validated
+    kinds : list of str, optional
+        kinds decoded, see read_sens_text, the numpy engine still tokenizes
+        every line
+
+    Buffers are sized by estimate_sens_text, so the decode does a near
+    constant number of large allocations without keeping the records.
+    """
+    estimate = estimate_sens_text(filepath_or_buffer)
+    builder = SensColumnBuilder(estimate['kinds'], fields_out=fields_out)
+    if engine == 'python':
+        with option_context('date.format_out', 'datetime64'):
+            builder.extend(iter_sens_text(filepath_or_buffer, quarantine=quarantine,
+                                          fields_out=fields_out, kinds=kinds))
+    elif engine == 'numpy':
+        chunks = iter_sens_chunks(filepath_or_buffer, chunk_size)
+        if hooks.enabled:
+            chunks = hooks.trace_read(chunks, filepath_or_buffer)
+        for chunk, first_line in chunks:
+            tokens = tokenize_sens_bytes(chunk)
+            builder.extend_columns(decode_sens_tokens(tokens, chunk, first_line, quarantine,
+                                                      fields_out=fields_out, kinds=kinds))
+    else:
+        raise ValueError('engine invalid: got {}, allow numpy or python'.format(engine))
+    return builder.columns()
+
+
+def columns_to_frame(kind, columns):
+    ''' Per kind columns to pandas DataFrame with named data columns '''
+    data = columns['data']
+    frame = pd.DataFrame(data, columns=data_columns(kind)[:data.shape[1]])
+    if 'date' in columns:
+        frame.insert(0, 'date', columns['date'])
+    frame.insert(0, 'time', columns['time'])
+    return frame
+
+
+def columns_to_typed_frame(kind, columns, time_unit='ms'):
+    """
+    columns_to_typed_frame used to convert per kind columns to a pandas
+    DataFrame of typed columns, indexed by time
+
+    Returns
+    -------
+    frame : pandas.DataFrame
+        DatetimeIndex 'time', 'date' as datetime64[s] for dated kinds, one
+        column per data column typed by SENSOMICS_DATA_SCHEMA, category for
+        SENSOMICS_CATEGORY_COLUMNS
+    """
+    if time_unit not in ('s', 'ms', 'us'):
+        raise ValueError('time_unit invalid: got {}, allow {}'.format(time_unit, ['s', 'ms', 'us']))
+    index = pd.DatetimeIndex(np.asarray(columns['time'], dtype=np.int64).astype(
+        'datetime64[{}]'.format(time_unit)), name='time')
+    frame = {}
+    if 'date' in columns:
+        frame['date'] = columns['date']
+    if 'data' in columns:
+        categories = SENSOMICS_CATEGORY_COLUMNS.get(kind, [])
+        for i, column in enumerate(data_columns(kind)[:columns['data'].shape[1]]):
+            values = columns['data'][:, i]
+            frame[column] = pd.Categorical(values) if column in categories else values
+    return pd.DataFrame(frame, index=index)
+
+
+def read_sens_frames(filepath_or_buffer, quarantine=None, kinds=None, time_unit='ms', **kwags):
+    """
+    read_sens_frames used to parse a capture file to one typed pandas
+    DataFrame per kind, built from the columns of read_sens_columns
+
+    Parameters
+    ----------
+    filepath_or_buffer : str
+        capture file
+    quarantine : list, optional
+        see read_sens_text
+    kinds : list of str, optional
+        see read_sens_text
+    time_unit : str
+        unit of 'time' in the capture, s, ms or us
+    **kwags
+        engine, chunk_size and fields_out, see read_sens_columns
+
+    Returns
+    -------
+    frames : dict
+        {kind: pandas.DataFrame}, see columns_to_typed_frame
+    """
+    columns = read_sens_columns(filepath_or_buffer, quarantine=quarantine, kinds=kinds, **kwags)
+    return {kind: columns_to_typed_frame(kind, kind_columns, time_unit)
+            for kind, kind_columns in columns.items()}
+
+
+def _write_jsonl(parsed, path_out):
+    with open(path_out, 'w', encoding='utf-8') as f:
+        for record in parsed:
+            f.write(json.dumps(record))
+            f.write('\n')
+
+
+def _write_npz(columns, path_out):
+    arrays = {}
+    for kind, kind_columns in columns.items():
+        for name, array in kind_columns.items():
+            arrays['{}/{}'.format(kind, name)] = array
+    with open(path_out, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def _write_tables(columns, path_out, format_out='csv'):
+    ''' One csv table per kind in directory path_out '''
+    os.makedirs(path_out, exist_ok=True)
+    for kind, kind_columns in columns.items():
+        frame = columns_to_frame(kind, kind_columns)
+        file_name = os.path.join(path_out, '{}.{}'.format(kind, format_out))
+        frame.to_csv(file_name, index=False)
+
+
+WRITE_FORMATS = ('jsonl', 'npz', 'csv', 'parquet', 'feather')
+
+
+def _write(write, data, path_out, *args):
+    if hooks.enabled:
+        return hooks.trace_call('write', path_out, write, data, path_out, *args)
+    return write(data, path_out, *args)
+
+
+def write_sens(filepath_or_buffer, path_out, format_out='jsonl', quarantine=None):
+    """
+    write_sens used to convert a capture file to another format
+
+    Parameters
+    ----------
+    filepath_or_buffer : str
+        capture file
+    path_out : str
+        output file, or output directory for csv, parquet and feather,
+        which are written as one '<kind>.<format_out>' table per kind
+    format_out : str
+        - jsonl: one record per line, dates as epoch seconds
+        - npz: numpy archive of '<kind>/time', '<kind>/date', '<kind>/data'
+        - csv: per kind tables with named data columns
+        - parquet, feather: per kind tables streamed by chunks with units
+          metadata, see write_sens_arrow
+    quarantine : list, optional
+        see read_sens_text
+
+    Returns
+    -------
+    n_parsed : int
+        number of records written
+    """
+    if format_out not in WRITE_FORMATS:
+        raise ValueError('format_out invalid: got {}, allow {}'.format(format_out, WRITE_FORMATS))
+    if format_out == 'jsonl':
+        with option_context('date.format_out', 'epoch'):
+            parsed = read_sens_text(filepath_or_buffer, quarantine=quarantine)
+        _write(_write_jsonl, parsed, path_out)
+        return len(parsed)
+    if format_out in ('parquet', 'feather'):
+        from wearableio.sensomics.arrow import write_sens_arrow
+        return write_sens_arrow(filepath_or_buffer, path_out, format_out, quarantine=quarantine)
+    columns = read_sens_columns(filepath_or_buffer, quarantine=quarantine)
+    if format_out == 'npz':
+        _write(_write_npz, columns, path_out)
+    else:
+        _write(_write_tables, columns, path_out, format_out)
+    return sum(len(kind_columns['time']) for kind_columns in columns.values())
 
 
-def write_json(filepath_or_buffer, **kwags):
-    data = read_sens_text(filepath_or_buffer)
+def write_json(filepath_or_buffer, date_format_out='str', **kwags):
+    with option_context('date.format_out', date_format_out):
+        data = read_sens_text(filepath_or_buffer)
     # TODO: usd physiopandas io
     data = pd.DataFrame(data)
     data_json = data.to_json(orient='records')
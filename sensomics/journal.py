@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import zlib
+import numpy as np
+from wearableio.sensomics.io import SensColumnBuilder, decode_sens_tokens
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+JOURNAL_LOG = 'journal.log'
+
+
+def _crc32_file(path):
+    crc = 0
+    with open(path, 'rb') as fodata:
+        for block in iter(lambda: fodata.read(1 << 20), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _fsync_dir(path):
+    ''' Make renames in directory path durable, where the platform allows it '''
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SensJournal:
+    """ SensJournal
+    Append only journal of the decoded segments of one capture file, so
+    that an interrupted ingest resumes after the last committed segment.
+
+    Directory path holds
+        - journal.log: one JSON line per committed segment
+          {'segment', 'start', 'end', 'first_line', 'n_lines', 'n_records',
+           'crc32', 'source_crc32'}, start and end the input byte offsets,
+          crc32 the checksum of the segment file and source_crc32 of the
+          input bytes
+        - segment-<start>.npz: columns as 'kind/name' and the quarantined
+          lines as 'meta/quarantine'
+
+    A segment is written to a temporary file, synced and renamed, then its
+    log line is appended and synced: it is committed once its log line is
+    complete. On open, the log is read up to the first torn line or the
+    first segment failing its checksum, the rest is dropped.
+
+    Parameters
+    ----------
+    path : str
+        journal directory, created if missing
+    verify : bool
+        check the checksum of every segment on open, else of the last only
+
+    Examples
+    ----------
+    >>> journal = ingest_sens('capture.txt', 'capture.journal')  # resumable
+    >>> columns = journal.columns()
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.segments = self._recover(verify)
+
+    @property
+    def offset(self):
+        ''' Input byte offset the next segment starts at '''
+        return self.segments[-1]['end'] if self.segments else 0
+
+    @property
+    def next_line(self):
+        ''' Line number of the line at offset '''
+        if not self.segments:
+            return 0
+        return self.segments[-1]['first_line'] + self.segments[-1]['n_lines']
+
+    def _recover(self, verify):
+        path_log = os.path.join(self.path, JOURNAL_LOG)
+        segments = []
+        committed = 0
+        if os.path.exists(path_log):
+            with open(path_log, 'rb') as fodata:
+                lines = fodata.read().split(b'\n')
+            for i, line in enumerate(lines[:-1]):  # the last item is torn or empty
+                try:
+                    segment = json.loads(line)
+                except ValueError:
+                    break
+                path_segment = os.path.join(self.path, segment['segment'])
+                check = verify or i == len(lines) - 2
+                if not os.path.exists(path_segment) or (
+                        check and _crc32_file(path_segment) != segment['crc32']):
+                    break
+                segments.append(segment)
+                committed += len(line) + 1
+            with open(path_log, 'r+b') as fodata:
+                fodata.truncate(committed)
+        # segments not committed, e.g. renamed before a crash
+        names = {segment['segment'] for segment in segments}
+        for name in os.listdir(self.path):
+            if name.startswith('segment-') and name not in names:
+                os.remove(os.path.join(self.path, name))
+        return segments
+
+    def check_source(self, filepath_or_buffer, verify=True):
+        """
+        Raise ValueError if the input bytes of a committed segment changed
+
+        Parameters
+        ----------
+        verify : bool
+            check the input bytes of every segment, else of the first and
+            last segments only, so a change in between is not detected
+        """
+        segments = self.segments if verify else self.segments[:1] + self.segments[1:][-1:]
+        with open(filepath_or_buffer, 'rb') as fodata:
+            for segment in segments:
+                fodata.seek(segment['start'])
+                source = fodata.read(segment['end'] - segment['start'])
+                if zlib.crc32(source) != segment['source_crc32']:
+                    raise ValueError('Source of journal {} invalid: bytes [{}, {}) of {} changed'.format(
+                        self.path, segment['start'], segment['end'], filepath_or_buffer))
+
+    def append(self, chunk, first_line, columns, quarantine):
+        """
+        Commit the segment decoded from chunk, the input bytes at offset
+
+        Parameters
+        ----------
+        chunk : bytes
+            whole lines decoded
+        columns : dict
+            per kind columns, see to_sens_columns
+        quarantine : list
+            (line number, line, error) of the lines of chunk not decoded
+        """
+        start = self.offset
+        name = 'segment-{:016d}.npz'.format(start)
+        arrays = {'meta/quarantine': np.array(json.dumps(
+            [(lineno, line, str(e)) for lineno, line, e in quarantine]))}
+        for kind, kind_columns in columns.items():
+            for key, val in kind_columns.items():
+                arrays['{}/{}'.format(kind, key)] = val
+        path_segment = os.path.join(self.path, name)
+        with open(path_segment + '.tmp', 'wb') as fodata:
+            np.savez(fodata, **arrays)
+            fodata.flush()
+            os.fsync(fodata.fileno())
+        os.replace(path_segment + '.tmp', path_segment)
+        _fsync_dir(self.path)
+        segment = {'segment': name, 'start': start, 'end': start + len(chunk),
+                   'first_line': first_line,
+                   'n_lines': chunk.count(b'\n') + (not chunk.endswith(b'\n')),
+                   'n_records': sum(len(kind_columns['time']) for kind_columns in columns.values()),
+                   'crc32': _crc32_file(path_segment), 'source_crc32': zlib.crc32(chunk)}
+        with open(os.path.join(self.path, JOURNAL_LOG), 'ab') as fodata:
+            fodata.write(json.dumps(segment, sort_keys=True).encode('utf-8') + b'\n')
+            fodata.flush()
+            os.fsync(fodata.fileno())
+        self.segments.append(segment)
+        return segment
+
+    def iter_segments(self):
+        """
+        Yields
+        ------
+        segment : dict
+            log entry
+        columns : dict
+            per kind columns of the segment
+        quarantine : list
+            (line number, line, error str)
+        """
+        for segment in self.segments:
+            columns = {}
+            with np.load(os.path.join(self.path, segment['segment'])) as arrays:
+                for name in arrays.files:
+                    kind, key = name.split('/')
+                    if kind == 'meta':
+                        quarantine = [tuple(each) for each in json.loads(arrays[name].item())]
+                    else:
+                        columns.setdefault(kind, {})[key] = arrays[name]
+            yield segment, columns, quarantine
+
+    def columns(self):
+        ''' Per kind columns of all segments, as read_sens_columns output '''
+        capacity = {}
+        for _, columns, _ in self.iter_segments():
+            for kind, kind_columns in columns.items():
+                capacity[kind] = capacity.get(kind, 0) + len(kind_columns['time'])
+        builder = SensColumnBuilder(capacity, margin=1)
+        for _, columns, _ in self.iter_segments():
+            builder.extend_columns(columns)
+        return builder.columns()
+
+    def quarantine(self):
+        ''' Quarantined lines of all segments, (line number, line, error str) '''
+        return [each for _, _, quarantine in self.iter_segments() for each in quarantine]
+
+
+def ingest_sens(filepath_or_buffer, path_journal, chunk_size=1 << 24, partial=False, verify=True):
+    """
+    ingest_sens used to decode a capture file by chunks into a SensJournal,
+    resuming after the segments already committed
+
+    Invalid lines are quarantined in their segment, see SensJournal.quarantine.
+
+    Parameters
+    ----------
+    path_journal : str
+        journal directory of filepath_or_buffer
+    chunk_size : int
+        input bytes per segment
+    partial : bool
+        decode a last line without newline, False while the file is still
+        being written so the line is decoded by a later call once complete
+    verify : bool
+        check every committed segment and its input bytes, else the last
+        segment and the input bytes of the first and last segments only
+
+    Returns
+    -------
+    journal : SensJournal
+    """
+    journal = SensJournal(path_journal, verify=verify)
+    journal.check_source(filepath_or_buffer, verify=verify)
+    for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size, offset=journal.offset,
+                                              first_line=journal.next_line, partial=partial):
+        quarantine = []
+        tokens = tokenize_sens_bytes(chunk)
+        columns = decode_sens_tokens(tokens, chunk, first_line, quarantine)
+        journal.append(chunk, first_line, columns, quarantine)
+    return journal
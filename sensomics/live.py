@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from wearableio.buffer import RingBuffer
+from wearableio.options import option_context
+from wearableio.sensomics.io import (decode_sens_array, decode_sens_tokens, read_sens_stream,
+                                     to_sens_columns, data_columns, _decoded_to_columns)
+from wearableio.sensomics.settings import SENSOMICS_DATA_SCHEMA, SENSOMICS_DATED_KINDS
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes
+
+
+def sens_ring_dtype(kind):
+    ''' Structured dtype of the rows of kind: time, date for dated kinds and data '''
+    fields = [('time', 'int64')]
+    if kind in SENSOMICS_DATED_KINDS:
+        fields.append(('date', 'datetime64[s]'))
+    fields.append(('data', SENSOMICS_DATA_SCHEMA[kind]['dtype'], (len(data_columns(kind)),)))
+    return np.dtype(fields)
+
+
+class SensLiveBuffer:
+    """ SensLiveBuffer
+    Live decode of frames to one RingBuffer per kind, written in batches by
+    a decoder thread and read as zero-copy windows by a consumer thread.
+
+    Parameters
+    ----------
+    capacity : int or dict
+        rows kept per kind, or {kind: rows}
+    kinds : list of str
+        kinds decoded, frames of other kinds are skipped
+    policy : str
+        overwrite or block, see RingBuffer
+    min_batch : int
+        batches of fewer frames are parsed frame by frame, faster than the
+        fixed cost of the vectorized decode
+
+    Notes
+    ----------
+    Each ring has one producer and one consumer: one thread calls the
+    write methods, and each kind is read by one thread. Rows are
+    structured as sens_ring_dtype, window['data'] is a (M, width) view.
+
+    Examples
+    ----------
+    >>> live = SensLiveBuffer(capacity=1 << 14, kinds=['streamPPG'])
+    >>> live.write_frames(time, frames)  # decoder thread, per batch received
+    >>> window = live['streamPPG'].read(timeout=0.001)  # consumer thread
+    >>> plot(window['time'], window['data'])
+    """
+
+    def __init__(self, capacity=1 << 16,
+                 kinds=('streamPPG', 'streamACX', 'streamACY', 'streamACZ', 'streamHR'),
+                 policy='overwrite', min_batch=6):
+        self.kinds = frozenset(kinds)
+        self.min_batch = min_batch
+        self.rings = {}
+        for kind in kinds:
+            if kind not in SENSOMICS_DATA_SCHEMA:
+                raise ValueError('kind invalid: got {}, allow {}'.format(kind, list(SENSOMICS_DATA_SCHEMA)))
+            kind_capacity = capacity.get(kind, 1 << 16) if isinstance(capacity, dict) else capacity
+            self.rings[kind] = RingBuffer(kind_capacity, dtype=sens_ring_dtype(kind), policy=policy)
+
+    def __getitem__(self, kind):
+        return self.rings[kind]
+
+    def write_columns(self, columns, timeout=None):
+        ''' Write per kind columns, as read_sens_columns output, return the rows written '''
+        n_rows = 0
+        for kind, kind_columns in columns.items():
+            if kind in self.rings and len(kind_columns['time']):
+                n_rows += self.rings[kind].write(kind_columns, timeout)
+        return n_rows
+
+    def write_frames(self, time, frames, sizes=None, quarantine=None, timeout=None):
+        """
+        write_frames used to decode a batch of frames at once and write
+        them to the rings of their kinds
+
+        Parameters
+        ----------
+        time : array like, shape (N,)
+        frames : numpy.ndarray, shape (N, 20)
+            frames padded after sizes
+        sizes : numpy.ndarray, shape (N,), optional
+        quarantine : list, optional
+            if given, invalid frames are appended as (row, frame, error)
+            instead of raising ValueError
+        timeout : float, optional
+            see RingBuffer.write
+
+        Returns
+        -------
+        n_rows : int
+            rows written
+        """
+        time = np.asarray(time, dtype=np.int64)
+        frames = np.asarray(frames)
+        sizes = np.full(len(frames), frames.shape[1]) if sizes is None else np.asarray(sizes)
+        if len(frames) < self.min_batch:
+            columns = {}
+            self._parse_rows(columns, {}, time, frames, sizes, np.arange(len(frames)), quarantine)
+            return self.write_columns(columns, timeout)
+        with option_context('date.format_out', 'datetime64'):
+            decoded, rejected = decode_sens_array(time, frames, sizes, kinds=self.kinds)
+        columns = {kind: _decoded_to_columns(kind, kind_decoded)
+                   for kind, kind_decoded in decoded.items()}
+        if len(rejected):
+            self._parse_rows(columns, decoded, time, frames, sizes, rejected, quarantine)
+        return self.write_columns(columns, timeout)
+
+    def _parse_rows(self, columns, decoded, time, frames, sizes, rows, quarantine):
+        ''' Parse rows one by one and merge them to the decoded columns, in row order '''
+        parsed, kind_rows = [], {}
+        with option_context('date.format_out', 'datetime64'):
+            for row in rows:
+                frame = frames[row, :sizes[row]].tolist()
+                try:
+                    parsed_frame = read_sens_stream(time[row], frame)
+                except ValueError as e:
+                    if quarantine is None:
+                        raise
+                    quarantine.append((int(row), frame, e))
+                    continue
+                if parsed_frame['kind'] in self.kinds:
+                    parsed.append(parsed_frame)
+                    kind_rows.setdefault(parsed_frame['kind'], []).append(row)
+        for kind, kind_columns in to_sens_columns(parsed).items():
+            if kind not in columns:
+                columns[kind] = kind_columns
+                continue
+            order = np.argsort(np.concatenate([decoded[kind]['row'], kind_rows[kind]]), kind='stable')
+            columns[kind] = {name: np.concatenate([columns[kind][name], kind_columns[name]])[order]
+                             for name in columns[kind]}
+
+    def write_lines(self, buffer, quarantine=None, timeout=None):
+        ''' Decode capture lines 'time;[b0, ...]' at once, see write_frames '''
+        tokens = tokenize_sens_bytes(buffer)
+        return self.write_columns(decode_sens_tokens(tokens, buffer, quarantine=quarantine,
+                                                     kinds=self.kinds), timeout)
+
+    def read(self, kind, max_rows=None, min_rows=1, timeout=0):
+        ''' Window of the oldest rows of kind not read, see RingBuffer.read '''
+        return self.rings[kind].read(max_rows, min_rows, timeout)
+
+    def latest(self, kind, n_rows):
+        ''' View of the n_rows last rows of kind, see RingBuffer.latest '''
+        return self.rings[kind].latest(n_rows)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import json
+from wearableio.utils import join_byteblocks
+from wearableio.sensomics.io import read_sens_stream
+from wearableio.sensomics.settings import SENSOMICS_FRAME_PAYLOAD
+
+
+def _length_field(frame):
+    ''' Length field of frame, ValueError if it is not int blocks '''
+    try:
+        return join_byteblocks(frame[1:3], reverse=True)
+    except TypeError as e:
+        raise ValueError('Frame invalid: got {}, allow list of int blocks'.format(frame)) from e
+
+
+class SensReassembler:
+    """ SensReassembler
+    Stateful reassembly of frames whose payload continues in extend frames.
+
+    A frame with head 0xab announcing a length field > 17 is held back,
+    the payload of the following extend frames (head 0x00, their own length
+    field counting their bytes) is appended to it, and the logical frame
+    [head, length high, length low, payload...] is decoded in one pass once
+    length bytes are collected. The other frames are decoded right away.
+
+    Parameters
+    ----------
+    timeout : int
+        maximum 'time' between the head frame and its last extend frame,
+        in the unit of time
+    max_payload : int
+        maximum length of a reassembled payload, longer heads are dropped
+    on_drop : callable, optional
+        on_drop(time, frame, reason) called with the frames dropped
+    quarantine : list, optional
+        if given, the frames dropped are appended as (time, frame, error)
+
+    Notes
+    ----------
+    Extend frames carry no sequence number, only one payload is pending at
+    a time: a new frame arriving before completion drops the pending one,
+    counted in stats['interrupted'].
+
+    Examples
+    ----------
+    >>> reassembler = SensReassembler(timeout=1000)
+    >>> for time, frame in frames:
+    ...     for parsed in reassembler.feed(time, frame):
+    ...         print(parsed)
+    """
+
+    def __init__(self, timeout=1000, max_payload=512, on_drop=None, quarantine=None):
+        self.timeout = timeout
+        self.max_payload = max_payload
+        self.on_drop = on_drop
+        self.quarantine = quarantine
+        self.stats = {'passed': 0, 'reassembled': 0, 'dropped': 0, 'orphans': 0, 'interrupted': 0}
+        self._pending = None  # [time, header, length, payload]
+
+    def _drop(self, time, frame, reason):
+        self.stats['dropped'] += 1
+        if self.on_drop is not None:
+            self.on_drop(time, frame, reason)
+        if self.quarantine is not None:
+            self.quarantine.append((time, frame, ValueError('Frame dropped: {}'.format(reason))))
+
+    def _drop_pending(self, reason):
+        if self._pending is not None:
+            time, header, _, payload = self._pending
+            self._pending = None
+            self._drop(time, header + payload, reason)
+
+    @property
+    def pending(self):
+        return self._pending is not None
+
+    def feed(self, time, frame):
+        """
+        Returns
+        -------
+        parsed : list of dict
+            frames completed by this frame, as read_sens_stream output
+        """
+        try:
+            frame = list(frame)
+        except TypeError as e:
+            raise ValueError('Frame invalid: got {}, allow list of int blocks'.format(frame)) from e
+        if self._pending is not None and time - self._pending[0] > self.timeout:
+            self._drop_pending('timeout')
+        if frame and frame[0] == 0x00:
+            return self._feed_extend(time, frame)
+        if self._pending is not None:
+            self.stats['interrupted'] += 1
+            self._drop_pending('interrupted')
+        length = _length_field(frame) if len(frame) >= 3 else 0
+        if frame[:1] != [0xab] or length <= SENSOMICS_FRAME_PAYLOAD:
+            self.stats['passed'] += 1
+            return [read_sens_stream(time, frame)]
+        if length > self.max_payload:
+            self._drop(time, frame, 'too long')
+            return []
+        self._pending = [time, frame[:3], length, frame[3:3 + SENSOMICS_FRAME_PAYLOAD]]
+        return []
+
+    def _feed_extend(self, time, frame):
+        if self._pending is None:
+            self.stats['orphans'] += 1
+            self._drop(time, frame, 'orphan')
+            return []
+        _, header, length, payload = self._pending
+        extend_length = _length_field(frame)
+        if not 1 <= extend_length <= SENSOMICS_FRAME_PAYLOAD:
+            self._drop_pending('invalid extend')
+            self._drop(time, frame, 'invalid extend')
+            return []
+        payload.extend(frame[3:3 + extend_length])
+        if len(payload) < length:
+            return []
+        head_time = self._pending[0]
+        self._pending = None
+        self.stats['reassembled'] += 1
+        return [read_sens_stream(head_time, header + payload[:length])]
+
+    def flush(self):
+        ''' Drop the pending payload at the end of the stream '''
+        self._drop_pending('incomplete')
+        return []
+
+
+def reassemble_sens_text(filepath_or_buffer, timeout=1000, max_payload=512, on_drop=None,
+                         quarantine=None):
+    """
+    reassemble_sens_text used to parse a capture file as read_sens_text,
+    with the extend frames reassembled, see SensReassembler
+
+    Parameters
+    ----------
+    quarantine : list, optional
+        if given, invalid lines are appended as (line number, line, error)
+        instead of raising ValueError, and the frames dropped by the
+        reassembler as (time, frame, error)
+    """
+    reassembler = SensReassembler(timeout=timeout, max_payload=max_payload, on_drop=on_drop,
+                                  quarantine=quarantine)
+    parsed = []
+    with open(filepath_or_buffer, mode='rt', encoding='utf-8') as fodata:
+        for lineno, line in enumerate(fodata):
+            try:
+                time, frame = line.split(';')
+                parsed.extend(reassembler.feed(int(time), json.loads(frame)))
+            except ValueError as e:
+                if quarantine is None:
+                    raise
+                quarantine.append((lineno, line, e))
+    parsed.extend(reassembler.flush())
+    return parsed
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+from collections.abc import Mapping
+import sys
+from wearableio.sensomics.io import data_columns, iter_sens_text
+from wearableio.sensomics.settings import SENSOMICS_DATA_SCHEMA
+
+
+class SensRecord(Mapping):
+    """ SensRecord
+    Compact parsed frame with __slots__ instead of a dict.
+
+    Read access is the one of the dict output of read_sens_line: keys
+    'time', 'kind', ('date',) 'data', record['data'], get, items. data has
+    the shape of the dict output with lists as tuples, e.g. (hr, spo2,
+    (bp_high, bp_low), st) for stateMultiMeasure. The subclasses of
+    record_type(kind) also name the columns of SENSOMICS_DATA_SCHEMA, e.g.
+    record.hr for recordHR, record.bp_low for stateMultiMeasure.
+    """
+
+    __slots__ = ('time', 'kind', 'date', 'data')
+    _keys = ('time', 'kind', 'date', 'data')
+
+    def __init__(self, time, kind, data, date=None):
+        self.time = time
+        self.kind = kind
+        self.data = data
+        if date is not None:
+            self.date = date
+
+    @classmethod
+    def from_dict(cls, parsed):
+        record_cls = record_type(parsed['kind']) if cls is SensRecord else cls
+        date = parsed.get('date')
+        return record_cls(parsed['time'], parsed['kind'], _to_tuple(parsed['data']),
+                          date=None if date is None else date[0])
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+        if key == 'date':
+            return [value]  # as DateField output
+        return value
+
+    def __iter__(self):
+        for key in self._keys:
+            if key != 'date' or hasattr(self, 'date'):
+                yield key
+
+    def __len__(self):
+        return 3 + hasattr(self, 'date')
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, dict(self))
+
+    def to_dict(self):
+        return dict(self)
+
+    def __reduce__(self):
+        ''' record_type classes are built at run time, pickled as their kind '''
+        args = (self.time, self.kind, self.data, getattr(self, 'date', None))
+        if _record_types.get(self.kind) is self.__class__:
+            return _new_record, args
+        return self.__class__, args
+
+
+def _new_record(time, kind, data, date=None):
+    ''' record_type(kind) record, see SensRecord.__reduce__ '''
+    return record_type(kind)(time, kind, data, date=date)
+
+
+def _to_tuple(data):
+    ''' Nested lists to nested tuples '''
+    return tuple(_to_tuple(val) if isinstance(val, (list, tuple)) else val for val in data)
+
+
+def _column_paths(data):
+    ''' Index path in nested data of each column, in the flattened order '''
+    paths = []
+    for i, val in enumerate(data):
+        if isinstance(val, tuple):
+            paths.extend((i,) + path for path in _column_paths(val))
+        else:
+            paths.append((i,))
+    return paths
+
+
+def _column_property(index):
+    def column(self):
+        data = self.data
+        paths = self._paths
+        if paths is None:  # set from the first record, kinds have one data shape
+            paths = type(self)._paths = _column_paths(data)
+        for i in paths[index]:
+            data = data[i]
+        return data
+    return property(column)
+
+
+_record_types = {}
+
+
+def record_type(kind):
+    ''' SensRecord subclass of kind, with a property per named data column '''
+    try:
+        return _record_types[kind]
+    except KeyError:
+        pass
+    attrs = {'__slots__': (), '_paths': None}
+    if SENSOMICS_DATA_SCHEMA.get(kind, {}).get('columns'):
+        for index, column in enumerate(data_columns(kind)):
+            attrs[column] = _column_property(index)
+    name = 'SensRecord' + kind[:1].upper() + kind[1:]
+    _record_types[kind] = type(name, (SensRecord,), attrs)
+    return _record_types[kind]
+
+
+class SensRecordView(Mapping):
+    """ SensRecordView
+    Read only record backed by a row of per kind columns (to_sens_columns),
+    nothing is copied until a value is read. data is the flat row of the
+    data column, (hr, spo2, bp_high, bp_low, st) for stateMultiMeasure.
+    """
+
+    __slots__ = ('_columns', '_row', 'kind')
+
+    def __init__(self, columns, row, kind):
+        self._columns = columns
+        self._row = row
+        self.kind = kind
+
+    @property
+    def time(self):
+        return int(self._columns['time'][self._row])
+
+    @property
+    def date(self):
+        return self._columns['date'][self._row]
+
+    @property
+    def data(self):
+        return tuple(self._columns['data'][self._row].tolist())
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'kind':  # slots not set yet, as in copy or pickle
+            raise AttributeError(name)
+        try:
+            index = data_columns(self.kind).index(name)
+        except (KeyError, ValueError):
+            raise AttributeError(name)
+        return self._columns['data'][self._row, index]
+
+    def __getitem__(self, key):
+        if key == 'time':
+            return self.time
+        elif key == 'kind':
+            return self.kind
+        elif key == 'date' and 'date' in self._columns:
+            return [self.date]
+        elif key == 'data':
+            return self.data
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield 'time'
+        yield 'kind'
+        if 'date' in self._columns:
+            yield 'date'
+        yield 'data'
+
+    def __len__(self):
+        return 3 + ('date' in self._columns)
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, dict(self))
+
+
+def iter_sens_views(columns):
+    ''' Yield a SensRecordView per row of per kind columns, kind by kind '''
+    for kind, kind_columns in columns.items():
+        for row in range(len(kind_columns['time'])):
+            yield SensRecordView(kind_columns, row, kind)
+
+
+def read_sens_records(filepath_or_buffer, quarantine=None):
+    ''' read_sens_text, output as list of SensRecord '''
+    return [SensRecord.from_dict(parsed)
+            for parsed in iter_sens_text(filepath_or_buffer, quarantine=quarantine)]
+
+
+def sizeof_record(record, _seen=None):
+    ''' Deep size in bytes of a parsed record, shared objects counted once '''
+    seen = set() if _seen is None else _seen
+    if id(record) in seen:
+        return 0
+    seen.add(id(record))
+    size = sys.getsizeof(record)
+    if isinstance(record, dict):
+        for key, value in record.items():
+            size += sizeof_record(key, seen) + sizeof_record(value, seen)
+    elif isinstance(record, (list, tuple)):
+        for value in record:
+            size += sizeof_record(value, seen)
+    elif isinstance(record, SensRecord):
+        for key in SensRecord.__slots__:
+            if hasattr(record, key):
+                size += sizeof_record(getattr(record, key), seen)
+    return size
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from wearableio.resample import StreamResampler
+from wearableio.sensomics.io import decode_sens_tokens, to_sens_columns
+from wearableio.sensomics.settings import SENSOMICS_STREAM_PERIOD, SENSOMICS_STREAM_SAMPLES
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes, iter_sens_chunks
+
+
+def stream_samples(kind, columns):
+    """
+    stream_samples used to unfold the frames of a stream kind to samples
+
+    Returns
+    -------
+    time : numpy.ndarray, shape (N * n_samples,)
+        sample times in ms, the last sample of a frame at the frame time
+    samples : numpy.ndarray, shape (N * n_samples,)
+    """
+    if kind not in SENSOMICS_STREAM_SAMPLES:
+        raise ValueError('kind invalid: got {}, allow {}'.format(kind, list(SENSOMICS_STREAM_SAMPLES)))
+    data = columns['data'][:, SENSOMICS_STREAM_SAMPLES[kind]['columns']]
+    n_samples = data.shape[1]
+    spacing = SENSOMICS_STREAM_PERIOD[kind] / n_samples
+    offsets = (np.arange(n_samples) - (n_samples - 1)) * spacing
+    time = columns['time'][:, None] + offsets
+    return time.ravel(), data.ravel()
+
+
+class SensResampler:
+    """ SensResampler
+    Streaming resampling of the stream kinds to one common time grid, as
+    one multi channel array, fed with decoded columns chunk by chunk.
+
+    Parameters
+    ----------
+    period : int or float
+        grid step in ms, e.g. 40 for 25 Hz
+    method : str or dict
+        see StreamResampler, or {kind: method}
+    kinds : list of str
+        stream kinds aligned, one channel each, see SENSOMICS_STREAM_SAMPLES
+    max_gap : float, optional
+        see StreamResampler, in ms
+
+    Notes
+    ----------
+    Rows start at the first grid point every kind has reached and are
+    emitted once every kind has resampled them, kinds ahead are kept until
+    the others catch up. flush emits the rows left with NaN for the kinds
+    behind.
+
+    Examples
+    ----------
+    >>> resampler = SensResampler(period=40, method={'streamHR': 'nearest'})
+    >>> for columns in chunks:
+    ...     aligned = resampler.update_columns(columns)
+    ...     model.feed(aligned['time'], aligned['data'])
+    """
+
+    def __init__(self, period=40, method='linear',
+                 kinds=('streamPPG', 'streamACX', 'streamACY', 'streamACZ', 'streamHR'),
+                 max_gap=None):
+        self.period = period
+        self.kinds = list(kinds)
+        self.resamplers = {}
+        for kind in self.kinds:
+            if kind not in SENSOMICS_STREAM_SAMPLES:
+                raise ValueError('kind invalid: got {}, allow {}'.format(
+                    kind, list(SENSOMICS_STREAM_SAMPLES)))
+            kind_method = method.get(kind, 'linear') if isinstance(method, dict) else method
+            self.resamplers[kind] = StreamResampler(period, kind_method, max_gap=max_gap)
+        self.channels = [SENSOMICS_STREAM_SAMPLES[kind]['channel'] for kind in self.kinds]
+        self._pending = {}  # {kind: (grid index of values[0], values)}
+
+    def _collect(self, kind, resampled):
+        if len(resampled['k']) == 0:
+            return
+        if kind not in self._pending:
+            self._pending[kind] = (resampled['k'][0], resampled['data'][:, 0])
+            return
+        k_first, values = self._pending[kind]
+        self._pending[kind] = (k_first, np.concatenate([values, resampled['data'][:, 0]]))
+
+    def _emit(self, flush=False):
+        """
+        Returns
+        -------
+        aligned : dict
+            {'time': grid times in ms, 'data': (M, channels) float64,
+             'channels': channel names}
+        """
+        if len(self._pending) < len(self.kinds) and not (flush and self._pending):
+            return self._output(0, np.zeros((0, len(self.kinds))))
+        pending = self._pending.values()
+        start = max(k_first for k_first, _ in pending)
+        if flush:
+            stop = max(k_first + len(values) for k_first, values in pending)
+        else:
+            stop = min(k_first + len(values) for k_first, values in pending)
+        stop = max(stop, start)
+        data = np.full((stop - start, len(self.kinds)), np.nan)
+        for i, kind in enumerate(self.kinds):
+            if kind not in self._pending:
+                continue
+            k_first, values = self._pending[kind]
+            taken = values[max(start - k_first, 0):stop - k_first]
+            data[:len(taken), i] = taken
+            self._pending[kind] = (stop, values[max(stop - k_first, 0):])
+        return self._output(start, data)
+
+    def _output(self, start, data):
+        return {'time': np.arange(start, start + len(data)) * self.period,
+                'data': data, 'channels': self.channels}
+
+    def update_columns(self, columns):
+        ''' Push per kind columns, as read_sens_columns output, return the rows aligned '''
+        for kind in self.kinds:
+            if kind in columns and len(columns[kind]['time']):
+                time, samples = stream_samples(kind, columns[kind])
+                self._collect(kind, self.resamplers[kind].push(time, samples))
+        return self._emit()
+
+    def update(self, parsed):
+        ''' Push one frame, as read_sens_stream output '''
+        if parsed['kind'] not in self.resamplers:
+            return self._emit()
+        return self.update_columns(to_sens_columns([parsed]))
+
+    def flush(self):
+        ''' Rows left once the streams ended, NaN for the kinds behind '''
+        for kind in self.kinds:
+            self._collect(kind, self.resamplers[kind].flush())
+        return self._emit(flush=True)
+
+
+def resample_sens(filepath_or_buffer, period=40, method='linear',
+                  kinds=('streamPPG', 'streamACX', 'streamACY', 'streamACZ', 'streamHR'),
+                  max_gap=None, quarantine=None, chunk_size=1 << 24):
+    """
+    resample_sens used to decode the stream kinds of a capture file to one
+    multi channel array on a common time grid, chunk by chunk
+
+    Returns
+    -------
+    aligned : dict
+        {'time': grid times in ms, 'data': (M, channels) float64,
+         'channels': channel names}, see SensResampler
+    """
+    resampler = SensResampler(period, method, kinds, max_gap)
+    aligned = []
+    for chunk, first_line in iter_sens_chunks(filepath_or_buffer, chunk_size):
+        tokens = tokenize_sens_bytes(chunk)
+        aligned.append(resampler.update_columns(
+            decode_sens_tokens(tokens, chunk, first_line, quarantine, fields_out=['data'])))
+    aligned.append(resampler.flush())
+    return {'time': np.concatenate([each['time'] for each in aligned]),
+            'data': np.concatenate([each['data'] for each in aligned]),
+            'channels': resampler.channels}
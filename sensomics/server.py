@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import struct
+import time as _time
+import numpy as np
+from wearableio.options import option_context
+from wearableio.sensomics.io import (decode_sens_array, _decoded_to_columns, _flatten,
+                                     read_sens_line)
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes
+
+HEADER = struct.Struct('>I')  # length of the message that follows
+
+
+def _to_json_value(values):
+    ''' datetime64 to epoch seconds, numpy scalars to python '''
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[s]').astype(np.int64)
+    return values.tolist()
+
+
+def decode_sens_batch(buffer):
+    """
+    decode_sens_batch used to decode capture lines to one JSON ready record
+    per line, in line order, vectorized for the lines the tokenizer and
+    the vectorized validation accept
+
+    Returns
+    -------
+    records : list of dict
+        {'time', 'kind', ('date',) 'data'}, dates as epoch seconds and data
+        flattened as the columns of read_sens_columns, or {'line', 'error'}
+        for lines failing validation
+    """
+    tokens = tokenize_sens_bytes(buffer)
+    records = [None] * len(tokens.valid)
+    selected = np.flatnonzero(tokens.valid)
+    with option_context('date.format_out', 'datetime64'):
+        decoded, rejected = decode_sens_array(tokens.time[selected], tokens.frame[selected],
+                                              tokens.size[selected])
+    for kind, kind_decoded in decoded.items():
+        columns = _decoded_to_columns(kind, kind_decoded)
+        times = columns['time'].tolist()
+        data = _to_json_value(columns['data'])
+        dates = _to_json_value(columns['date']) if 'date' in columns else None
+        for i, row in enumerate(selected[kind_decoded['row']].tolist()):
+            record = {'time': times[i], 'kind': kind, 'data': data[i]}
+            if dates is not None:
+                record['date'] = dates[i]
+            records[row] = record
+    fallback = np.concatenate([np.flatnonzero(~tokens.valid), selected[rejected]])
+    with option_context('date.format_out', 'epoch'):
+        for row in fallback.tolist():
+            try:
+                line = bytes(buffer[tokens.line_start[row]:tokens.line_end[row] + 1]).decode('utf-8')
+                parsed = read_sens_line(line)
+            except (ValueError, TypeError, UnicodeDecodeError) as e:
+                records[row] = {'line': row, 'error': str(e)}
+                continue
+            parsed['data'] = _flatten(parsed['data'])
+            if 'date' in parsed:
+                parsed['date'] = parsed['date'][0]
+            records[row] = parsed
+    return records
+
+
+def _payload(records):
+    ''' Length prefixed JSON lines '''
+    payload = '\n'.join(records).encode('utf-8')
+    return HEADER.pack(len(payload)) + payload
+
+
+def _error_payload(n_lines, error):
+    ''' Response of a request whose batch failed, one error record per line '''
+    return _payload([json.dumps({'line': line, 'error': str(error)}) for line in range(n_lines)])
+
+
+def _decode_payloads(buffer, counts):
+    ''' decode_sens_batch of coalesced requests, split back to one JSON lines payload each '''
+    records = decode_sens_batch(buffer)
+    payloads = []
+    start = 0
+    for count in counts:
+        request_records = records[start:start + count]
+        for record in request_records:
+            if 'error' in record:
+                record['line'] -= start  # line of the request, not of the batch
+        payloads.append(_payload([json.dumps(record) for record in request_records]))
+        start += count
+    return payloads
+
+
+class _Request:
+    __slots__ = ('buffer', 'n_lines', 'future')
+
+    def __init__(self, buffer, future):
+        self.buffer = buffer if buffer.endswith(b'\n') else buffer + b'\n'
+        self.n_lines = self.buffer.count(b'\n')
+        self.future = future
+
+
+class SensDecodeServer:
+    """ SensDecodeServer
+    Local asyncio decoding service: requests of many clients are coalesced
+    into large vectorized decode batches.
+
+    A request is a 4 byte big endian length followed by capture lines
+    'time;[b0, ..., b19]\\n', the response to each request, in request
+    order per connection, is a 4 byte length followed by one JSON record
+    per line, see decode_sens_batch.
+
+    Parameters
+    ----------
+    max_batch : int
+        maximum number of lines decoded at once
+    max_latency : float
+        seconds the first request of a batch waits for others
+    max_connections : int
+        clients served at once, others wait to be accepted
+    max_pending : int
+        requests queued before clients are slowed down
+
+    Examples
+    ----------
+    >>> server = SensDecodeServer(max_batch=65536, max_latency=0.002)
+    >>> asyncio.run(server.serve(host='127.0.0.1', port=7420))
+    """
+
+    def __init__(self, max_batch=65536, max_latency=0.002, max_connections=256, max_pending=1024):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.max_connections = max_connections
+        self.max_pending = max_pending
+        self.stats = {'requests': 0, 'lines': 0, 'batches': 0}
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self._queue.get()]
+            n_lines = requests[0].n_lines
+            deadline = loop.time() + self.max_latency
+            while n_lines < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                n_lines += request.n_lines
+            buffer = b''.join(request.buffer for request in requests)
+            counts = [request.n_lines for request in requests]
+            try:
+                payloads = await loop.run_in_executor(None, _decode_payloads, buffer, counts)
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+            self.stats['batches'] += 1
+            for request, payload in zip(requests, payloads):
+                request.future.set_result(payload)
+
+    async def _handle(self, reader, writer):
+        async with self._connections:
+            responses = asyncio.Queue()
+
+            async def send():
+                while True:
+                    request = await responses.get()
+                    if request is None:
+                        break
+                    try:
+                        payload = await request.future
+                    except Exception as e:  # the batch of the request failed
+                        payload = _error_payload(request.n_lines, e)
+                    writer.write(payload)
+                    await writer.drain()
+
+            sender = asyncio.ensure_future(send())
+            try:
+                while True:
+                    try:
+                        header = await reader.readexactly(HEADER.size)
+                    except asyncio.IncompleteReadError:
+                        break
+                    buffer = await reader.readexactly(HEADER.unpack(header)[0])
+                    request = _Request(buffer, asyncio.get_running_loop().create_future())
+                    self.stats['requests'] += 1
+                    self.stats['lines'] += request.n_lines
+                    await self._queue.put(request)
+                    await responses.put(request)
+                await responses.put(None)
+                await sender
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+                pass  # client gone or server shutting down
+            finally:
+                sender.cancel()
+                writer.close()
+
+    async def serve(self, host=None, port=None, path=None, ready=None):
+        """
+        Serve on TCP host:port, or on the unix socket path, until cancelled
+
+        ready : asyncio.Event, optional
+            set once listening
+        """
+        self._queue = asyncio.Queue(self.max_pending)
+        self._connections = asyncio.Semaphore(self.max_connections)
+        batcher = asyncio.ensure_future(self._batcher())
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        self.sockets = server.sockets
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+async def _open(host=None, port=None, path=None):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def decode_remote(lines, host=None, port=None, path=None):
+    ''' Decode capture lines (bytes) with a SensDecodeServer, see decode_sens_batch '''
+    reader, writer = await _open(host, port, path)
+    try:
+        writer.write(HEADER.pack(len(lines)) + lines)
+        await writer.drain()
+        size = HEADER.unpack(await reader.readexactly(HEADER.size))[0]
+        payload = await reader.readexactly(size)
+    finally:
+        writer.close()
+    return [json.loads(record) for record in payload.decode('utf-8').split('\n') if record]
+
+
+async def load_test(lines, host=None, port=None, path=None, n_clients=16, n_requests=100,
+                    in_flight=4):
+    """
+    load_test used to measure the throughput and latency of a SensDecodeServer
+
+    Parameters
+    ----------
+    lines : bytes
+        capture lines sent by every request
+    n_clients : int
+        concurrent connections
+    n_requests : int
+        requests per client
+    in_flight : int
+        requests pipelined per client
+
+    Returns
+    -------
+    stats : dict
+        {'requests', 'lines', 'elapsed', 'lines_per_second',
+         'latency_p50', 'latency_p99'} with latency in seconds
+    """
+    lines = lines if lines.endswith(b'\n') else lines + b'\n'
+    n_lines = lines.count(b'\n')
+    message = HEADER.pack(len(lines)) + lines
+    latency = []
+
+    async def client():
+        reader, writer = await _open(host, port, path)
+        sent = []
+        window = asyncio.Semaphore(in_flight)
+
+        async def receive():
+            for _ in range(n_requests):
+                size = HEADER.unpack(await reader.readexactly(HEADER.size))[0]
+                await reader.readexactly(size)
+                latency.append(_time.perf_counter() - sent.pop(0))
+                window.release()
+
+        receiver = asyncio.ensure_future(receive())
+        for _ in range(n_requests):
+            await window.acquire()
+            sent.append(_time.perf_counter())
+            writer.write(message)
+            await writer.drain()
+        await receiver
+        writer.close()
+
+    start = _time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(n_clients)))
+    elapsed = _time.perf_counter() - start
+    n_total = n_clients * n_requests
+    return {'requests': n_total, 'lines': n_total * n_lines, 'elapsed': elapsed,
+            'lines_per_second': n_total * n_lines / elapsed,
+            'latency_p50': float(np.percentile(latency, 50)),
+            'latency_p99': float(np.percentile(latency, 99))}
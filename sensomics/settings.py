@@ -40,6 +40,11 @@ SENSOMICS_FRAME_EXTEND_STRUCTURE = {
                           'size': Interval(1, 19, closed='both')}
 }
 
+# A frame carries at most 17 bytes after its 3 byte header, longer payload
+# continue in extend frames. The length field counts the bytes after the header.
+SENSOMICS_FRAME_PAYLOAD = 17
+SENSOMICS_MAX_PAYLOAD = 0xffff
+
 SENSOMCIS_HEAD_FIELD_SETTINGS = {'name': 'head field',
                                  'size': 1,
                                  'validator': [int(0xab)],
@@ -71,6 +76,101 @@ SENSOMCIS_DATA_FIELD_SETTINGS = {'name': 'data field',
 
 
 
+### SENSOMICS_DATA_SCHEMA
+# Columns of the (flattened) data field per frame kind, used by the columnar
+# readers and writers. Kinds without named columns keep raw bytes as data_0...
+SENSOMICS_DATA_SCHEMA = {
+    'recordHR': {'columns': ['hr'], 'units': ['bpm'], 'dtype': 'int64'},
+    'recordSPO2': {'columns': ['spo2'], 'units': ['%'], 'dtype': 'int64'},
+    'recordST': {'columns': ['st'], 'units': ['centigrade'], 'dtype': 'float64'},
+    'recordBP': {'columns': ['bp_high', 'bp_low'], 'units': ['mmHg', 'mmHg'], 'dtype': 'int64'},
+    'recordSleep': {'columns': ['sleep_type', 'sleep_minute'], 'units': [None, 'minute'], 'dtype': 'int64'},
+    'stateTag': {'columns': ['tag'], 'units': ['s'], 'dtype': 'datetime64[s]'},
+    'stateMultiMeasure': {'columns': ['hr', 'spo2', 'bp_high', 'bp_low', 'st'],
+                          'units': ['bpm', '%', 'mmHg', 'mmHg', 'centigrade'],
+                          'dtype': 'float64'},
+    'stateActivity': {'columns': ['step', 'calorie', 'shallow_sleep_minute',
+                                  'deep_sleep_minute', 'wake_up_time'],
+                      'units': ['step', 'kcal', 'minute', 'minute', 'time'],
+                      'dtype': 'int64'},
+    'stateHR': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'statePower': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'stateBandInfo': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'stateActivation': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'stateBandInfoExtend': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'streamHR': {'columns': None, 'width': 14, 'units': None, 'dtype': 'int64'},
+    'streamPPG': {'columns': ['ppg_{}'.format(i) for i in range(8)],
+                  'units': ['bit'] * 8, 'dtype': 'int64'},
+    'streamACX': {'columns': ['acx_{}'.format(i) for i in range(5)],
+                  'units': ['g'] * 5, 'dtype': 'float64'},
+    'streamACY': {'columns': ['acy_{}'.format(i) for i in range(5)],
+                  'units': ['g'] * 5, 'dtype': 'float64'},
+    'streamACZ': {'columns': ['acz_{}'.format(i) for i in range(5)],
+                  'units': ['g'] * 5, 'dtype': 'float64'},
+    'extend': {'columns': None, 'width': 17, 'units': None, 'dtype': 'int64'},
+    'unknown': {'columns': None, 'width': 20, 'units': None, 'dtype': 'int64'},
+}
+
+# Data columns of few distinct codes, typed as pandas category by read_sens_frames
+SENSOMICS_CATEGORY_COLUMNS = {'recordSleep': ['sleep_type']}
+
+# Kinds carrying a date field besides data
+SENSOMICS_DATED_KINDS = ('recordHR', 'recordSPO2', 'recordST', 'recordBP', 'recordSleep')
+
+# Kinds and data columns rolled up by SensSummary, recordSleep minutes are
+# summed per sleep type
+SENSOMICS_SUMMARY_COLUMNS = {
+    'recordHR': ['hr'],
+    'recordSPO2': ['spo2'],
+    'recordBP': ['bp_high', 'bp_low'],
+    'recordST': ['st'],
+    'stateActivity': ['step', 'calorie', 'shallow_sleep_minute', 'deep_sleep_minute', 'wake_up_time'],
+    'recordSleep': ['sleep_minute'],
+}
+
+# Nominal period between 2 frames of a stream kind, in ms, used by the gap
+# detection: samples per frame / sampling rate of the band
+SENSOMICS_STREAM_PERIOD = {
+    'streamPPG': 320,  # 8 samples at 25 Hz
+    'streamACX': 200,  # 5 samples at 25 Hz
+    'streamACY': 200,
+    'streamACZ': 200,
+    'streamHR': 1000,
+}
+
+# Samples of the stream kinds for resampling: channel name and the data
+# columns holding consecutive samples, the last one taken at the frame
+# time, spaced by SENSOMICS_STREAM_PERIOD / number of samples
+SENSOMICS_STREAM_SAMPLES = {
+    'streamPPG': {'channel': 'ppg', 'columns': slice(0, 8)},
+    'streamACX': {'channel': 'acx', 'columns': slice(0, 5)},
+    'streamACY': {'channel': 'acy', 'columns': slice(0, 5)},
+    'streamACZ': {'channel': 'acz', 'columns': slice(0, 5)},
+    'streamHR': {'channel': 'hr', 'columns': slice(0, 1)},
+}
+
+# Record kinds retransmitted by the band after a reconnect, deduplicated on
+# kind, date field and data by SensDeduplicator
+SENSOMICS_DEDUP_KINDS = ('recordHR', 'recordSPO2', 'recordST', 'recordBP', 'recordSleep')
+
+# State kinds repeating identical frames, memoized by enable_sens_cache
+SENSOMICS_CACHED_KINDS = ('stateHR', 'statePower', 'stateBandInfo', 'stateActivation')
+
+# Default calibration of the acceleration streams, per data column:
+# physical = (raw - offset) * sensitivity * gain, raw in counts, offset in
+# counts, sensitivity in g per count. Per device tables, see SensCalibration
+SENSOMICS_CALIBRATION = {
+    'streamACX': {'gain': 1.0, 'offset': 0.0, 'sensitivity': 1 / 256},
+    'streamACY': {'gain': 1.0, 'offset': 0.0, 'sensitivity': 1 / 256},
+    'streamACZ': {'gain': 1.0, 'offset': 0.0, 'sensitivity': 1 / 256},
+}
+
+# Analog front end of adc_to_physical: resolution in bit, supply voltage and
+# zero g voltage in V, sensitivity in V per g
+SENSOMICS_ADC_SETTINGS = {'level': 12, 'vdd': 3.3, 'voff': 1.65, 'volt_per_g': 0.33}
+
+
+
 # =============================================================================
 # ### SENSOMICS_FRAME_TYPE
 # SENSOMICS_FRAME_TYPE = {
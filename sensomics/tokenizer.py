@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+import numpy as np
+
+
+SensTokens = namedtuple('SensTokens', ['time', 'frame', 'size', 'valid', 'line', 'line_start', 'line_end'])
+SensTokens.__doc__ = """ SensTokens
+Tokenized capture lines 'time;[b0, b1, ..., b19]', one row per line.
+
+    time : int64 (N,)
+    frame : uint8 (N, max_length), padded with 0 after size
+    size : int64 (N,), number of blocks of the frame
+    valid : bool (N,), False where the line does not follow the grammar,
+        other columns are undefined there
+    line : int64 (N,), line number in the buffer
+    line_start, line_end : int64 (N,), byte offsets of the line in the buffer
+"""
+
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+_MAX_DIGITS = 18  # fits int64
+
+_ALLOWED = np.zeros(256, dtype=bool)
+_ALLOWED[[ord(char) for char in '0123456789;[], \t\r\n']] = True
+_MARKS = np.zeros(256, dtype=bool)
+_MARKS[[ord(char) for char in '[],']] = True
+
+
+def tokenize_sens_bytes(buffer, max_length=20):
+    """
+    tokenize_sens_bytes used to parse capture lines 'time;[b0, b1, ..., b19]'
+    to arrays in a single vectorized pass, without any per line object
+
+    Parameters
+    ----------
+    buffer : bytes, bytearray or memoryview
+        capture lines
+    max_length : int
+        maximum number of blocks of a frame, longer frames are not valid
+
+    Returns
+    -------
+    tokens : SensTokens
+    """
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    if len(chars) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return SensTokens(empty, np.zeros((0, max_length), dtype=np.uint8), empty,
+                          np.zeros(0, dtype=bool), empty, empty, empty)
+    if chars[-1] != ord('\n'):
+        chars = np.append(chars, np.uint8(ord('\n')))
+    newline = chars == ord('\n')
+    line_end_all = np.flatnonzero(newline)
+    n_lines_all = len(line_end_all)
+    line_of = np.cumsum(newline) - newline  # line number of each byte
+
+    ''' Digit runs '''
+    digit = (chars >= ord('0')) & (chars <= ord('9'))
+    digit_previous = np.concatenate(([False], digit[:-1]))
+    digit_next = np.concatenate((digit[1:], [False]))
+    starts = np.flatnonzero(digit & ~digit_previous)
+    ends = np.flatnonzero(digit & ~digit_next) + 1
+    lengths = ends - starts
+    digit_index = np.flatnonzero(digit)
+    token_of_digit = np.repeat(np.arange(len(starts)), lengths)
+    exponent = np.minimum(ends[token_of_digit] - 1 - digit_index, _MAX_DIGITS)
+    contribution = (chars[digit_index].astype(np.int64) - ord('0')) * _POW10[exponent]
+    if len(starts):
+        values = np.add.reduceat(contribution, np.concatenate(([0], np.cumsum(lengths)[:-1])))
+    else:
+        values = np.zeros(0, dtype=np.int64)
+
+    ''' Tokens per line '''
+    token_line = line_of[starts]
+    n_tokens = np.bincount(token_line, minlength=n_lines_all)
+    first_token = np.concatenate(([0], np.cumsum(n_tokens)[:-1]))
+    token_rank = np.arange(len(starts)) - first_token[token_line]
+
+    ''' Grammar '''
+    invalid = np.zeros(n_lines_all, dtype=bool)
+    invalid[line_of[~_ALLOWED[chars]]] = True
+    invalid[token_line[lengths > _MAX_DIGITS]] = True
+    semicolon = np.flatnonzero(chars == ord(';'))
+    n_semicolon = np.bincount(line_of[semicolon], minlength=n_lines_all)
+    invalid |= n_semicolon != 1
+    semicolon_at = np.full(n_lines_all, -1, dtype=np.int64)
+    semicolon_at[line_of[semicolon]] = semicolon
+    n_before = np.bincount(token_line[starts < semicolon_at[token_line]], minlength=n_lines_all)
+    invalid |= n_before != 1
+    sizes_all = n_tokens - 1
+    invalid |= sizes_all > max_length
+    frame_token = token_rank >= 1
+    invalid[token_line[frame_token & (values > 0xff)]] = True
+    invalid[token_line[frame_token & (lengths > 1) & (chars[starts] == ord('0'))]] = True  # not json
+
+    ''' Frame '[b0, b1, ...]' after the semicolon, as json.loads accepts '''
+    marks = np.flatnonzero(_MARKS[chars])
+    mark = chars[marks]
+    opening, closing, comma = (marks[mark == ord(char)] for char in '[],')
+    invalid |= np.bincount(line_of[opening], minlength=n_lines_all) != 1
+    invalid |= np.bincount(line_of[closing], minlength=n_lines_all) != 1
+    invalid |= np.bincount(line_of[comma], minlength=n_lines_all) != np.maximum(sizes_all - 1, 0)
+    opening_at = np.full(n_lines_all, -1, dtype=np.int64)
+    opening_at[line_of[opening]] = opening
+    closing_at = np.full(n_lines_all, -1, dtype=np.int64)
+    closing_at[line_of[closing]] = closing
+    invalid |= (opening_at < semicolon_at) | (closing_at < opening_at)
+    # with the counts above, frame tokens inside the brackets and one comma
+    # between each pair leave no room for a misplaced mark
+    invalid[token_line[(token_rank == 1) & (starts < opening_at[token_line])]] = True
+    last = frame_token & (token_rank == n_tokens[token_line] - 1)
+    invalid[token_line[last & (ends > closing_at[token_line])]] = True
+    following = np.flatnonzero(token_rank >= 2)
+    between = np.searchsorted(comma, starts[following]) - np.searchsorted(comma, ends[following - 1])
+    invalid[token_line[following[between != 1]]] = True
+
+    line_start_all = np.concatenate(([0], line_end_all[:-1] + 1))
+    time = np.zeros(n_lines_all, dtype=np.int64)
+    frame = np.zeros((n_lines_all, max_length), dtype=np.uint8)
+    is_time = token_rank == 0
+    time[token_line[is_time]] = values[is_time]
+    is_block = frame_token & (token_rank <= max_length)
+    frame[token_line[is_block], token_rank[is_block] - 1] = values[is_block] & 0xff
+    size = np.clip(sizes_all, 0, max_length)
+    line = np.arange(n_lines_all)
+    return SensTokens(time, frame, size, ~invalid, line, line_start_all, line_end_all)
+
+
+def iter_sens_chunks(filepath_or_buffer, chunk_size=1 << 24, offset=0, first_line=0, partial=True):
+    """
+    iter_sens_chunks used to read a capture file by chunks of whole lines
+
+    Parameters
+    ----------
+    offset : int
+        byte offset the reading starts at, at the beginning of a line
+    first_line : int
+        line number of the line at offset
+    partial : bool
+        yield the last line of the file when it has no newline, False for
+        a file still being written
+
+    Yields
+    ------
+    chunk : bytes
+        lines of about chunk_size bytes, cut after a newline
+    first_line : int
+        line number of the first line of the chunk in the file
+    """
+    remainder = b''
+    with open(filepath_or_buffer, 'rb') as f:
+        f.seek(offset)
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            block = remainder + block
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:
+                remainder = block
+                continue
+            chunk, remainder = block[:cut], block[cut:]
+            yield chunk, first_line
+            first_line += chunk.count(b'\n')
+    if remainder and partial:
+        yield remainder, first_line
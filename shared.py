@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import os
+import sys
+import numpy as np
+from wearableio.sensomics.io import read_sens_columns
+
+ALIGNMENT = 64
+TRACK_ARGUMENT = sys.version_info >= (3, 13)  # SharedMemory(track=False)
+
+
+def _untrack(shm):
+    ''' Stop the resource tracker of this process from unlinking shm at exit '''
+    resource_tracker.unregister(shm._name, 'shared_memory')
+
+
+def _tracker_id():
+    ''' Identity of the resource tracker of this process: the pipe it reads '''
+    resource_tracker.ensure_running()
+    stat = os.fstat(resource_tracker.getfd())
+    return [stat.st_dev, stat.st_ino]
+
+
+def _attach(descriptor, owner):
+    """
+    _attach used to map the segment of descriptor, registered to the
+    resource tracker of this process by the owner only
+
+    Before python 3.13 attaching always registers the name. The tracker
+    keeps one entry per name, so a consumer sharing the tracker of the
+    process that created the segment (processes started by multiprocessing
+    inherit it) leaves the entry: unregistering would drop the one of the
+    owner. A consumer with a tracker of its own unregisters the name, else
+    its tracker unlinks the segment when it exits.
+    """
+    if TRACK_ARGUMENT:
+        return SharedMemory(name=descriptor['name'], track=owner)
+    shm = SharedMemory(name=descriptor['name'])
+    if not owner and _tracker_id() != descriptor.get('tracker'):
+        _untrack(shm)
+    return shm
+
+
+def share_columns(columns):
+    """
+    share_columns used to copy per kind columns into one shared memory
+    segment, to hand them to another process without pickling the arrays
+
+    The segment is not owned by this process once shared: the process
+    attaching it with owner=True unlinks it, see SharedColumns. The owner
+    is expected to share the resource tracker of this process, as the
+    processes of one multiprocessing tree do.
+
+    Returns
+    -------
+    descriptor : dict
+        {'name': segment name, 'size': , 'tracker': resource tracker id,
+         'arrays': [(kind, column name, dtype str, shape, offset)]}
+    """
+    arrays = []
+    size = 0
+    for kind, kind_columns in columns.items():
+        for name, array in kind_columns.items():
+            array = np.ascontiguousarray(array)
+            arrays.append((kind, name, array.dtype.str, array.shape, size, array))
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    if TRACK_ARGUMENT:
+        shm = SharedMemory(create=True, size=max(size, 1), track=False)
+    else:
+        shm = SharedMemory(create=True, size=max(size, 1))
+    try:
+        for _, _, dtype, shape, offset, array in arrays:
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+        descriptor = {'name': shm.name, 'size': size,
+                      'tracker': None if TRACK_ARGUMENT else _tracker_id(),
+                      'arrays': [each[:5] for each in arrays]}
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    if not TRACK_ARGUMENT:
+        _untrack(shm)
+    return descriptor
+
+
+class SharedColumns:
+    """ SharedColumns
+    Per kind columns attached from a share_columns descriptor, as numpy
+    views on the shared memory segment, no copy.
+
+    Parameters
+    ----------
+    descriptor : dict
+        output of share_columns
+    owner : bool
+        True for the one process in charge of the segment: release unlinks
+        it, and the segment is unlinked if the process dies before. Other
+        consumers attach with owner=False and only close their mapping,
+        the segment is not registered to their resource tracker.
+
+    Notes
+    ----------
+    Views must not be used after release. A segment still mapped (views
+    alive) is unlinked anyway and freed once the last mapping goes away.
+
+    Examples
+    ----------
+    >>> with SharedColumns(descriptor) as shared:
+    ...     hr = shared.columns['recordHR']['data']
+    """
+
+    def __init__(self, descriptor, owner=True):
+        self.descriptor = descriptor
+        self.owner = owner
+        self._shm = _attach(descriptor, owner)
+        self.columns = {}
+        for kind, name, dtype, shape, offset in descriptor['arrays']:
+            self.columns.setdefault(kind, {})[name] = np.ndarray(
+                shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+
+    def copy(self):
+        ''' Columns copied out of the segment, usable after release '''
+        return {kind: {name: array.copy() for name, array in kind_columns.items()}
+                for kind, kind_columns in self.columns.items()}
+
+    def release(self):
+        if self._shm is None:
+            return
+        shm, self._shm = self._shm, None
+        self.columns = {}
+        if self.owner:
+            shm.unlink()
+        try:
+            shm.close()
+        except BufferError:
+            pass  # views still referenced, the mapping goes with them
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __del__(self):
+        if getattr(self, '_shm', None) is not None:
+            self.release()
+
+
+def read_sens_shared(filepath_or_buffer, chunk_size=1 << 24):
+    """
+    read_sens_shared used in parser workers: read_sens_columns, columns
+    shared by share_columns
+
+    Returns
+    -------
+    result : dict
+        {'path', 'descriptor', 'quarantine': [(line number, line, error str)]}
+    """
+    quarantine = []
+    columns = read_sens_columns(filepath_or_buffer, quarantine=quarantine, chunk_size=chunk_size)
+    return {'path': filepath_or_buffer,
+            'descriptor': share_columns(columns),
+            'quarantine': [(lineno, line, str(e)) for lineno, line, e in quarantine]}
+
+
+def iter_sens_shared(paths, max_workers=None):
+    """
+    iter_sens_shared used to parse capture files in worker processes that
+    hand back shared memory descriptors only
+
+    Yields
+    ------
+    path : str
+    shared : SharedColumns
+        owned by the caller, release it (or use it as context manager) once done
+    quarantine : list
+
+    Notes
+    ----------
+    Closing the generator early unlinks the segments of the results not
+    handed out yet, waiting for the workers still running. A segment leaks
+    if this process dies between the untrack in share_columns of the worker
+    and the attach here: no tracker holds its name then.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(read_sens_shared, path) for path in paths]
+        n_handed = 0
+        try:
+            for future in futures:
+                result = future.result()
+                shared = SharedColumns(result['descriptor'])
+                n_handed += 1
+                yield result['path'], shared, result['quarantine']
+        finally:
+            # segments of the results not handed out are unlinked here
+            for future in futures[n_handed:]:
+                if future.cancel():
+                    continue
+                try:
+                    descriptor = future.result()['descriptor']
+                except Exception:
+                    continue
+                SharedColumns(descriptor).release()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+import sys
+
+# The repository root is the wearableio package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'wearableio' not in sys.modules:
+    spec = importlib.util.spec_from_file_location('wearableio', os.path.join(ROOT, '__init__.py'),
+                                                  submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['wearableio'] = module
+    spec.loader.exec_module(module)
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from wearableio.sensomics.encoder import encode_sens_columns, format_sens_lines, random_sens_data  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def sens_capture():
+    """
+    Factory of capture bytes, sens_capture(kinds, n, seed=0, time=None):
+    n random frames of each of kinds, the frames of kind i at time
+    np.arange(n) * len(kinds) + i unless time is given, sorted by time
+    """
+    def capture(kinds, n, seed=0, time=None):
+        columns = {}
+        for i, kind in enumerate(kinds):
+            data, date = random_sens_data(kind, n, seed=seed + i)
+            columns[kind] = {'time': np.arange(n) * len(kinds) + i if time is None else time, 'data': data}
+            if date is not None:
+                columns[kind]['date'] = date
+        return format_sens_lines(*encode_sens_columns(columns))
+    return capture
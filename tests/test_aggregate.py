@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+from wearableio.options import option_context
+from wearableio.sensomics.aggregate import SensSummary, summarize_sens_text
+from wearableio.sensomics.io import data_columns, iter_sens_text, read_sens_columns
+from wearableio.sensomics.settings import SENSOMICS_SUMMARY_COLUMNS
+
+KINDS = ['recordHR', 'recordBP', 'recordST', 'recordSleep', 'stateActivity']
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('aggregate') / 'capture.txt'
+    # time in ms over 3 days, the dated kinds are bucketed by their date
+    path.write_bytes(sens_capture(KINDS, 200, time=np.arange(200) * 1500000))
+    return str(path)
+
+
+def _expected(columns, freq):
+    ''' Rollup of decoded columns with a pandas groupby '''
+    unit = 'datetime64[{}]'.format(freq)
+    frames = []
+    for kind, kind_columns in columns.items():
+        if 'date' in kind_columns:
+            bucket = kind_columns['date'].astype(unit)
+        else:
+            bucket = (kind_columns['time'] // 1000).astype('datetime64[s]').astype(unit)
+        data = kind_columns['data'].astype(np.float64)
+        if kind == 'recordSleep':
+            metrics = [('sleep_minute_{}'.format(int(each)), data[:, 1], data[:, 0] == each)
+                       for each in np.unique(data[:, 0])]
+        else:
+            metrics = [(column, data[:, data_columns(kind).index(column)], slice(None))
+                       for column in SENSOMICS_SUMMARY_COLUMNS[kind]]
+        for metric, values, mask in metrics:
+            frames.append(pd.DataFrame({'bucket': bucket[mask], 'kind': kind, 'metric': metric,
+                                        'value': values[mask]}))
+    grouped = pd.concat(frames).groupby(['bucket', 'kind', 'metric'])['value']
+    return grouped.agg(['count', 'sum', 'min', 'max', 'mean'])
+
+
+def _assert_summary_equal(summary, expected):
+    assert summary.index.tolist() == expected.index.tolist()
+    assert summary['count'].tolist() == expected['count'].tolist()
+    for name in ('sum', 'min', 'max', 'mean'):
+        np.testing.assert_allclose(summary[name].to_numpy(), expected[name].to_numpy())
+
+
+@pytest.mark.parametrize('freq', ['D', 'h'])
+def test_summarize_matches_groupby(capture, freq):
+    expected = _expected(read_sens_columns(capture), freq)
+    _assert_summary_equal(summarize_sens_text(capture, freq=freq, chunk_size=1 << 12), expected)
+
+
+def test_update_by_record_matches_update_columns(capture):
+    by_columns = SensSummary(freq='h')
+    by_columns.update_columns(read_sens_columns(capture))
+    by_record = SensSummary(freq='h')
+    for record in iter_sens_text(capture):
+        by_record.update(record)
+    _assert_summary_equal(by_record.result(), by_columns.result())
+    with option_context('date.format_out', 'epoch'):
+        by_epoch = SensSummary(freq='h')
+        for record in iter_sens_text(capture):
+            by_epoch.update(record)
+    _assert_summary_equal(by_epoch.result(), by_columns.result())
+
+
+def test_dated_kind_bucketed_by_date():
+    date = np.array(['2024-05-01T08:00', '2024-05-01T21:30', '2024-05-02T00:10'], dtype='datetime64[s]')
+    summary = SensSummary(freq='D')
+    summary.update_columns({'recordHR': {'time': np.zeros(3, dtype=np.int64), 'date': date,
+                                         'data': np.array([[60], [90], [75]])}})
+    summary.update_columns({'recordHR': {'time': np.zeros(1, dtype=np.int64), 'date': date[:1],
+                                         'data': np.array([[30]])}})
+    result = summary.result().loc[(slice(None), 'recordHR', 'hr'), :]
+    assert result['count'].tolist() == [3, 1]
+    assert result['min'].tolist() == [30, 75] and result['max'].tolist() == [90, 75]
+    assert result['mean'].tolist() == [60, 75]
+
+
+def test_summary_invalid_freq():
+    with pytest.raises(ValueError):
+        SensSummary(freq='W')
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+from wearableio.hooks import register_hook, remove_hook
+from wearableio.sensomics.io import read_sens_columns, write_sens
+
+pa = pytest.importorskip('pyarrow')
+from wearableio.sensomics.arrow import columns_to_arrow  # noqa: E402
+
+KINDS = ['recordHR', 'recordBP', 'streamPPG', 'stateMultiMeasure']
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('arrow') / 'capture.txt'
+    path.write_bytes(sens_capture(KINDS, 50))
+    return str(path)
+
+
+@pytest.mark.parametrize('data_layout', ['columns', 'list'])
+def test_columns_to_arrow(capture, data_layout):
+    for kind, kind_columns in read_sens_columns(capture).items():
+        table = columns_to_arrow(kind, kind_columns, data_layout)
+        if data_layout == 'columns':
+            width = kind_columns['data'].shape[1]
+            data = np.column_stack([table.column(name).to_numpy() for name in table.column_names[-width:]])
+        else:
+            data = np.stack(table.column('data').to_numpy(zero_copy_only=False))
+        np.testing.assert_array_equal(data, kind_columns['data'])
+        np.testing.assert_array_equal(table.column('time').to_numpy(), kind_columns['time'])
+
+
+@pytest.mark.parametrize('format_out', ['parquet', 'feather'])
+def test_write_sens_arrow_traced(capture, tmp_path, format_out):
+    events = []
+    hook = register_hook(events.append, points=['io'])
+    try:
+        n_rows = write_sens(capture, str(tmp_path / 'out'), format_out)
+    finally:
+        remove_hook(hook)
+    assert n_rows == 50 * len(KINDS)
+    written = sorted(os.path.basename(event['path']) for event in events if event['op'] == 'write')
+    assert written == sorted('{}.{}'.format(kind, format_out) for kind in KINDS)
+
+
+@pytest.mark.parametrize('fields_out', [['data'], ['date'], []])
+@pytest.mark.parametrize('data_layout', ['columns', 'list'])
+def test_columns_to_arrow_projected(capture, fields_out, data_layout):
+    full = read_sens_columns(capture)
+    for kind, kind_columns in read_sens_columns(capture, fields_out=fields_out).items():
+        table = columns_to_arrow(kind, kind_columns, data_layout)
+        expected = columns_to_arrow(kind, full[kind], data_layout)
+        n_head = 2 if 'date' in full[kind] else 1  # time(, date)
+        names = ['time']
+        if 'date' in fields_out:
+            names += expected.column_names[1:n_head]
+        if 'data' in fields_out:
+            names += expected.column_names[n_head:]
+        assert table.column_names == names
+        assert table.equals(expected.select(names))
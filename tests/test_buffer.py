@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.buffer import ColumnBuffer
+from wearableio.sensomics.io import estimate_sens_text
+
+
+def test_column_buffer_grows_and_trims():
+    buffer = ColumnBuffer(capacity=2, shape=(2,), dtype='int64')
+    buffer.append([1, 2])
+    buffer.extend([[3, 4], [5, 6], [7, 8]])
+    assert len(buffer) == 4 and buffer.capacity >= 4
+    assert buffer.n_allocations == 2
+    np.testing.assert_array_equal(buffer.data, [[1, 2], [3, 4], [5, 6], [7, 8]])
+    trimmed = buffer.trim()
+    assert trimmed.shape == (4, 2) and buffer.capacity == 4
+    np.testing.assert_array_equal(trimmed, [[1, 2], [3, 4], [5, 6], [7, 8]])
+
+
+def test_column_buffer_fair_capacity_allocates_once():
+    buffer = ColumnBuffer(capacity=100)
+    for i in range(10):
+        buffer.extend(np.arange(10.0) + 10 * i)
+    assert buffer.n_allocations == 1
+    np.testing.assert_array_equal(buffer.trim(), np.arange(100.0))
+
+
+def test_column_buffer_growth_above_one():
+    with pytest.raises(ValueError):
+        ColumnBuffer(growth=1)
+
+
+def test_estimate_sens_text(tmp_path, sens_capture):
+    path = tmp_path / 'capture.txt'
+    path.write_bytes(sens_capture(['recordHR', 'streamPPG'], 2000))
+    estimate = estimate_sens_text(str(path), sample_size=1 << 12)
+    assert estimate['kinds'].keys() == {'recordHR', 'streamPPG'}
+    assert abs(estimate['n_lines'] - 4000) < 400
+    for count in estimate['kinds'].values():
+        assert abs(count - 2000) < 400
+    whole = estimate_sens_text(str(path), sample_size=1 << 24)
+    assert whole == {'n_lines': 4000, 'kinds': {'recordHR': 2000, 'streamPPG': 2000}}
+
+
+def test_estimate_sens_text_empty(tmp_path):
+    path = tmp_path / 'capture.txt'
+    path.write_bytes(b'')
+    assert estimate_sens_text(str(path)) == {'n_lines': 0, 'kinds': {}}
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.calibration import SensCalibration
+from wearableio.sensomics.io import read_sens_columns
+
+KINDS = ['streamACX', 'streamACY', 'streamPPG']
+
+
+@pytest.fixture(scope='module')
+def columns(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('calibration') / 'capture.txt'
+    path.write_bytes(sens_capture(KINDS, 100))
+    return read_sens_columns(str(path))
+
+
+@pytest.fixture
+def calibration():
+    calibration = SensCalibration()
+    calibration.set('band-01', 'streamACX', offset=12, gain=1.02)
+    calibration.set('band-02', 'streamACX', offset=[1, 2, 3, 4, 5], sensitivity=1 / 128)
+    return calibration
+
+
+def test_default_calibration_keeps_decoded_values(columns):
+    calibrated = SensCalibration().apply(columns)
+    for kind in ('streamACX', 'streamACY'):
+        np.testing.assert_allclose(calibrated[kind]['data'], columns[kind]['data'])
+        np.testing.assert_array_equal(calibrated[kind]['raw'] * (1 / 256), columns[kind]['data'])
+    assert 'raw' not in calibrated['streamPPG']
+    assert calibrated['streamPPG']['data'] is columns['streamPPG']['data']
+
+
+def test_apply_again_from_raw(columns, calibration):
+    raw = SensCalibration().apply(columns)['streamACX']['raw']
+    first = calibration.apply(columns, device='band-01')
+    np.testing.assert_allclose(first['streamACX']['data'], (raw - 12) / 256 * 1.02)
+    second = calibration.apply(first, device='band-02')
+    np.testing.assert_array_equal(second['streamACX']['raw'], raw)
+    np.testing.assert_allclose(second['streamACX']['data'], (raw - np.arange(1, 6)) / 128)
+    np.testing.assert_allclose(second['streamACX']['data'],
+                               calibration.apply(columns, device='band-02')['streamACX']['data'])
+    assert 'raw' not in columns['streamACX']
+
+
+def test_save_and_load(tmp_path, columns, calibration):
+    path = str(tmp_path / 'calibration.json')
+    calibration.save(path)
+    loaded = SensCalibration.load(path)
+    assert loaded.to_dict() == calibration.to_dict()
+    np.testing.assert_array_equal(loaded.apply(columns, device='band-02')['streamACX']['data'],
+                                  calibration.apply(columns, device='band-02')['streamACX']['data'])
+
+
+def test_set_invalid():
+    with pytest.raises(ValueError):
+        SensCalibration().set('band-01', 'streamPPG', gain=2)
+    with pytest.raises(ValueError):
+        SensCalibration().set('band-01', 'streamACX', scale=2)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import pytest
+from wearableio import cli
+from wearableio.cli import EXIT_OK, EXIT_USAGE, convert_file, find_inputs, main
+
+
+@pytest.fixture
+def write_capture(sens_capture):
+    def write(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fodata:
+            fodata.write(sens_capture(['recordHR'], 10))
+    return write
+
+
+def test_same_name_from_two_inputs_rejected(tmp_path, capsys, write_capture):
+    for root in ('a', 'b'):
+        write_capture(str(tmp_path / root / 'day.txt'))
+    outdir = str(tmp_path / 'out')
+    argv = [str(tmp_path / 'a'), str(tmp_path / 'b'), '-o', outdir, '-j', '1', '-q']
+    assert main(argv) == EXIT_USAGE
+    assert 'are both converted to' in capsys.readouterr().err
+    assert not os.path.exists(outdir)
+    assert main([str(tmp_path / '*' / 'day.txt'), '-o', outdir, '-j', '1', '-q']) == EXIT_USAGE
+    assert main([str(tmp_path), '-o', outdir, '-j', '1', '-q']) == EXIT_OK
+    assert sorted(os.listdir(outdir)) == ['a', 'b']
+
+
+def test_file_reached_twice_converted_once(tmp_path, write_capture):
+    write_capture(str(tmp_path / 'a' / 'day.txt'))
+    found = find_inputs([str(tmp_path / 'a'), str(tmp_path / 'a' / '*.txt')])
+    assert found == [(str(tmp_path / 'a' / 'day.txt'), 'day.txt')]
+
+
+def test_arrow_format_without_pyarrow_written_as_npz(tmp_path, capsys, monkeypatch, write_capture):
+    write_capture(str(tmp_path / 'day.txt'))
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    assert main([str(tmp_path / 'day.txt'), '-f', 'parquet', '-j', '1', '-q']) == EXIT_OK
+    assert 'pyarrow is not installed' in capsys.readouterr().err
+    assert os.path.isfile(str(tmp_path / 'day.npz'))
+    assert not os.path.exists(str(tmp_path / 'day.parquet'))
+
+
+def test_failed_conversion_keeps_previous_output(tmp_path, monkeypatch, write_capture):
+    path = str(tmp_path / 'day.txt')
+    write_capture(path)
+    path_out = str(tmp_path / 'day.csv')
+    assert convert_file(path, path_out, 'csv')['error'] is None
+    before = sorted(os.listdir(path_out))
+
+    def write_sens_failing(path, tmp_out, format_out, quarantine):
+        os.makedirs(tmp_out)
+        with open(os.path.join(tmp_out, 'recordHR.csv'), 'w') as fodata:
+            fodata.write('partial')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(cli, 'write_sens', write_sens_failing)
+    result = convert_file(path, path_out, 'csv', force=True)
+    assert result['error'] == 'OSError: disk full'
+    assert sorted(os.listdir(str(tmp_path))) == ['day.csv', 'day.txt']
+    assert sorted(os.listdir(path_out)) == before
+
+
+def test_directory_output_replaced(tmp_path, write_capture):
+    path = str(tmp_path / 'day.txt')
+    write_capture(path)
+    path_out = str(tmp_path / 'day.csv')
+    for _ in range(2):
+        result = convert_file(path, path_out, 'csv', force=True)
+        assert result['error'] is None and result['n_parsed'] == 10
+    assert sorted(os.listdir(str(tmp_path))) == ['day.csv', 'day.txt']
+    assert os.listdir(path_out) == ['recordHR.csv']
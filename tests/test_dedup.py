@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.dedup import SensDeduplicator, dedup_sens
+from wearableio.sensomics.io import iter_sens_text, read_sens_columns
+
+
+def _retransmit(lines, rows, time):
+    ''' Lines of rows sent again at time '''
+    return [b'%d;%s' % (time + i, lines[row].split(b';')[1]) for i, row in enumerate(rows)]
+
+
+@pytest.fixture
+def capture(tmp_path, sens_capture):
+    ''' (path, original path): 40 recordHR and 40 streamPPG lines, then 10 lines of each sent again '''
+    lines = sens_capture(['recordHR', 'streamPPG'], 40).splitlines(keepends=True)
+    original = tmp_path / 'original.txt'
+    original.write_bytes(b''.join(lines))
+    path = tmp_path / 'capture.txt'
+    path.write_bytes(b''.join(lines + _retransmit(lines, range(60, 80), 1000)))
+    return str(path), str(original)
+
+
+def test_retransmissions_dropped(capture):
+    path, original = capture
+    expected = read_sens_columns(original)
+    for chunk_size in (1 << 24, 1 << 10):
+        columns = dedup_sens(path, chunk_size=chunk_size)
+        np.testing.assert_array_equal(columns['recordHR']['time'], expected['recordHR']['time'])
+        np.testing.assert_array_equal(columns['recordHR']['data'], expected['recordHR']['data'])
+        assert len(columns['streamPPG']['time']) == 50  # not deduplicated
+
+
+def test_records_and_columns_agree(capture):
+    path, _ = capture
+    dedup = SensDeduplicator()
+    records = [record for record in dedup.filter(iter_sens_text(path)) if record['kind'] == 'recordHR']
+    assert dedup.n_duplicates == 10 and dedup.n_seen == 50
+    columns = SensDeduplicator().filter_columns(read_sens_columns(path))
+    assert [record['time'] for record in records] == columns['recordHR']['time'].tolist()
+
+
+def test_retransmission_kept_after_eviction(tmp_path, sens_capture):
+    lines = sens_capture(['recordHR'], 20).splitlines(keepends=True)
+    path = tmp_path / 'capture.txt'
+    # row 19 is among the 5 keys seen last, rows 0 and 10 were evicted
+    path.write_bytes(b''.join(lines + _retransmit(lines, [19, 0, 10], 1000)))
+    columns = dedup_sens(str(path), capacity=5)
+    assert columns['recordHR']['time'].tolist() == list(range(20)) + [1001, 1002]
+    assert len(dedup_sens(str(path), capacity=32)['recordHR']['time']) == 20
+
+
+def test_capacity_bounds_keys():
+    dedup = SensDeduplicator(capacity=3)
+    assert [dedup.seen('recordHR', key) for key in (1, 2, 3, 1, 4, 2, 1)] == [
+        False, False, False, True, False, False, True]
+    assert list(dedup._keys['recordHR']) == [4, 2, 1]
+    with pytest.raises(ValueError):
+        SensDeduplicator(capacity=0)
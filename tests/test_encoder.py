@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.options import option_context
+from wearableio.sensomics.encoder import (DEFAULT_LENGTH_FIELD, SENSOMICS_ENCODER, _frame_obj,
+                                          encode_sens_array, random_sens_data)
+from wearableio.sensomics.io import (data_columns, decode_sens_array, read_sens_stream,
+                                     to_sens_columns, _decoded_to_columns)
+from wearableio.sensomics.settings import SENSOMICS_DATED_KINDS
+
+KINDS = sorted(SENSOMICS_ENCODER)
+DATES = np.array(['2000-01-01T00:00', '2000-02-29T12:30', '2255-12-31T23:59'], dtype='datetime64[s]')
+
+
+def edge_sens_data(kind):
+    ''' Lowest and highest value of each column of kind, rows repeated over DATES '''
+    width = len(data_columns(kind))
+    if kind == 'recordST':
+        low, high = [0.0], [255.99]
+    elif kind == 'stateMultiMeasure':
+        low, high = [0.0] * 4 + [0.0], [255.0] * 4 + [255.99]
+    elif kind == 'stateTag':
+        return DATES[:, None], None
+    elif kind == 'recordSleep':
+        low, high = [0, 0], [255, (1 << 16) - 1]
+    elif kind == 'stateActivity':
+        low, high = [0] * 5, [(1 << 24) - 1, (1 << 24) - 1, 255 * 60 + 255, 255 * 60 + 255, 255]
+    elif kind == 'streamPPG':
+        low, high = [0] * 8, [(1 << 16) - 1] * 8
+    elif kind.startswith('streamAC'):
+        sensitivity = _frame_obj(kind).sensitivity
+        low, high = [-(1 << 15) * sensitivity] * 5, [((1 << 15) - 1) * sensitivity] * 5
+    else:
+        low, high = [0] * width, [255] * width
+    data = np.array([low, high, high])
+    return data, DATES if kind in SENSOMICS_DATED_KINDS else None
+
+
+def _decode(kind, frames):
+    ''' Columns of kind decoded at once and frame by frame '''
+    time = np.arange(len(frames))
+    with option_context('date.format_out', 'datetime64'):
+        decoded, rejected = decode_sens_array(time, frames)
+        parsed = [read_sens_stream(t, frame) for t, frame in zip(time, frames.tolist())]
+    assert rejected.tolist() == [] and list(decoded) == [kind]
+    return _decoded_to_columns(kind, decoded[kind]), to_sens_columns(parsed)[kind]
+
+
+def _assert_round_trip(kind, data, date):
+    frames = encode_sens_array(kind, data, date)
+    for columns in _decode(kind, frames):
+        if kind == 'stateTag':
+            np.testing.assert_array_equal(columns['data'][:, 0], data[:, 0])
+        else:
+            np.testing.assert_allclose(columns['data'], data, rtol=0, atol=1e-9)
+        if date is not None:
+            np.testing.assert_array_equal(columns['date'], date)
+
+
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('seed', range(4))
+def test_random_round_trip(kind, seed):
+    data, date = random_sens_data(kind, 64, seed=seed)
+    _assert_round_trip(kind, data, date)
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_edge_round_trip(kind):
+    data, date = edge_sens_data(kind)
+    _assert_round_trip(kind, data, date)
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_length_field(kind):
+    data, date = edge_sens_data(kind)
+    frames = encode_sens_array(kind, data, date)
+    fields = {field.name: field for field in _frame_obj(kind)}
+    if 'length field' not in fields:
+        pytest.skip('no length field')
+    field = fields['length field']
+    if isinstance(field.validator, list):  # fixed by the kind
+        expected = field.validator[0] << 8 | field.validator[1]
+    else:
+        expected = DEFAULT_LENGTH_FIELD
+    length = frames[:, field.offset].astype(np.int64)
+    assert (length[:, 0] << 8 | length[:, 1]).tolist() == [expected] * len(frames)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from wearableio.sensomics.feature import SensFeatureStream
+
+
+def test_stalled_axis_buffer_capped():
+    stream = SensFeatureStream(acceleration={'window': 10, 'features': ['rms']}, max_pending=20)
+    for _ in range(10):
+        assert stream.update_samples('streamACX', np.ones(5)) == []
+        assert stream.update_samples('streamACY', np.ones(5)) == []
+    assert stream.n_dropped == 2 * 30
+    assert [len(np.concatenate(stream._axes[kind])) for kind in ('streamACX', 'streamACY')] == [20, 20]
+    assert stream._axes['streamACZ'] == []
+    features = stream.update_samples('streamACZ', np.ones(10))
+    assert len(features) == 1 and len(features[0][1]['start']) == 1
+    assert [len(np.concatenate(stream._axes[kind])) for kind in ('streamACX', 'streamACY')] == [10, 10]
+
+
+def test_aligned_axes_not_dropped():
+    stream = SensFeatureStream(acceleration={'window': 10, 'features': ['rms']}, max_pending=5)
+    n_windows = 0
+    for _ in range(20):
+        for kind in ('streamACX', 'streamACY', 'streamACZ'):
+            n_windows += sum(len(features['start']) for _, features in
+                             stream.update_samples(kind, np.arange(5.0)))
+    assert stream.n_dropped == 0
+    assert n_windows == 10
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from wearableio.options import option_context
+from wearableio.sensomics.encoder import encode_sens_columns, random_sens_data
+from wearableio.sensomics.frame import RecordHRFrame
+
+
+def _frame():
+    data, date = random_sens_data('recordHR', 1, seed=0)
+    _, frames = encode_sens_columns({'recordHR': {'time': np.arange(1), 'date': date, 'data': data}})
+    return frames[0].tolist()
+
+
+def test_cache_follows_date_options():
+    frame, cached, plain = _frame(), RecordHRFrame(), RecordHRFrame()
+    cached.enable_cache()
+    for format_out, strftime in [('datetime64', '%Y'), ('epoch', '%Y'), ('str', '%Y-%m-%d'),
+                                 ('str', '%H:%M'), ('datetime64', '%Y')]:
+        with option_context('date.format_out', format_out), option_context('date.strftime', strftime):
+            date = plain.parse(frame)['date']
+            assert cached.parse(frame)['date'] == (tuple(date) if isinstance(date, list) else date)
+    assert cached.cache_info().hits == 1
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+from wearableio.sensomics.io import data_columns, read_sens_columns, read_sens_frames
+from wearableio.sensomics.settings import SENSOMICS_DATA_SCHEMA
+
+KINDS = ['recordHR', 'recordST', 'recordSleep', 'stateTag', 'stateActivity', 'streamPPG', 'streamACX']
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('frames') / 'capture.txt'
+    path.write_bytes(sens_capture(KINDS, 20))
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+def test_typed_columns_and_index(capture, engine):
+    columns = read_sens_columns(capture)
+    frames = read_sens_frames(capture, engine=engine)
+    assert sorted(frames) == sorted(KINDS)
+    for kind, frame in frames.items():
+        assert isinstance(frame.index, pd.DatetimeIndex) and frame.index.name == 'time'
+        assert frame.index.dtype == np.dtype('datetime64[ms]')
+        np.testing.assert_array_equal(frame.index.asi8, columns[kind]['time'])
+        assert not (frame.dtypes == object).any()
+        names = (['date'] if 'date' in columns[kind] else []) + data_columns(kind)
+        assert frame.columns.tolist() == names
+        if 'date' in columns[kind]:
+            assert frame['date'].dtype == np.dtype('datetime64[s]')
+            np.testing.assert_array_equal(frame['date'].to_numpy(), columns[kind]['date'])
+        for i, name in enumerate(data_columns(kind)):
+            if kind == 'recordSleep' and name == 'sleep_type':
+                assert isinstance(frame[name].dtype, pd.CategoricalDtype)
+                values = frame[name].astype(np.int64).to_numpy()
+            else:
+                assert frame[name].dtype == np.dtype(SENSOMICS_DATA_SCHEMA[kind]['dtype'])
+                values = frame[name].to_numpy()
+            np.testing.assert_array_equal(values, columns[kind]['data'][:, i])
+
+
+def test_time_unit_and_projection(capture):
+    frames = read_sens_frames(capture, kinds=['recordHR'], time_unit='s', fields_out=['data'])
+    assert list(frames) == ['recordHR']
+    assert frames['recordHR'].columns.tolist() == ['hr']
+    assert frames['recordHR'].index.dtype == np.dtype('datetime64[s]')
+    with pytest.raises(ValueError):
+        read_sens_frames(capture, time_unit='ns')
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+from wearableio.sensomics.gap import detect_sens_gaps
+
+
+@pytest.fixture
+def capture(tmp_path, sens_capture):
+    time = np.arange(200) * 320
+    time[100:] += 3200  # 10 frames lost
+    lines = sens_capture(['streamPPG'], 200, time=time).splitlines(keepends=True)
+    lines.insert(50, b'16000;[161, 0]\n')
+    path = tmp_path / 'capture.txt'
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+def _gaps(index):
+    return [array.tolist() for array in index.gaps('streamPPG')]
+
+
+def test_cache_replays_quarantine(capture):
+    first, second = [], []
+    index = detect_sens_gaps(capture, quarantine=first)
+    assert os.path.exists(capture + '.gaps.npz')
+    cached = detect_sens_gaps(capture, quarantine=second)
+    assert _gaps(cached) == _gaps(index) == [[31680], [35200], [10]]
+    assert [(lineno, line) for lineno, line, _ in second] == [(lineno, line) for lineno, line, _ in first]
+    assert [lineno for lineno, _, _ in first] == [50]
+    assert all(isinstance(e, ValueError) for _, _, e in second)
+    with pytest.raises(ValueError):
+        detect_sens_gaps(capture)
+
+
+def test_unreadable_cache_is_a_miss(capture):
+    index = detect_sens_gaps(capture, quarantine=[])
+    with open(capture + '.gaps.npz', 'wb') as fodata:
+        fodata.write(b'PK\x03\x04 truncated')
+    quarantine = []
+    assert _gaps(detect_sens_gaps(capture, quarantine=quarantine)) == _gaps(index)
+    assert len(quarantine) == 1
+    assert _gaps(detect_sens_gaps(capture, quarantine=[])) == _gaps(index)  # rewritten
+    assert [name for name in os.listdir(os.path.dirname(capture)) if name.endswith('.tmp')] == []
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio import hooks
+from wearableio.hooks import FlameGraphHook, clear_hooks, register_hook, remove_hook
+from wearableio.sensomics.io import read_sens_columns
+
+KINDS = ['recordHR', 'streamPPG']
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('hooks') / 'capture.txt'
+    path.write_bytes(sens_capture(KINDS, 50))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_hooks():
+    yield
+    clear_hooks()
+
+
+def test_sampled_frames_traced_from_dispatch_to_parse(capture):
+    events = []
+    hook = register_hook(events.append, sample=10)
+    columns = read_sens_columns(capture, engine='python')
+    remove_hook(hook)
+    assert not hooks.enabled
+    decoded = [event for event in events if event['point'] != 'io']
+    assert sum(event['point'] == 'dispatch' for event in decoded) == 100 // 10
+    frames, frame = [], []
+    for event in decoded:  # dispatch, field..., parse per sampled frame
+        frame.append(event)
+        if event['point'] == 'parse':
+            frames.append(frame)
+            frame = []
+    assert frame == [] and len(frames) == 10
+    for frame in frames:
+        assert frame[0]['point'] == 'dispatch'
+        assert {event['kind'] for event in frame} == {frame[0]['kind']}
+        assert {event['field'] for event in frame[1:-1]} >= {'data field'}
+        assert all(event['elapsed'] >= 0 for event in frame)
+    io = [event for event in events if event['point'] == 'io']
+    assert [(event['op'], event['path']) for event in io] == [('read', capture)]
+    for kind, kind_columns in read_sens_columns(capture, engine='python').items():
+        np.testing.assert_array_equal(kind_columns['data'], columns[kind]['data'])
+
+
+def test_batches_not_sampled(capture):
+    events = []
+    register_hook(events.append, points=['parse'], sample=1000)
+    read_sens_columns(capture, engine='numpy')
+    assert {event['point'] for event in events} == {'parse'}
+    rows = {}
+    for event in events:
+        rows[event['kind']] = rows.get(event['kind'], 0) + event['rows']
+    assert rows == {'recordHR': 50, 'streamPPG': 50}
+
+
+def test_projected_field_validated_not_converted(capture):
+    events = []
+    register_hook(events.append, points=['field'])
+    read_sens_columns(capture, engine='python', fields_out=['data'])
+    date_events = [event for event in events if event['kind'] == 'recordHR' and event['field'] == 'date field']
+    assert len(date_events) == 50
+    assert all(event['convert'] == 0.0 for event in date_events)
+
+
+def test_flame_graph(capture, tmp_path):
+    flame = FlameGraphHook()
+    register_hook(flame)
+    read_sens_columns(capture, engine='python')
+    read_sens_columns(capture, engine='numpy')
+    clear_hooks()
+    assert {'decode;recordHR;dispatch', 'decode;recordHR;parse', 'decode;recordHR;parse;data_field;convert',
+            'decode_array;streamPPG;parse', 'io;read;capture.txt'} <= set(flame.stacks)
+    path = str(tmp_path / 'decode.folded')
+    flame.save(path)
+    with open(path) as fodata:
+        lines = fodata.read().splitlines()
+    assert [line.rsplit(' ', 1)[0] for line in lines] == sorted(flame.stacks)
+    assert all(int(line.rsplit(' ', 1)[1]) >= 0 for line in lines)
+
+
+def test_register_invalid():
+    with pytest.raises(ValueError):
+        register_hook(print, points=['decode'])
+    with pytest.raises(ValueError):
+        register_hook(print, sample=0)
+    assert not hooks.enabled
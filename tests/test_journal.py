@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+from wearableio.sensomics.io import read_sens_columns
+from wearableio.sensomics.journal import JOURNAL_LOG, SensJournal, ingest_sens
+
+CHUNK_SIZE = 1 << 10
+
+
+@pytest.fixture
+def capture(tmp_path, sens_capture):
+    lines = sens_capture(['recordHR'], 200).splitlines(keepends=True)
+    lines.insert(50, b'50;[1.5]\n')
+    path = tmp_path / 'capture.txt'
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+def _assert_columns_equal(journal, capture):
+    quarantine = []
+    expected = read_sens_columns(capture, quarantine=quarantine)
+    columns = journal.columns()
+    assert columns.keys() == expected.keys()
+    for kind, kind_columns in expected.items():
+        assert columns[kind].keys() == kind_columns.keys()
+        for name, column in kind_columns.items():
+            np.testing.assert_array_equal(columns[kind][name], column)
+    assert [lineno for lineno, _, _ in journal.quarantine()] == [lineno for lineno, _, _ in quarantine]
+
+
+def test_ingest_by_chunks(capture, tmp_path):
+    journal = ingest_sens(capture, str(tmp_path / 'journal'), chunk_size=CHUNK_SIZE)
+    assert len(journal.segments) > 2
+    assert journal.offset == os.path.getsize(capture)
+    _assert_columns_equal(journal, capture)
+
+
+def test_resume_after_torn_log(capture, tmp_path):
+    path = str(tmp_path / 'journal')
+    n_segments = len(ingest_sens(capture, path, chunk_size=CHUNK_SIZE).segments)
+    path_log = os.path.join(path, JOURNAL_LOG)
+    with open(path_log, 'r+b') as fodata:
+        fodata.truncate(os.path.getsize(path_log) - 10)  # last line torn
+    assert len(SensJournal(path).segments) == n_segments - 1
+    journal = ingest_sens(capture, path, chunk_size=CHUNK_SIZE)
+    assert len(journal.segments) == n_segments
+    _assert_columns_equal(journal, capture)
+
+
+def test_resume_after_corrupt_segment(capture, tmp_path):
+    path = str(tmp_path / 'journal')
+    journal = ingest_sens(capture, path, chunk_size=CHUNK_SIZE)
+    path_segment = os.path.join(path, journal.segments[-1]['segment'])
+    with open(path_segment, 'r+b') as fodata:
+        fodata.seek(-20, os.SEEK_END)
+        fodata.write(b'\0' * 10)
+    stray = os.path.join(path, 'segment-{:016d}.npz.tmp'.format(journal.offset))
+    with open(stray, 'wb') as fodata:
+        fodata.write(b'half written')
+    journal = ingest_sens(capture, path, chunk_size=CHUNK_SIZE)
+    assert not os.path.exists(stray)
+    _assert_columns_equal(journal, capture)
+
+
+@pytest.mark.parametrize('segment', [0, 1, -1])
+def test_modified_source_raises(capture, tmp_path, segment):
+    path = str(tmp_path / 'journal')
+    journal = ingest_sens(capture, path, chunk_size=CHUNK_SIZE)
+    with open(capture, 'r+b') as fodata:
+        fodata.seek(journal.segments[segment]['start'])
+        digit = fodata.read(1)  # of the time of the first line of the segment
+        fodata.seek(-1, os.SEEK_CUR)
+        fodata.write(b'8' if digit == b'9' else b'9')
+    with pytest.raises(ValueError):
+        ingest_sens(capture, path, chunk_size=CHUNK_SIZE)
+    with pytest.raises(ValueError):
+        SensJournal(path).check_source(capture)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.io import read_sens_columns, read_sens_text
+
+KINDS = ['recordHR', 'recordBP', 'streamPPG', 'stateActivity']
+SELECTED = [['recordHR'], ['streamPPG', 'recordBP'], ['stateTag']]
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    lines = sens_capture(KINDS, 30).splitlines(keepends=True)
+    time, frame = lines[8].split(b';')
+    lines[8] = time + b' ;  ' + frame.replace(b', ', b' ,', 3)  # spaced, still valid
+    lines.insert(20, b'1000;[171, 0, 14, 255, 81, 17, 24, 13, 6, 20, 23, 163, 0, 0, 0, 0, 0, 0, 0, 0]\n')  # month 13
+    lines.insert(40, b'1001;[1.5]\n')  # header not readable
+    path = tmp_path_factory.mktemp('kinds') / 'capture.txt'
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('kinds', SELECTED)
+def test_columns_kinds_same_as_filtering(capture, engine, kinds):
+    full = read_sens_columns(capture, quarantine=[], engine=engine)
+    quarantine = []
+    selected = read_sens_columns(capture, quarantine=quarantine, engine=engine, kinds=kinds)
+    assert sorted(selected) == sorted(kind for kind in full if kind in kinds)
+    for kind, kind_columns in selected.items():
+        for name, column in kind_columns.items():
+            np.testing.assert_array_equal(column, full[kind][name])
+    expected = [20, 40] if 'recordHR' in kinds else [40]
+    assert [lineno for lineno, _, _ in quarantine] == expected
+
+
+@pytest.mark.parametrize('kinds', SELECTED)
+def test_text_kinds_same_as_filtering(capture, kinds):
+    full = read_sens_text(capture, quarantine=[])
+    selected = read_sens_text(capture, quarantine=[], kinds=kinds)
+    assert selected == [parsed for parsed in full if parsed['kind'] in kinds]
+
+
+def test_kinds_invalid(capture):
+    with pytest.raises(ValueError):
+        read_sens_columns(capture, kinds=['recordHRV'])
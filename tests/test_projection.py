@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.io import iter_sens_text, read_sens_columns
+
+KINDS = ['recordHR', 'recordBP', 'streamPPG', 'stateActivity']
+FIELDS_OUT = [['data'], ['date'], []]
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    lines = sens_capture(KINDS, 20).splitlines(keepends=True)
+    lines.insert(5, b'100;[171, 0, 14, 255, 81, 17, 24, 13, 6, 20, 23, 163, 0, 0, 0, 0, 0, 0, 0, 0]\n')  # month 13
+    path = tmp_path_factory.mktemp('projection') / 'capture.txt'
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('fields_out', FIELDS_OUT)
+def test_columns_projection(capture, engine, fields_out):
+    full_quarantine, quarantine = [], []
+    full = read_sens_columns(capture, quarantine=full_quarantine, engine=engine)
+    projected = read_sens_columns(capture, quarantine=quarantine, engine=engine, fields_out=fields_out)
+    assert projected.keys() == full.keys()
+    for kind, kind_columns in full.items():
+        names = [name for name in kind_columns if name == 'time' or name in fields_out]
+        assert list(projected[kind]) == names
+        for name in names:
+            np.testing.assert_array_equal(projected[kind][name], kind_columns[name])
+    assert [lineno for lineno, _, _ in quarantine] == [lineno for lineno, _, _ in full_quarantine] == [5]
+
+
+@pytest.mark.parametrize('fields_out', FIELDS_OUT)
+def test_lines_projection(capture, fields_out):
+    full_quarantine, quarantine = [], []
+    full = list(iter_sens_text(capture, quarantine=full_quarantine))
+    projected = list(iter_sens_text(capture, quarantine=quarantine, fields_out=fields_out))
+    assert len(projected) == len(full)
+    for parsed, full_parsed in zip(projected, full):
+        assert parsed == {name: val for name, val in full_parsed.items() if name not in
+                          {'date', 'data'} - set(fields_out)}
+    assert [lineno for lineno, _, _ in quarantine] == [lineno for lineno, _, _ in full_quarantine] == [5]
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from pandas import Interval
+from wearableio.field import BaseField
+from wearableio.frame import BaseFrame
+from wearableio.protocol import PROTOCOLS, Protocol, get_protocol, register_protocol
+from wearableio.utils import join_byteblocks
+
+BLOCK = Interval(0x00, 0xff, closed='both')
+
+
+class ToyTemperatureFrame(BaseFrame):
+    ''' [0x5a, 0x01, high, low], temperature in 0.1 centigrade '''
+    _kind = 'toyTemperature'
+
+    def _construct_field(self):
+        self.head_field = BaseField('head field', 1, [0x5a], slice(0, 1))
+        self.kind_field = BaseField('kind field', 1, [0x01], slice(1, 2))
+        self.data_field = BaseField('data field', 2, [BLOCK, BLOCK], slice(2, 4))
+
+    def _set_field(self):
+        self.data_field.parse_func = lambda blocks: join_byteblocks(list(blocks), reverse=True) / 10
+        self.data_field.parse_array_func = lambda blocks: (blocks[:, 0] << 8 | blocks[:, 1]) / 10
+
+    def _construct_frame(self):
+        self.append(self.head_field)
+        self.append(self.kind_field)
+        self.append(self.data_field)
+
+    def parse(self, frame, fields_out=['data'], format_out='dict'):
+        return self._parse(frame, fields_out, format_out)
+
+
+class ToyUnknownFrame(BaseFrame):
+    _kind = 'unknown'
+
+    def _construct_field(self):
+        self.data_field = BaseField('data field', Interval(1, 4, closed='both'), [BLOCK] * 4, slice(0, 4))
+
+    def _set_field(self):
+        pass
+
+    def _construct_frame(self):
+        self.append(self.data_field)
+
+    def parse(self, frame, fields_out=['data'], format_out='dict'):
+        return self._parse(frame, fields_out, format_out)
+
+
+@pytest.fixture
+def toy():
+    protocol = register_protocol(Protocol('toy', parts=[{'offset': 0}, {'offset': 1}],
+                                          frame_type={0x5a: {0x01: ToyTemperatureFrame()}},
+                                          unknown=ToyUnknownFrame(), max_length=4))
+    yield protocol
+    del PROTOCOLS['toy']
+
+
+def test_toy_protocol_registered(toy):
+    assert get_protocol('toy') is toy
+    with pytest.raises(ValueError):
+        register_protocol(Protocol('toy', parts=[{'offset': 0}], frame_type={},
+                                   unknown=ToyUnknownFrame(), max_length=4))
+
+
+def test_toy_frame_by_frame_and_array(toy):
+    frames = np.array([[0x5a, 0x01, 0x01, 0x2c], [0x5a, 0x02, 0x00, 0x00],
+                       [0x5a, 0x01, 0x00, 0xfa], [0x5a, 0x01, 0x07, 0x00]])
+    sizes = np.array([4, 4, 4, 3])
+    time = np.arange(10, 14)
+    assert toy.read_stream(10, frames[0].tolist()) == {'time': 10, 'kind': 'toyTemperature', 'data': 30.0}
+    assert toy.read_stream(11, frames[1].tolist())['kind'] == 'unknown'
+    with pytest.raises(ValueError):
+        toy.read_stream(13, frames[3, :3].tolist())
+
+    decoded, rejected = toy.decode_array(time, frames, sizes, fields_out=['data'])
+    assert rejected.tolist() == [3]
+    temperature = decoded['toyTemperature']
+    assert temperature['row'].tolist() == [0, 2]
+    assert temperature['time'].tolist() == [10, 12]
+    for row, value in zip(temperature['row'], temperature['data']):
+        assert toy.read_stream(time[row], frames[row].tolist())['data'] == value
+    assert decoded['unknown']['row'].tolist() == [1]
+    assert decoded['unknown']['data'].tolist() == [frames[1].tolist()]
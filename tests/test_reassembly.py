@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.encoder import encode_sens_frame
+from wearableio.sensomics.io import decode_sens_array, read_sens_stream
+from wearableio.sensomics.reassembly import SensReassembler, reassemble_sens_text
+
+# stateBandInfoExtend head of 20 payload bytes: kind, user and 14 data bytes, 3 left for an extend frame
+HEAD = [0xab, 0x00, 20, 0xff, 0x9b, 5] + list(range(1, 15))
+EXTEND = [0x00, 0x00, 3, 15, 16, 17] + [0xee] * 14  # padding after the length field
+
+
+def test_extend_data_sliced_by_length_field():
+    frames = np.array([EXTEND, [0x00, 0x00, 17] + list(range(17))])
+    decoded, rejected = decode_sens_array([0, 1], frames)
+    assert read_sens_stream(0, EXTEND)['data'] == [15, 16, 17]
+    assert rejected.tolist() == []
+    assert decoded['extend']['data'][0].tolist() == [15, 16, 17] + [0] * 14
+    assert decoded['extend']['data'][1].tolist() == list(range(17))
+
+
+def test_extend_length_field_validated():
+    for length in (0, 18):
+        frame = [0x00, 0x00, length] + [1] * 17
+        _, rejected = decode_sens_array([0], np.array([frame]))
+        assert rejected.tolist() == [0]
+
+
+def test_interrupted_payload_reported():
+    quarantine = []
+    reassembler = SensReassembler(quarantine=quarantine)
+    record = encode_sens_frame('recordHR', [70], np.datetime64('2021-02-28T07:08'))
+    assert reassembler.feed(0, HEAD) == []
+    assert reassembler.feed(1, record)[0]['kind'] == 'recordHR'
+    assert reassembler.feed(2, EXTEND) == []  # orphan, its head was dropped
+    assert reassembler.stats['interrupted'] == 1
+    assert reassembler.stats['dropped'] == 2 and reassembler.stats['orphans'] == 1
+    assert [(time, str(e)) for time, _, e in quarantine] == [
+        (0, 'Frame dropped: interrupted'), (2, 'Frame dropped: orphan')]
+    assert quarantine[0][1] == HEAD
+
+
+def test_payload_reassembled():
+    reassembler = SensReassembler()
+    assert reassembler.feed(0, HEAD) == []
+    assert reassembler.feed(1, EXTEND) == [
+        {'time': 0, 'kind': 'stateBandInfoExtend', 'data': list(range(1, 18))}]
+    assert reassembler.stats['reassembled'] == 1 and not reassembler.pending
+
+
+def test_payload_of_several_extend_frames():
+    reassembler = SensReassembler()
+    assert reassembler.feed(0, [0xab, 0x00, 40, 0xff, 0x9b, 5] + list(range(1, 15))) == []
+    assert reassembler.feed(1, [0x00, 0x00, 17] + list(range(15, 32))) == []
+    parsed = reassembler.feed(2, [0x00, 0x00, 6] + list(range(32, 38)) + [0xee] * 11)
+    assert parsed == [{'time': 0, 'kind': 'stateBandInfoExtend', 'data': list(range(1, 38))}]
+
+
+def test_pending_payload_dropped_on_timeout():
+    quarantine = []
+    reassembler = SensReassembler(timeout=1000, quarantine=quarantine)
+    assert reassembler.feed(0, HEAD) == []
+    assert reassembler.feed(2000, EXTEND) == []  # too late, its head was dropped
+    assert not reassembler.pending
+    assert reassembler.stats['dropped'] == 2 and reassembler.stats['orphans'] == 1
+    assert reassembler.stats['reassembled'] == 0 and reassembler.stats['interrupted'] == 0
+    assert [(time, str(e)) for time, _, e in quarantine] == [
+        (0, 'Frame dropped: timeout'), (2000, 'Frame dropped: orphan')]
+
+
+def test_bad_lines_quarantined(tmp_path):
+    record = encode_sens_frame('recordHR', [70], np.datetime64('2021-02-28T07:08'))
+    lines = ['0;{}'.format(HEAD), '1;{}'.format(EXTEND), '2;[1.5]', 'no separator', '3;[171, 1.5, 2]',
+             '4;{}'.format(list(record)), '5;[1, 2', '6;5']
+    path = tmp_path / 'capture.txt'
+    path.write_text('\n'.join(lines) + '\n')
+    with pytest.raises(ValueError):
+        reassemble_sens_text(str(path))
+    quarantine = []
+    parsed = reassemble_sens_text(str(path), quarantine=quarantine)
+    assert [each['kind'] for each in parsed] == ['stateBandInfoExtend', 'recordHR']
+    assert parsed[0]['data'] == list(range(1, 18))
+    assert [lineno for lineno, _, _ in quarantine] == [2, 3, 4, 6, 7]
+    assert all(isinstance(e, ValueError) for _, _, e in quarantine)
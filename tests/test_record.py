@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import pickle
+import pytest
+from wearableio.sensomics.io import iter_sens_text, read_sens_columns
+from wearableio.sensomics.record import SensRecord, iter_sens_views, read_sens_records, record_type
+
+KINDS = ['recordHR', 'recordBP', 'stateMultiMeasure', 'stateActivity', 'streamPPG', 'streamACX']
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('record') / 'capture.txt'
+    path.write_bytes(sens_capture(KINDS, 3, seed=1))
+    return str(path)
+
+
+def _to_list(data):
+    return [_to_list(val) if isinstance(val, tuple) else val for val in data]
+
+
+def test_record_data_keeps_dict_shape(capture):
+    for parsed, record in zip(iter_sens_text(capture), read_sens_records(capture)):
+        assert list(record) == list(parsed)
+        assert _to_list(record['data']) == parsed['data']
+    record = SensRecord.from_dict({'time': 0, 'kind': 'stateMultiMeasure', 'date': [None],
+                                   'data': [70, 98, [120, 80], 36.05]})
+    assert record['data'] == (70, 98, (120, 80), 36.05)
+    assert (record.hr, record.bp_high, record.bp_low, record.st) == (70, 120, 80, 36.05)
+
+
+def test_records_pickle_and_copy(capture):
+    for record in read_sens_records(capture):
+        for restored in (pickle.loads(pickle.dumps(record)), copy.copy(record), copy.deepcopy(record)):
+            assert type(restored) is record_type(record.kind)
+            assert dict(restored) == dict(record)
+
+
+def test_views_pickle_and_copy(capture):
+    for view in iter_sens_views(read_sens_columns(capture)):
+        for restored in (pickle.loads(pickle.dumps(view)), copy.copy(view), copy.deepcopy(view)):
+            assert restored.kind == view.kind and restored.data == view.data and restored.time == view.time
+        with pytest.raises(AttributeError):
+            view._missing
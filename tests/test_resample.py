@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.resample import RESAMPLE_METHODS, StreamResampler
+from wearableio.sensomics.resample import resample_sens
+from wearableio.sensomics.settings import SENSOMICS_STREAM_PERIOD
+
+KINDS = ['streamPPG', 'streamACX', 'streamACY']
+
+
+def _push_chunks(resampler, time, samples, cuts):
+    resampled = [resampler.push(time[start:stop], samples[start:stop])
+                 for start, stop in zip([0] + cuts, cuts + [len(time)])]
+    resampled.append(resampler.flush())
+    return {name: np.concatenate([each[name] for each in resampled]) for name in ('k', 'data')}
+
+
+@pytest.mark.parametrize('method', RESAMPLE_METHODS)
+def test_chunking_does_not_change_output(method):
+    rng = np.random.default_rng(0)
+    time = np.cumsum(rng.uniform(5, 30, 500))
+    time[200:] += 400  # gap
+    samples = rng.normal(size=(500, 2))
+    whole = _push_chunks(StreamResampler(40, method, max_gap=200, channels=2), time, samples, [])
+    assert len(whole['k']) > 0
+    for seed in range(5):
+        cuts = sorted(np.random.default_rng(seed).choice(np.arange(1, 500), 30, replace=False).tolist())
+        chunked = _push_chunks(StreamResampler(40, method, max_gap=200, channels=2), time, samples, cuts)
+        np.testing.assert_array_equal(chunked['k'], whole['k'])
+        np.testing.assert_allclose(chunked['data'], whole['data'], equal_nan=True)
+
+
+def test_linear_exact_on_a_line():
+    time = np.arange(0, 1000, 7.0)
+    resampled = _push_chunks(StreamResampler(40, 'linear'), time, 3 * time + 1, [50, 51, 100])
+    np.testing.assert_allclose(resampled['data'][:, 0], 3 * resampled['k'] * 40 + 1)
+
+
+def test_max_gap_gives_nan():
+    time = np.array([0, 10, 20, 30, 500, 510, 520])
+    resampled = _push_chunks(StreamResampler(40, 'nearest', max_gap=100), time, time, [])
+    gap = (resampled['k'] * 40 > 30) & (resampled['k'] * 40 < 500)
+    assert gap.any() and np.isnan(resampled['data'][gap, 0]).all()
+    assert not np.isnan(resampled['data'][~gap, 0]).any()
+
+
+def test_resampler_invalid():
+    with pytest.raises(ValueError):
+        StreamResampler(40, 'cubic')
+    with pytest.raises(ValueError):
+        StreamResampler(0)
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    lines = []
+    for i, kind in enumerate(KINDS):
+        n = 60000 // SENSOMICS_STREAM_PERIOD[kind]
+        time = 1000 + i + np.arange(n) * SENSOMICS_STREAM_PERIOD[kind]
+        lines += sens_capture([kind], n, seed=i, time=time).splitlines(keepends=True)
+    lines.sort(key=lambda line: int(line.split(b';')[0]))
+    path = tmp_path_factory.mktemp('resample') / 'capture.txt'
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+@pytest.mark.parametrize('method', ['linear', {'streamPPG': 'mean', 'streamACX': 'nearest'}])
+def test_sens_resampler_chunking_does_not_change_output(capture, method):
+    whole = resample_sens(capture, period=40, method=method, kinds=KINDS)
+    assert whole['channels'] == ['ppg', 'acx', 'acy']
+    assert len(whole['time']) > 1000 and np.all(np.diff(whole['time']) == 40)
+    for chunk_size in (1 << 10, 5000, 1 << 14):
+        chunked = resample_sens(capture, period=40, method=method, kinds=KINDS, chunk_size=chunk_size)
+        np.testing.assert_array_equal(chunked['time'], whole['time'])
+        np.testing.assert_allclose(chunked['data'], whole['data'], equal_nan=True)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import numpy as np
+import pytest
+from wearableio.buffer import RingBuffer
+from wearableio.sensomics.io import read_sens_columns
+from wearableio.sensomics.live import SensLiveBuffer
+
+
+def test_overwrite_keeps_the_last_rows():
+    ring = RingBuffer(capacity=8, dtype='int64')
+    assert ring.write(np.arange(5)) == 5
+    assert ring.write(np.arange(5, 10)) == 5
+    window = ring.read()
+    assert window.tolist() == list(range(2, 10))
+    assert ring.n_dropped == 2
+    assert ring.write(np.arange(10, 30)) == 20  # more than capacity at once
+    assert ring.read().tolist() == list(range(22, 30))
+    assert ring.n_dropped == 2 + 12
+    ring.release()
+    assert ring.n_read == ring.n_written == 30  # rows read or dropped
+
+
+def test_window_is_a_contiguous_view_across_the_wrap():
+    ring = RingBuffer(capacity=8, shape=(2,), dtype='int64')
+    ring.write(np.zeros((6, 2)))
+    ring.read()
+    ring.write(np.arange(16).reshape(8, 2))
+    window = ring.read()
+    assert window.tolist() == np.arange(16).reshape(8, 2).tolist()
+    assert np.shares_memory(window, ring._data)
+    assert ring.latest(3).tolist() == np.arange(10, 16).reshape(3, 2).tolist()
+
+
+def test_block_waits_for_the_consumer():
+    ring = RingBuffer(capacity=8, dtype='int64', policy='block')
+    assert ring.write(np.arange(6)) == 6
+    assert ring.write(np.arange(6, 10), timeout=0.01) == 0  # 2 rows free only, timed out
+    assert ring.write(np.arange(6, 8), timeout=0.01) == 2
+    assert ring.read(max_rows=4).tolist() == [0, 1, 2, 3]
+    assert ring.write(np.arange(8, 10), timeout=0.01) == 0  # the window read is not released yet
+    assert ring.read().tolist() == [4, 5, 6, 7]
+    assert ring.write(np.arange(8, 12), timeout=0.01) == 4
+    assert ring.read().tolist() == [8, 9, 10, 11]
+    ring.release()
+    assert ring.write(np.arange(12, 30), timeout=0.01) == 8  # by capacity pieces, the 2nd timed out
+    assert ring.n_dropped == 0
+
+
+@pytest.mark.parametrize('policy', ['block', 'overwrite'])
+def test_producer_consumer_threads(policy):
+    ring = RingBuffer(capacity=64, dtype='int64', policy=policy)
+    n_rows = 20000
+    done = threading.Event()
+    read = []
+
+    def consume():
+        while not (done.is_set() and len(ring) == 0):
+            window = ring.read(max_rows=17, timeout=0.01)
+            read.extend(window.tolist())
+        ring.release()
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for start in range(0, n_rows, 50):
+        assert ring.write(np.arange(start, start + 50)) == 50
+    done.set()
+    consumer.join(timeout=10)
+    assert not consumer.is_alive()
+    assert len(read) + ring.n_dropped == n_rows
+    if policy == 'block':
+        assert read == list(range(n_rows)) and ring.n_dropped == 0
+
+
+def test_ring_invalid():
+    with pytest.raises(ValueError):
+        RingBuffer(policy='drop')
+    with pytest.raises(ValueError):
+        RingBuffer(capacity=0)
+
+
+@pytest.fixture(scope='module')
+def capture(tmp_path_factory, sens_capture):
+    path = tmp_path_factory.mktemp('live') / 'capture.txt'
+    path.write_bytes(sens_capture(['streamPPG', 'recordHR', 'streamACX'], 40))
+    return str(path)
+
+
+def test_live_buffer_lines_and_frames(capture):
+    columns = read_sens_columns(capture)
+    with open(capture, 'rb') as fodata:
+        lines = fodata.read()
+    live = SensLiveBuffer(capacity=128, kinds=['streamPPG', 'recordHR'])
+    assert live.write_lines(lines) == 80
+    by_frames = SensLiveBuffer(capacity=128, kinds=['streamPPG', 'recordHR'])
+    rows = [line.split(b';') for line in lines.splitlines()]
+    time = np.array([int(each_time) for each_time, _ in rows])
+    frames = np.array([json.loads(frame) for _, frame in rows], dtype=np.uint8)
+    assert by_frames.write_frames(time[:3], frames[:3]) + by_frames.write_frames(time[3:], frames[3:]) == 80
+    for kind in ('streamPPG', 'recordHR'):
+        for buffer in (live, by_frames):
+            window = buffer.read(kind)
+            np.testing.assert_array_equal(window['time'], columns[kind]['time'])
+            np.testing.assert_array_equal(window['data'], columns[kind]['data'])
+            if kind == 'recordHR':
+                np.testing.assert_array_equal(window['date'], columns[kind]['date'])
+
+
+def test_live_buffer_policies(capture):
+    with open(capture, 'rb') as fodata:
+        lines = fodata.read()
+    overwrite = SensLiveBuffer(capacity=16, kinds=['streamPPG'])
+    assert overwrite.write_lines(lines) == 40
+    assert len(overwrite.read('streamPPG')) == 16 and overwrite['streamPPG'].n_dropped == 24
+    block = SensLiveBuffer(capacity={'streamPPG': 16}, kinds=['streamPPG'], policy='block')
+    assert block.write_lines(lines, timeout=0.01) == 16
+    assert block['streamPPG'].n_dropped == 0
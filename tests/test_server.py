@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from wearableio.sensomics.server import SensDecodeServer, decode_remote, decode_sens_batch
+
+
+def test_non_utf8_line_is_an_error_record(sens_capture):
+    records = decode_sens_batch(sens_capture(['recordHR'], 2) + b'0;[\xff\xfe]\n')
+    assert [record['kind'] for record in records[:2]] == ['recordHR', 'recordHR']
+    assert records[2]['line'] == 2 and 'error' in records[2]
+
+
+def _decode_concurrently(path, *requests):
+    async def run():
+        server = SensDecodeServer(max_latency=0.05)
+        ready = asyncio.Event()
+        serving = asyncio.ensure_future(server.serve(path=path, ready=ready))
+        await ready.wait()
+        try:
+            return await asyncio.wait_for(asyncio.gather(
+                *[decode_remote(request, path=path) for request in requests]), timeout=5)
+        finally:
+            serving.cancel()
+
+    return asyncio.run(run())
+
+
+def test_bad_request_does_not_fail_the_batch(tmp_path, sens_capture):
+    good, bad = _decode_concurrently(str(tmp_path / 'server.sock'), sens_capture(['recordHR'], 4), b'0;[\xff]\n')
+    assert len(good) == 4 and all(record['kind'] == 'recordHR' for record in good)
+    assert len(bad) == 1 and 'error' in bad[0]
+    assert bad[0]['line'] == 0
+
+
+def test_frame_not_int_blocks_is_an_error_record(sens_capture):
+    records = decode_sens_batch(sens_capture(['recordHR'], 1) + b'1;[1.5]\n')
+    assert records[0]['kind'] == 'recordHR'
+    assert records[1]['line'] == 1 and 'error' in records[1]
+
+
+def test_error_line_is_relative_to_the_request(tmp_path, sens_capture):
+    good, mixed = _decode_concurrently(str(tmp_path / 'server.sock'), sens_capture(['recordHR'], 4),
+                                       sens_capture(['recordHR'], 1) + b'1;[1.5]\n')
+    assert all(record['kind'] == 'recordHR' for record in good)
+    assert mixed[0]['kind'] == 'recordHR'
+    assert mixed[1]['line'] == 1 and 'error' in mixed[1]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+from wearableio import shared
+from wearableio.shared import SharedColumns, share_columns
+
+COLUMNS = {'recordHR': {'time': np.arange(5), 'data': np.arange(10, dtype=np.uint8).reshape(5, 2)}}
+
+
+@pytest.fixture
+def unregistered(monkeypatch):
+    if shared.TRACK_ARGUMENT:
+        pytest.skip('consumers attach with track=False')
+    names = []
+    unregister = shared.resource_tracker.unregister
+    monkeypatch.setattr(shared.resource_tracker, 'unregister',
+                        lambda name, rtype: (names.append(name), unregister(name, rtype)))
+    return names
+
+
+def test_columns_round_trip():
+    with SharedColumns(share_columns(COLUMNS)) as owner:
+        np.testing.assert_array_equal(owner.columns['recordHR']['data'], COLUMNS['recordHR']['data'])
+        copied = owner.copy()
+    np.testing.assert_array_equal(copied['recordHR']['time'], COLUMNS['recordHR']['time'])
+
+
+def test_consumer_keeps_owner_registration(unregistered):
+    descriptor = share_columns(COLUMNS)
+    del unregistered[:]
+    with SharedColumns(descriptor) as owner:
+        SharedColumns(descriptor, owner=False).release()
+        assert unregistered == []
+        assert owner.columns['recordHR']['data'].sum() == 45
+    assert unregistered == ['/' + descriptor['name']]  # by the unlink of the owner
+
+
+def test_consumer_with_own_tracker_unregisters(unregistered):
+    descriptor = share_columns(COLUMNS)
+    with SharedColumns(descriptor):
+        del unregistered[:]
+        SharedColumns(dict(descriptor, tracker=[-1, -1]), owner=False).release()
+        assert unregistered == ['/' + descriptor['name']]
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='segments listed in /dev/shm')
+def test_iter_close_unlinks_not_handed(tmp_path, sens_capture):
+    paths = []
+    for i in range(4):
+        path = tmp_path / 'capture{}.txt'.format(i)
+        path.write_bytes(sens_capture(['recordHR'], 10, seed=i))
+        paths.append(str(path))
+    before = set(os.listdir('/dev/shm'))
+    results = shared.iter_sens_shared(paths, max_workers=2)
+    path, owner, quarantine = next(results)
+    assert path == paths[0] and quarantine == []
+    results.close()
+    assert set(os.listdir('/dev/shm')) - before == {owner.descriptor['name'].lstrip('/')}
+    owner.release()
+    assert set(os.listdir('/dev/shm')) - before == set()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.sensomics.io import read_sens_columns
+from wearableio.sensomics.tokenizer import tokenize_sens_bytes
+
+
+@pytest.fixture
+def lines(sens_capture):
+    return sens_capture(['recordHR'], 20).decode().splitlines()
+
+
+MALFORMED = [
+    '{time};{body}',
+    '{time};[{body}',
+    '{time};{body}]',
+    '{time};[,{body}]',
+    '{time};[{body},]',
+    '{time};[{body}],',
+    '{time};[{body}]]',
+    '{time};[[{body}]',
+    '{time};][{body}]',
+    '{time};[{body}][',
+    '{time};[0{body}]',
+    '{time};[{double_comma}]',
+    '{time};[{missing_comma}]',
+]
+WELL_FORMED = ['{time} ; [ {body} ] ', '{time};\t[{body}]\r']
+
+
+def _format(pattern, line):
+    time, frame = line.split(';')
+    body = frame[1:-1]
+    return pattern.format(time=time, body=body, double_comma=body.replace(', ', ',, ', 1),
+                          missing_comma=body.replace(', ', ' ', 1))
+
+
+@pytest.mark.parametrize('pattern', MALFORMED)
+def test_malformed_line_not_valid(lines, pattern):
+    line = _format(pattern, lines[0])
+    assert not tokenize_sens_bytes((line + '\n').encode()).valid[0]
+
+
+@pytest.mark.parametrize('pattern', WELL_FORMED)
+def test_well_formed_line_valid(lines, pattern):
+    line = _format(pattern, lines[0])
+    assert tokenize_sens_bytes((line + '\n').encode()).valid[0]
+
+
+def test_engines_quarantine_same_lines(tmp_path, lines):
+    crafted = [_format(pattern, line) for pattern, line in zip(MALFORMED + WELL_FORMED, lines)]
+    path = str(tmp_path / 'capture.txt')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines + crafted + lines) + '\n')
+    decoded = {}
+    for engine in ('numpy', 'python'):
+        quarantine = []
+        columns = read_sens_columns(path, quarantine=quarantine, engine=engine)
+        decoded[engine] = (columns, sorted(lineno for lineno, _, _ in quarantine))
+    assert decoded['numpy'][1] == decoded['python'][1] == list(range(len(lines), len(lines) + len(MALFORMED)))
+    for kind, kind_columns in decoded['python'][0].items():
+        for name, column in kind_columns.items():
+            np.testing.assert_array_equal(decoded['numpy'][0][kind][name], column)
+
+
+@pytest.mark.parametrize('frame', ['[1.5]', '[null]', '[[1]]', '{"a": 1}', '"ab"', '5'])
+def test_engines_quarantine_frame_not_int_blocks(tmp_path, lines, frame):
+    lines = lines[:4]
+    path = str(tmp_path / 'capture.txt')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines[:2] + ['1;' + frame] + lines[2:]) + '\n')
+    for engine in ('numpy', 'python'):
+        quarantine = []
+        columns = read_sens_columns(path, quarantine=quarantine, engine=engine)
+        assert [lineno for lineno, _, _ in quarantine] == [2]
+        assert isinstance(quarantine[0][2], ValueError)
+        assert len(columns['recordHR']['time']) == 4
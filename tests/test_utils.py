@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from wearableio.options import option_context
+from wearableio.utils import join_date_blocks, join_date_blocks_array
+from wearableio.sensomics.encoder import encode_sens_frame
+from wearableio.sensomics.field import join_date_blocks_rows
+from wearableio.sensomics.frame import RecordHRFrame
+from wearableio.sensomics.io import decode_sens_array, read_sens_columns
+
+OUT_OF_MONTH = [[21, 2, 29, 0, 0], [20, 2, 30, 0, 0], [20, 4, 31, 0, 0], [0, 2, 30, 0, 0]]
+IN_MONTH = [[20, 2, 29, 0, 0], [0, 2, 29, 0, 0], [21, 12, 31, 23, 59]]
+
+
+@pytest.mark.parametrize('format_out', ['datetime64', 'epoch', 'str'])
+@pytest.mark.parametrize('block', OUT_OF_MONTH)
+def test_day_out_of_month_raises(block, format_out):
+    with pytest.raises(ValueError, match='day is out of range for month'):
+        join_date_blocks(block, format_out=format_out)
+    with pytest.raises(ValueError, match='day is out of range for month'):
+        join_date_blocks_array([IN_MONTH[0], block], format_out=format_out)
+
+
+@pytest.mark.parametrize('block', IN_MONTH)
+def test_day_in_month_parsed(block):
+    epoch = join_date_blocks(block, format_out='epoch')
+    assert join_date_blocks_array([block], format_out='epoch')[0] == epoch
+    assert join_date_blocks(block, format_out='datetime64') == np.datetime64(epoch, 's')
+
+
+@pytest.mark.parametrize('level', ['strict', 'trusted'])
+def test_frame_out_of_month_rejected(level):
+    frame = encode_sens_frame('recordHR', [70], np.datetime64('2021-02-28T07:08'))
+    frame[8] = 29
+    with option_context('validation.level', level):
+        with pytest.raises(ValueError):
+            RecordHRFrame().parse(frame)
+        decoded, rejected = decode_sens_array([0, 1], np.array([frame, frame[:8] + [28] + frame[9:]]))
+    assert rejected.tolist() == [0]
+    assert decoded['recordHR']['row'].tolist() == [1]
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('level', ['strict', 'header', 'trusted'])
+@pytest.mark.parametrize('fields_out', [['date', 'data'], ['data']])
+def test_out_of_month_rejected_by_both_engines(tmp_path, engine, level, fields_out):
+    frame = encode_sens_frame('recordHR', [70], np.datetime64('2020-04-30T07:08'))
+    lines = ['{};{}\n'.format(time, frame) for time, frame in enumerate(
+        [frame, frame[:8] + [31] + frame[9:], frame[:7] + [13] + frame[8:]])]
+    tag = encode_sens_frame('stateTag', [np.datetime64('2020-04-30T07:08:09')])
+    lines += ['3;{}\n'.format(tag), '4;{}\n'.format(tag[:8] + [31] + tag[9:])]
+    path = tmp_path / 'capture.txt'
+    path.write_text(''.join(lines))
+    quarantine = []
+    with option_context('validation.level', level):
+        columns = read_sens_columns(str(path), quarantine=quarantine, engine=engine, fields_out=fields_out)
+    assert [lineno for lineno, _, _ in quarantine] == [1, 2, 4]
+    assert columns['recordHR']['time'].tolist() == [0] and columns['stateTag']['time'].tolist() == [3]
+
+
+@pytest.mark.parametrize('format_out', ['datetime64', 'epoch', 'str'])
+def test_out_of_month_rows_masked(format_out):
+    with option_context('date.format_out', format_out):
+        parsed = join_date_blocks_rows([IN_MONTH[0], OUT_OF_MONTH[0], [20, 13, 1, 0, 0]])
+    assert parsed[0] == join_date_blocks(IN_MONTH[0], format_out=format_out)
+    if format_out == 'str':
+        assert parsed[1:].tolist() == [None, None]
+    else:
+        assert np.isnat(parsed[1:].view('datetime64[s]')).all()
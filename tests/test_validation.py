@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from wearableio.benchmarks.validation_level import LEVELS, bench_validation_level, write_random_capture
+from wearableio.options import option_context
+from wearableio.sensomics.io import read_sens_line, read_sens_text
+
+SHORT = ['1;[171, 0, 14, 255, 81, 17, 20, 5, 3]\n',
+         '2;[171, 0, 14, 255, 81, 17, 20, 5, 3, 4, 23, 110, 0, 0, 0, 0, 0, 0, 0, 0]\n',
+         '3;[171, 0, 14, 255, 81, 17, 20, 5, 3, 4]\n',
+         '4;[171, 0, 14, 255, 81, 50, 20]\n']  # unknown user
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_short_frame_raises_value_error(level):
+    with option_context('validation.level', level):
+        with pytest.raises(ValueError):
+            read_sens_line(SHORT[0])
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_short_frame_quarantined(level, tmp_path):
+    path = tmp_path / 'short.txt'
+    path.write_text(''.join(SHORT))
+    quarantine = []
+    with option_context('validation.level', level):
+        parsed = read_sens_text(str(path), quarantine=quarantine)
+    assert [parsed_line['time'] for parsed_line in parsed] == [2, 4]
+    assert [lineno for lineno, _, _ in quarantine] == [0, 2]
+
+
+def test_levels_identical_on_valid_frames(tmp_path):
+    path = str(tmp_path / 'capture.txt')
+    write_random_capture(path, 2000)
+    results = bench_validation_level(path, repeat=1)
+    assert [(result['engine'], result['level']) for result in results] == [
+        (engine, level) for engine in ('numpy', 'python') for level in LEVELS]
+    assert all(result['identical'] for result in results)
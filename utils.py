@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime
+import numpy as np
+from wearableio.options import get_option
+
 
 def join_integer_decimal(block) -> float:
     integer = block[0]
@@ -70,4 +74,135 @@ def join_complementary_byteblocks(block) -> int:
     if parsed < sign_bound:
         return parsed
     else:
-        return parsed - sign_block
\ No newline at end of file
+        return parsed - sign_block
+
+
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+def days_in_month(year, month):
+    """
+    days_in_month used to count the days of a month, month in [1, 12], of a
+    proleptic Gregorian year, works on int and on numpy integer arrays alike
+
+    Example:
+        days_in_month(2020, 2)
+        -> 29
+    """
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return _DAYS_IN_MONTH[month] + ((month == 2) & leap)
+
+
+def date_blocks_in_month(blocks):
+    """
+    date_blocks_in_month used to check month and day of date blocks rows,
+    leap years included
+
+    Returns
+    -------
+    valid : numpy.ndarray of bool, shape (N,)
+        True where the month exists and the day is in the month
+    """
+    blocks = np.asarray(blocks, dtype=np.int64)
+    month, day = blocks[:, 1], blocks[:, 2]
+    valid = (month >= 1) & (month <= 12)
+    last_day = days_in_month(blocks[:, 0] + 2000, np.where(valid, month, 1))
+    return valid & (day >= 1) & (day <= last_day)
+
+
+def days_from_civil(year, month, day):
+    """
+    days_from_civil used to count days since 1970-01-01 of a proleptic
+    Gregorian date, works on int and on numpy integer arrays alike, the day
+    is not checked against the month, see days_in_month
+
+    Example:
+        days_from_civil(2020, 5, 6)
+        -> 18388
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def join_date_blocks(block, format_out=None):
+    """
+    join_date_blocks used to combine date blocks to a single date value
+
+    Parameters
+    ----------
+    block : list
+        [year - 2000, month, day, hour, minute(, second)]
+    format_out : str, optional
+        - datetime64: numpy.datetime64 with unit second
+        - epoch: int, seconds since 1970-01-01
+        - str: str formatted by option 'date.strftime'
+        default option 'date.format_out'
+
+    Example:
+        block = [20, 5, 6, 7, 8]
+        join_date_blocks(block, format_out='epoch')
+        -> 1588748880
+    """
+    if format_out is None:
+        format_out = get_option('date.format_out')
+    if format_out == 'str':
+        parsed = datetime(block[0] + 2000, *block[1:])
+        return parsed.strftime(get_option('date.strftime'))
+    if not 1 <= block[1] <= 12:
+        raise ValueError('month must be in 1..12')
+    if not 1 <= block[2] <= days_in_month(block[0] + 2000, block[1]):
+        raise ValueError('day is out of range for month')
+    second = block[5] if len(block) > 5 else 0
+    parsed = (days_from_civil(block[0] + 2000, block[1], block[2]) * 86400
+              + block[3] * 3600 + block[4] * 60 + second)
+    if format_out == 'epoch':
+        return parsed
+    elif format_out == 'datetime64':
+        return np.datetime64(parsed, 's')
+    raise ValueError('format_out invalid: got {}, allow datetime64, epoch or str'.format(format_out))
+
+
+def join_date_blocks_array(blocks, format_out=None):
+    """
+    join_date_blocks_array is the vectorized join_date_blocks
+
+    Parameters
+    ----------
+    blocks : array like, shape (N, 5) or (N, 6)
+        rows of [year - 2000, month, day, hour, minute(, second)]
+    format_out : str, optional
+        same as join_date_blocks
+
+    Returns
+    -------
+    parsed : numpy.ndarray, shape (N,)
+        datetime64[s], int64 or str array, ValueError if a row has no such
+        month or day, see date_blocks_in_month
+    """
+    if format_out is None:
+        format_out = get_option('date.format_out')
+    blocks = np.asarray(blocks, dtype=np.int64)
+    if blocks.ndim != 2 or blocks.shape[1] not in (5, 6):
+        raise ValueError('Shape of date blocks invalid: got {}, allow (N, 5) or (N, 6)'.format(
+            blocks.shape))
+    in_month = date_blocks_in_month(blocks)
+    if not in_month.all():
+        row = int(np.argmin(in_month))
+        raise ValueError('day is out of range for month: got {} at row {}'.format(blocks[row].tolist(), row))
+    parsed = (days_from_civil(blocks[:, 0] + 2000, blocks[:, 1], blocks[:, 2]) * 86400
+              + blocks[:, 3] * 3600 + blocks[:, 4] * 60)
+    if blocks.shape[1] == 6:
+        parsed += blocks[:, 5]
+    if format_out == 'epoch':
+        return parsed
+    elif format_out == 'datetime64':
+        return parsed.astype('datetime64[s]')
+    elif format_out == 'str':
+        strftime = get_option('date.strftime')
+        return np.array([value.strftime(strftime) for value in
+                         parsed.astype('datetime64[s]').astype(object)], dtype=object)
+    raise ValueError('format_out invalid: got {}, allow datetime64, epoch or str'.format(format_out))